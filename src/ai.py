@@ -1,19 +1,214 @@
 # src/ai.py
+"""
+AI opponents for Googley Fighter.
+
+AIControls is the basic bot. AdaptiveAIControls adds a PlayerModel that
+learns the opponent's habits while they play: which action tends to follow
+which (an n-gram model over their inputs) and from what spacing they like to
+attack. The bot uses it to jump fireballs before they're thrown, stay out of
+the player's favourite range and punish attacks that are on cooldown.
+
+The model lives in fixed-size count tables, so learning costs the same every
+frame and memory doesn't grow however long the session runs.
+"""
+
 import random
-from config import AI_ATTACK_RANGE, AI_ATTACK_COOLDOWN
+from array import array
+from config import (AI_ATTACK_RANGE, AI_ATTACK_COOLDOWN, AI_NGRAM_ORDER,
+                    AI_MODEL_MAX_COUNT, AI_PREDICT_THRESHOLD, AI_DODGE_DISTANCE,
+                    AI_PUNISH_CHANCE, AI_DISTANCE_BUCKET, SCREEN_WIDTH)
+
+# An action is (dx, dy, attack, fireball) with dx relative to the opponent
+# (+1 toward, -1 away), packed into one of ACTIONS symbols
+ACTIONS = 36
+ATTACK_BIT = 2
+FIREBALL_BIT = 1
+
+
+def encode_action(dx, dy, attack, fireball):
+    return ((dx + 1) * 3 + (dy + 1)) * 4 + (ATTACK_BIT if attack else 0) + (FIREBALL_BIT if fireball else 0)
+
+
+class CountTable:
+    """
+    Next-action counts for every context of one n-gram order.
+
+    Besides the counts, each context keeps its total and how many of its
+    next actions attacked or threw a fireball, so those chances are O(1).
+    """
+    def __init__(self, contexts, max_count=AI_MODEL_MAX_COUNT):
+        self.counts = array("H", bytes(2 * contexts * ACTIONS))
+        self.totals = array("H", bytes(2 * contexts))
+        self.attacks = array("H", bytes(2 * contexts))
+        self.fireballs = array("H", bytes(2 * contexts))
+        self.max_count = max_count
+
+    def add(self, context, action):
+        self.counts[context * ACTIONS + action] += 1
+        self.totals[context] += 1
+        if action & ATTACK_BIT:
+            self.attacks[context] += 1
+        if action & FIREBALL_BIT:
+            self.fireballs[context] += 1
+        if self.totals[context] >= self.max_count:
+            self.halve(context)
+
+    def halve(self, context):
+        """Age one context: halve its counts so recent habits outweigh old ones."""
+        start = context * ACTIONS
+        total = attacks = fireballs = 0
+        for action in range(ACTIONS):
+            count = self.counts[start + action] >> 1
+            self.counts[start + action] = count
+            total += count
+            if action & ATTACK_BIT:
+                attacks += count
+            if action & FIREBALL_BIT:
+                fireballs += count
+        self.totals[context] = total
+        self.attacks[context] = attacks
+        self.fireballs[context] = fireballs
+
+
+class PlayerModel:
+    """
+    What the AI has learned about one opponent.
+
+    Actions are only recorded when the input changes, so holding a key is
+    one action rather than sixty. Predictions use the longest context that
+    has been seen often enough, backing off to shorter ones.
+    """
+    MIN_SEEN = 4  # observations a context needs before it's trusted
+
+    def __init__(self, order=AI_NGRAM_ORDER):
+        self.order = order
+        self.tables = [CountTable(ACTIONS ** n) for n in range(order + 1)]
+        self.history = [0] * order  # last `order` actions, oldest first
+        self.last_action = None
+        self.was_attacking = False
+        self.revision = 0  # bumped whenever the count tables change
+
+        # Spacing: frames spent at each distance, and attacks started there
+        buckets = SCREEN_WIDTH // AI_DISTANCE_BUCKET + 1
+        self.frames_at = array("H", bytes(2 * buckets))
+        self.attacks_at = array("H", bytes(2 * buckets))
+        self.frames_total = 0
+        self.attacks_total = 0
+
+    def context(self, n):
+        """Index of the last n actions in the order-n table."""
+        index = 0
+        for action in self.history[self.order - n:]:
+            index = index * ACTIONS + action
+        return index
+
+    def observe(self, dx, dy, attack, fireball, distance):
+        """Record one frame of the player's input. Constant time."""
+        bucket = min(distance // AI_DISTANCE_BUCKET, len(self.frames_at) - 1)
+        self.frames_at[bucket] += 1
+        self.frames_total += 1
+        if attack and not self.was_attacking:
+            self.attacks_at[bucket] += 1
+            self.attacks_total += 1
+        self.was_attacking = attack
+        if self.frames_at[bucket] >= AI_MODEL_MAX_COUNT:
+            self.frames_at[bucket] >>= 1
+            self.attacks_at[bucket] >>= 1
+        if self.frames_total >= AI_MODEL_MAX_COUNT * len(self.frames_at):
+            self.frames_total >>= 1
+            self.attacks_total >>= 1
+
+        action = encode_action(dx, dy, attack, fireball)
+        if action == self.last_action:
+            return
+        self.last_action = action
+        self.revision += 1
+        for n, table in enumerate(self.tables):
+            table.add(self.context(n), action)
+        if self.order:
+            self.history.pop(0)
+            self.history.append(action)
+
+    def best_context(self):
+        """The longest (table, context) pair with enough observations."""
+        for n in range(self.order, -1, -1):
+            table = self.tables[n]
+            context = self.context(n)
+            if table.totals[context] >= self.MIN_SEEN:
+                return table, context
+        return None, 0
+
+    def fireball_chance(self):
+        """Chance the player's next action throws a fireball."""
+        table, context = self.best_context()
+        return table.fireballs[context] / table.totals[context] if table else 0.0
+
+    def attack_chance(self):
+        """Chance the player's next action is an attack."""
+        table, context = self.best_context()
+        return table.attacks[context] / table.totals[context] if table else 0.0
+
+    def attack_rate(self, distance):
+        """How often the player starts an attack per frame at this spacing."""
+        bucket = min(distance // AI_DISTANCE_BUCKET, len(self.frames_at) - 1)
+        frames = self.frames_at[bucket]
+        return self.attacks_at[bucket] / frames if frames else 0.0
+
+    def favoured_spacing(self, distance):
+        """True if the player attacks from here at least twice as often as on average."""
+        if not self.attacks_total:
+            return False
+        return self.attack_rate(distance) >= 2 * self.attacks_total / self.frames_total
 
 
 class AIControls:
     """Fake controls to drive a Fighter using AI logic (slower but not too weak)."""
 
-    def __init__(self, fighter, target, config):
+    def __init__(self, fighter, target, config, seed=None):
         self.fighter = fighter
         self.target = target
         self.config = config
+        # Own RNG so a fight replays identically from the same seed
+        self.seed = config.AI_SEED if seed is None else seed
+        self.random = random.Random(self.seed)
+        self.draws = 0  # numbers taken from self.random since it was seeded
         self.attack_cooldown = 0
         self.fireball_cooldown_timer = 0
         self.move_cooldown = 0   # delay between movement updates
 
+    def reset(self):
+        """Clear cooldowns for a rematch."""
+        self.attack_cooldown = 0
+        self.fireball_cooldown_timer = 0
+        self.move_cooldown = 0
+        self.random.seed(self.seed)
+        self.draws = 0
+
+    def roll(self):
+        """The next random number in [0, 1)."""
+        self.draws += 1
+        return self.random.random()
+
+    def skip_to(self, draws):
+        """Put the RNG where it was after `draws` rolls (rewind uses this)."""
+        if draws < self.draws:
+            self.random.seed(self.seed)
+            self.draws = 0
+        for _ in range(draws - self.draws):
+            self.random.random()
+        self.draws = draws
+
+    def choose_dx(self, dx_to_player, distance, health_ratio):
+        """Which way to walk on a movement update."""
+        # Evade if low health
+        if health_ratio < 0.3 and distance < AI_ATTACK_RANGE:
+            # Move away from player
+            return -1 if dx_to_player > 0 else 1
+        # Normal behavior: approach player if too far
+        if distance > AI_ATTACK_RANGE:
+            return 1 if dx_to_player > 0 else -1
+        return 0
+
     def get_input(self, fighter):
         """
         Returns (dx, dy, attack, fireball) like player controls.
@@ -40,26 +235,17 @@ class AIControls:
 
         # Only update movement every few frames
         if self.move_cooldown == 0:
-            # Evade if low health
-            if health_ratio < 0.3 and distance < AI_ATTACK_RANGE:
-                # Move away from player
-                dx = -1 if dx_to_player > 0 else 1
-            else:
-                # Normal behavior: approach player if too far
-                if distance > AI_ATTACK_RANGE:
-                    dx = 1 if dx_to_player > 0 else -1
-                else:
-                    dx = 0
+            dx = self.choose_dx(dx_to_player, distance, health_ratio)
 
             # Attack logic more aggressive if health is low
             attack_chance = 0.2 if health_ratio < 0.3 else 0.05
-            if self.attack_cooldown == 0 and random.random() < attack_chance:
+            if self.attack_cooldown == 0 and self.roll() < attack_chance:
                 attack = True
                 self.attack_cooldown = max(10, AI_ATTACK_COOLDOWN // 2 if health_ratio < 0.3 else AI_ATTACK_COOLDOWN)
 
             # Fireball logic
             fireball_chance = 0.1 if distance > AI_ATTACK_RANGE else 0.03
-            if self.fireball_cooldown_timer == 0 and random.random() < fireball_chance:
+            if self.fireball_cooldown_timer == 0 and self.roll() < fireball_chance:
                 fireball = True
                 self.fireball_cooldown_timer = max(10, AI_ATTACK_COOLDOWN // 2 if health_ratio < 0.3 else AI_ATTACK_COOLDOWN)
 
@@ -67,7 +253,74 @@ class AIControls:
             self.move_cooldown = 4
 
         # Small chance to jump randomly, higher if low health
-        if random.random() < (0.01 if health_ratio < 0.3 else 0.002):
+        if self.roll() < (0.01 if health_ratio < 0.3 else 0.002):
             dy = -1
 
         return dx, dy, attack, fireball
+
+
+class AdaptiveAIControls(AIControls):
+    """AIControls that learns the player's habits and plays the counters."""
+
+    def __init__(self, fighter, target, config, seed=None, model=None):
+        super().__init__(fighter, target, config, seed)
+        self.model = model or PlayerModel()
+
+    # reset() keeps the model: it's what the AI has learned about this player
+
+    def observe(self):
+        """Feed the player's last input to the model."""
+        intent = self.target.last_intent
+        if intent is None:
+            return
+        dx, dy, attack, fireball = intent[:4]
+        toward = 1 if self.fighter.rect.centerx > self.target.rect.centerx else -1
+        distance = abs(self.target.rect.centerx - self.fighter.rect.centerx)
+        self.model.observe(dx * toward, dy, attack, fireball, distance)
+
+    def choose_dx(self, dx_to_player, distance, health_ratio):
+        toward = 1 if dx_to_player > 0 else -1
+        target = self.target
+
+        # Their attack is on cooldown: close in and punish
+        if target.attack_timer > 0 and self.fighter.attack_timer == 0:
+            return toward if distance > AI_ATTACK_RANGE else 0
+
+        # Don't stand where they like to hit from while we can't hit back
+        if (target.attack_timer == 0 and self.fighter.attack_timer > 0
+                and self.model.favoured_spacing(distance)
+                and self.model.attack_chance() >= AI_PREDICT_THRESHOLD):
+            return -toward
+
+        return super().choose_dx(dx_to_player, distance, health_ratio)
+
+    def incoming_fireball(self):
+        """True if one of the player's fireballs is about to reach us."""
+        fighter = self.fighter
+        for fireball in self.target.fireballs:
+            ahead = (fighter.rect.centerx - fireball.rect.centerx) * fireball.direction
+            if 0 < ahead < AI_DODGE_DISTANCE:
+                return True
+        return False
+
+    def get_input(self, fighter):
+        self.observe()
+        dx, dy, attack, fireball = super().get_input(fighter)
+        target = self.target
+        distance = abs(target.rect.centerx - self.fighter.rect.centerx)
+
+        if not self.fighter.is_jumping:
+            # Jump a fireball in flight, or one we expect them to throw now
+            if self.incoming_fireball():
+                dy = -1
+            elif target.fireball_timer == 0 and distance > AI_ATTACK_RANGE:
+                chance = self.model.fireball_chance()
+                if chance >= AI_PREDICT_THRESHOLD and self.roll() < chance / 4:
+                    dy = -1
+
+        # Punish an attack that's still on cooldown
+        if (target.attack_timer > 0 and self.fighter.attack_timer == 0
+                and distance <= AI_ATTACK_RANGE and self.roll() < AI_PUNISH_CHANCE):
+            attack = True
+
+        return dx, dy, attack, fireball
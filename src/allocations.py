@@ -0,0 +1,150 @@
+# src/allocations.py
+"""
+Per-frame allocation counter (debug builds).
+
+With TRACK_ALLOCATIONS on, tracemalloc traces every Python allocation and
+each frame's update and draw is measured two ways:
+
+- kept: traced memory still held when the frame ends. Steady state is 0 B;
+  anything else is a cache filling up or something leaking a frame at a time.
+- peak: the most the frame had allocated at once, freed or not. Surfaces
+  and text rendered per frame show up here. A frame that only blits what
+  was baked earlier still reads a few dozen bytes: the interpreter builds
+  an iterator for every loop and blit() returns a new Rect.
+
+Pixel buffers belong to SDL and aren't traced, so a new Surface only counts
+as its small Python wrapper. Tracing slows everything down; leave it off
+when timing frames.
+
+tracemalloc counts every thread, so worker threads (asset decoding, the
+simulation thread, the history writer, metrics export, the latency bot)
+do each piece of work inside `with allocations.gate:`. The main thread
+shuts the gate for the measured part of a frame, after the pieces in
+progress finish. If the main thread has to wait for a worker mid-frame it
+opens the gate meanwhile (waiting()) and that frame isn't sampled. Scene
+preloads aren't gated: they wait on the asset workers themselves.
+"""
+
+import gc
+import threading
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from config import ALLOCATION_WINDOW
+
+
+class WorkerGate:
+    """Worker threads run side by side, but not while the main thread measures."""
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.workers = 0
+        self.closed = False
+
+    def __enter__(self):
+        with self.condition:
+            while self.closed:
+                self.condition.wait()
+            self.workers += 1
+
+    def __exit__(self, *exc_info):
+        with self.condition:
+            self.workers -= 1
+            if not self.workers:
+                self.condition.notify_all()
+
+    def close(self):
+        """Main thread: wait for the workers' pieces in progress and hold off new ones."""
+        with self.condition:
+            self.closed = True
+            while self.workers:
+                self.condition.wait()
+
+    def open(self):
+        with self.condition:
+            self.closed = False
+            self.condition.notify_all()
+
+
+class AllocationCounter:
+    def __init__(self, window=ALLOCATION_WINDOW):
+        self.enabled = False
+        self.samples = deque(maxlen=window)  # (kept, peak) bytes for each recent frame
+        self.frame_start_bytes = 0
+        self.overhead = 0  # what measuring an empty frame reports
+        self.collections = 0
+        self.gate = WorkerGate()
+        self.measuring = False
+        self.waited = False  # this frame let the workers run
+        self.skipped = 0     # frames not sampled because of that
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        gc.callbacks.append(self.on_gc)
+        self.overhead = min(self.measure_empty() for _ in range(5))
+        self.enabled = True
+
+    def stop(self):
+        if self.on_gc in gc.callbacks:
+            gc.callbacks.remove(self.on_gc)
+        self.enabled = False
+
+    def measure_empty(self):
+        self.frame_start()
+        peak = tracemalloc.get_traced_memory()[1]
+        self.frame_end()
+        return peak - self.frame_start_bytes
+
+    def on_gc(self, phase, info):
+        if phase == "start":
+            self.collections += 1
+
+    def frame_start(self):
+        self.gate.close()
+        self.measuring = True
+        self.waited = False
+        tracemalloc.reset_peak()
+        self.frame_start_bytes = tracemalloc.get_traced_memory()[0]
+
+    def frame_end(self):
+        self.measuring = False
+        self.gate.open()
+
+    def frame_done(self):
+        current, peak = tracemalloc.get_traced_memory()
+        self.frame_end()
+        if self.waited:
+            self.skipped += 1
+            return
+        start = self.frame_start_bytes
+        self.samples.append((current - start, max(0, peak - start - self.overhead)))
+
+    @contextmanager
+    def waiting(self):
+        """Wrap a wait on a worker thread: mid-frame on the main thread, open the gate meanwhile."""
+        paused = self.measuring and threading.current_thread() is threading.main_thread()
+        if paused:
+            self.waited = True
+            self.gate.open()
+        try:
+            yield
+        finally:
+            if paused:
+                self.gate.close()
+
+    def zero_frames(self):
+        """Fraction of recent frames that kept nothing."""
+        if not self.samples:
+            return 0.0
+        return sum(1 for kept, peak in self.samples if kept == 0) / len(self.samples)
+
+    def report(self):
+        if not self.samples:
+            return "allocations: no frames"
+        kept = [sample[0] for sample in self.samples]
+        peaks = [sample[1] for sample in self.samples]
+        return (f"alloc/frame B | kept {kept[-1]} (max {max(kept)}) | peak {peaks[-1]} (max {max(peaks)}) | "
+                f"zero {self.zero_frames():.0%} | gc {self.collections} | skipped {self.skipped}")
+
+
+allocations = AllocationCounter()
@@ -0,0 +1,196 @@
+# src/assets.py
+"""
+Background loading of character art.
+
+GIFs are decoded by a small pool of worker threads (Pillow lets go of the
+GIL while it decodes), most urgent first. The raw pixels are handed back
+to the main thread, which turns them into display-format surfaces with
+convert_alpha() a few at a time in pump(), once per frame.
+
+The menu asks for the first few characters' fight GIFs up front, and the
+character under the cursor jumps the queue, so by the time both fighters
+are picked their frames are usually sitting in the cache. roster.py forgets
+the least recently used characters again, so the cache doesn't grow with
+the roster.
+"""
+
+import itertools
+import queue
+import threading
+import time
+import pygame
+from PIL import Image
+from config import ASSET_WORKERS, ASSET_PUMP_MS
+from allocations import allocations
+
+# Lower runs first
+PRIORITY_NOW = 0    # a scene is waiting for it
+PRIORITY_SOON = 1   # the character under the cursor
+PRIORITY_LATER = 2  # the rest of the roster
+
+
+def decode_gif(path, scale=None):
+    """Decode every frame of a GIF to (RGBA bytes, size). No pygame calls."""
+    pil_image = Image.open(path)
+    frames = []
+    try:
+        while True:
+            frame = pil_image.convert("RGBA")
+            if scale:
+                frame = frame.resize(scale, Image.NEAREST)
+            frames.append((frame.tobytes(), frame.size))
+            pil_image.seek(pil_image.tell() + 1)
+    except EOFError:
+        pass
+    return frames
+
+
+class AssetPrefetcher:
+    def __init__(self, workers=ASSET_WORKERS):
+        self.workers = workers
+        self.threads = []
+        self.queue = queue.PriorityQueue()  # (priority, order, key)
+        self.order = itertools.count()
+        self.lock = threading.Lock()
+        self.started = set()   # keys a worker has picked up
+        self.decoded = {}      # key -> raw frames, or the exception decoding raised
+        self.done = {}         # key -> threading.Event, set once decoded
+        self.ready = queue.SimpleQueue()  # keys waiting for the main thread
+        self.frames = {}       # key -> list of surfaces
+        self.unconverted = set()  # keys in frames that still need convert_alpha()
+        self.failed = {}       # key -> the exception decoding it raised
+
+    def request(self, path, scale=None, priority=PRIORITY_LATER):
+        """Queue a GIF for decoding; asking again with a lower number moves it up."""
+        key = (path, scale)
+        with self.lock:
+            if key in self.started:
+                return
+            self.done.setdefault(key, threading.Event())
+        self.queue.put((priority, next(self.order), key))
+        if not self.threads:
+            self.start()
+
+    def start(self):
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def _work(self):
+        while True:
+            priority, order, key = self.queue.get()
+            with allocations.gate:
+                self._decode(key)
+
+    def _decode(self, key):
+        with self.lock:
+            if key in self.started or key not in self.done:
+                return  # queued again at another priority, or forgotten since
+            self.started.add(key)
+        try:
+            raw = decode_gif(*key)
+        except Exception as error:  # raised by get() for whoever needs it
+            raw = error
+        with self.lock:
+            self.decoded[key] = raw
+            self.done[key].set()
+        self.ready.put(key)
+
+    def pump(self, budget_ms=ASSET_PUMP_MS):
+        """Main thread, once per frame: convert decoded GIFs until the budget runs out."""
+        deadline = time.perf_counter() + budget_ms / 1000
+        while time.perf_counter() < deadline:
+            with self.lock:
+                key = next(iter(self.unconverted), None)
+                if key is not None:
+                    self.unconverted.discard(key)
+                    frames = self.frames[key]
+            if key is not None:
+                # In place, so whoever got the list from get() draws the converted ones too
+                frames[:] = [surface.convert_alpha() for surface in frames]
+                continue
+            try:
+                key = self.ready.get_nowait()
+            except queue.Empty:
+                return
+            with self.lock:
+                raw = self.decoded.pop(key, None)
+                if raw is None:
+                    continue  # forgotten, or already taken by get()
+                if isinstance(raw, Exception):
+                    self.failed[key] = raw
+                    continue
+                self.frames[key] = self.surfaces(raw)  # the pixels live in the surfaces now
+                self.unconverted.add(key)
+
+    @staticmethod
+    def surfaces(raw):
+        return [pygame.image.frombuffer(data, size, "RGBA") for data, size in raw]
+
+    def get(self, path, scale=None):
+        """
+        Return the frames for a GIF, waiting for it if it isn't decoded yet.
+
+        Safe from loading threads. Frames that haven't been through
+        convert_alpha() yet still draw correctly; pump() converts them on
+        the main thread, in the same list.
+        """
+        key = (path, scale)
+        while True:
+            with self.lock:
+                frames = self.frames.get(key)
+                if frames is not None:
+                    return frames
+                if key in self.failed:
+                    raise self.failed[key]
+                if key in self.done and self.done[key].is_set():
+                    raw = self.decoded.pop(key)
+                    if isinstance(raw, Exception):
+                        self.failed[key] = raw
+                        raise raw
+                    frames = self.frames[key] = self.surfaces(raw)
+                    if threading.current_thread() is threading.main_thread() and pygame.display.get_surface():
+                        frames[:] = [surface.convert_alpha() for surface in frames]
+                    else:
+                        self.unconverted.add(key)
+                    return frames
+            self.request(path, scale, PRIORITY_NOW)
+            with self.lock:
+                done = self.done.get(key)
+            if done is not None:
+                with allocations.waiting():
+                    done.wait()
+            # Either decoded now, or forgotten meanwhile and asked for again
+
+    def forget(self, path, scale=None):
+        """
+        Drop a GIF's frames (whoever still holds them keeps them); asking
+        again decodes it again. Returns False, and does nothing, while it's
+        still being decoded.
+        """
+        key = (path, scale)
+        with self.lock:
+            done = self.done.get(key)
+            if done is None:
+                return True
+            if not done.is_set():
+                return False
+            del self.done[key]
+            self.started.discard(key)
+            self.decoded.pop(key, None)
+            self.frames.pop(key, None)
+            self.unconverted.discard(key)
+            self.failed.pop(key, None)
+            return True
+
+    def progress(self):
+        """(GIFs finished, GIFs requested)."""
+        return len(self.frames) + len(self.failed), len(self.done)
+
+    def finished(self):
+        converted, requested = self.progress()
+        return converted >= requested
+
+
+assets = AssetPrefetcher()
@@ -0,0 +1,73 @@
+# src/benchmark.py
+"""
+Fight simulation benchmark.
+
+Steps AI-controlled fighters through step_fight() with movement and timers
+run row by row and then with NumPy (see physics.py), and prints the time
+per tick and the state checksum for each. The checksums must match; the
+times show where VECTOR_MIN_FIGHTERS should sit.
+
+    python src/benchmark.py
+    python src/benchmark.py --fighters 2 8 16 64 --ticks 3000
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import config
+import physics
+from ai import AIControls
+from rewind import pack_fighter
+from sprite import Fighter, party_spawns
+from ecs import FighterStore
+
+
+def make_fighters(count):
+    store = FighterStore(count)
+    fighters = [Fighter(x, y, store=store) for x, y in party_spawns(count)]
+    for i, fighter in enumerate(fighters):
+        fighter.controls = AIControls(fighter, fighters[(i + 1) % count], config, seed=i)
+    return fighters
+
+
+def run(count, ticks, vector_min):
+    """Best µs per tick over a few runs, and the checksum of the last one."""
+    physics.VECTOR_MIN_FIGHTERS = vector_min
+    best = None
+    for _ in range(5):
+        fighters = make_fighters(count)
+        start = time.perf_counter()
+        for _ in range(ticks):
+            physics.step_fight(fighters)
+        seconds = (time.perf_counter() - start) / ticks
+        best = seconds if best is None else min(best, seconds)
+    checksum = physics.state_checksum(b"".join(pack_fighter(fighter) for fighter in fighters))
+    return best * 1e6, checksum
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Googley Fighter simulation benchmark")
+    parser.add_argument("--fighters", type=int, nargs="+", default=[2, 16, 64])
+    parser.add_argument("--ticks", type=int, default=2000)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    print(f"{'fighters':>8} {'rows µs/tick':>13} {'numpy µs/tick':>14}  checksums")
+    for count in args.fighters:
+        rows, rows_checksum = run(count, args.ticks, vector_min=count + 1)
+        vector, vector_checksum = run(count, args.ticks, vector_min=0)
+        same = "same" if rows_checksum == vector_checksum else "DIFFERENT"
+        print(f"{count:>8} {rows:>13.1f} {vector:>14.1f}  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+# src/commands.py
+"""
+Command input (special move) recognition for Googley Fighter.
+
+Each player gets an InputBuffer (a small ring of recent inputs) and a
+CommandReader. Every frame the reader turns the newest input into tokens and
+advances a set of active states through a trie compiled from every
+character's moves, so the cost per frame depends on how many partial inputs
+are in progress, not on how many moves exist.
+
+Directions use numpad notation relative to the opponent:
+
+    7 8 9      4 = back, 6 = forward
+    4 5 6      2 = down, 5 = neutral
+    1 2 3
+
+Buttons are "A" (attack) and "F" (fireball), recognised on press.
+"""
+
+import json
+import os
+from array import array
+from config import INPUT_BUFFER_FRAMES, COMMAND_MAX_ACTIVE
+
+MOVES_PATH = os.path.join("assets", "data", "moves.json")
+
+
+class Move:
+    """One special move loaded from moves.json."""
+    def __init__(self, name, input, window, action, damage=None, speed=None, range=None):
+        self.name = name
+        self.input = tuple(input)
+        self.window = window      # frames allowed from first to last token
+        self.action = action      # "attack" or "fireball"
+        self.damage = damage
+        self.speed = speed
+        self.range = range
+
+    def __repr__(self):
+        return f"Move({self.name!r}, {' '.join(self.input)})"
+
+
+class InputBuffer:
+    """
+    Fixed-size ring of the last few frames of (dx, dy, attack, fireball) input,
+    packed into arrays: four bytes of state and a frame number per slot.
+    """
+    def __init__(self, size=INPUT_BUFFER_FRAMES):
+        self.size = size
+        self.frames = array("i", bytes(4 * size))
+        self.states = array("b", bytes(4 * size))  # dx, dy, attack, fireball for each slot
+        self.head = 0    # next slot to write
+        self.count = 0
+
+    def push(self, frame, state):
+        dx, dy, attack, fireball = state
+        states = self.states
+        i = self.head * 4
+        states[i] = dx
+        states[i + 1] = dy
+        states[i + 2] = attack
+        states[i + 3] = fireball
+        self.frames[self.head] = frame
+        self.head = (self.head + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def state(self, slot):
+        states = self.states
+        i = slot * 4
+        return states[i], states[i + 1], bool(states[i + 2]), bool(states[i + 3])
+
+    def latest(self):
+        """Return (frame, state) for the newest entry, or None if empty."""
+        if not self.count:
+            return None
+        i = (self.head - 1) % self.size
+        return self.frames[i], self.state(i)
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        """Yield (frame, state) from newest to oldest."""
+        for n in range(1, self.count + 1):
+            i = (self.head - n) % self.size
+            yield self.frames[i], self.state(i)
+
+
+class TrieNode:
+    __slots__ = ("children", "moves", "characters", "max_window")
+
+    def __init__(self):
+        self.children = {}
+        self.moves = {}          # character -> Move ending at this node
+        self.characters = set()  # characters with a move somewhere below
+        self.max_window = 0      # longest window of any move below
+
+
+class CommandMatcher:
+    """A trie over every character's command inputs, compiled once."""
+    def __init__(self, moves_by_character):
+        self.root = TrieNode()
+        self.moves_by_character = moves_by_character
+        self.characters = set(moves_by_character)
+        for character, moves in moves_by_character.items():
+            for move in moves:
+                self.add(character, move)
+
+    def add(self, character, move):
+        node = self.root
+        for token in move.input:
+            node = node.children.setdefault(token, TrieNode())
+            node.characters.add(character)
+            node.max_window = max(node.max_window, move.window)
+        # Longer inputs win if two moves share the same ending
+        if character not in node.moves or len(move.input) > len(node.moves[character].input):
+            node.moves[character] = move
+
+    def key_for(self, character):
+        return character if character in self.characters else "default"
+
+    def moves_for(self, character):
+        """Every Move a character can perform."""
+        return self.moves_by_character[self.key_for(character)]
+
+
+def load_moves(path=MOVES_PATH):
+    """Read moves.json into {character: [Move, ...]}, with defaults merged in."""
+    with open(path) as f:
+        data = json.load(f)
+
+    defaults = [Move(**entry) for entry in data.get("default", [])]
+    moves = {"default": defaults}
+    for character, entries in data.items():
+        if character != "default":
+            moves[character] = [Move(**entry) for entry in entries] + defaults
+    return moves
+
+
+_matcher = None
+
+
+def get_matcher():
+    """Return the shared CommandMatcher, compiling it on first use."""
+    global _matcher
+    if _matcher is None:
+        _matcher = CommandMatcher(load_moves())
+    return _matcher
+
+
+def direction_token(dx, dy, facing):
+    """Turn raw (dx, dy) into a numpad token relative to `facing` (+1 or -1)."""
+    forward = dx * facing
+    row = 0 if dy > 0 else (2 if dy < 0 else 1)  # down, neutral, up
+    return str(row * 3 + forward + 2)
+
+
+class CommandReader:
+    """Recognises special moves for one player, one frame at a time."""
+    def __init__(self, character=None, matcher=None):
+        self.matcher = matcher or get_matcher()
+        self.character = self.matcher.key_for(character)
+        self.buffer = InputBuffer()
+        self.active = {}  # TrieNode -> frame its input started on
+        self.facing = 1
+
+    def moves(self):
+        return self.matcher.moves_for(self.character)
+
+    def reset(self):
+        self.buffer.clear()
+        self.active.clear()
+        self.facing = 1
+
+    def save(self):
+        """Everything feed() depends on, so rollback can put it back (see networking.py)."""
+        buffer = self.buffer
+        return buffer.frames[:], buffer.states[:], buffer.head, buffer.count, dict(self.active), self.facing
+
+    def restore(self, saved):
+        frames, states, head, count, active, facing = saved
+        buffer = self.buffer
+        buffer.frames, buffer.states, buffer.head, buffer.count = frames[:], states[:], head, count
+        self.active, self.facing = dict(active), facing
+
+    def tokens(self, dx, dy, attack, fireball, facing):
+        """Tokens produced this frame: a direction change, then button presses."""
+        previous = self.buffer.latest()
+        prev_dx, prev_dy, prev_attack, prev_fireball = previous[1] if previous else (0, 0, False, False)
+        prev_facing, self.facing = self.facing, facing
+
+        tokens = []
+        token = direction_token(dx, dy, facing)
+        if not previous or token != direction_token(prev_dx, prev_dy, prev_facing):
+            tokens.append(token)
+        if attack and not prev_attack:
+            tokens.append("A")
+        if fireball and not prev_fireball:
+            tokens.append("F")
+        return tokens
+
+    def feed(self, frame, dx, dy, attack, fireball, facing):
+        """
+        Record this frame's input and return the Move it completes, or None.
+
+        A state that doesn't match a token just waits, so small slips between
+        directions (2, 1, 3, 6) still count as long as the window holds.
+        """
+        tokens = self.tokens(dx, dy, attack, fireball, facing)
+        self.buffer.push(frame, (dx, dy, attack, fireball))
+
+        # Drop states whose longest possible move has already timed out
+        active = {node: start for node, start in self.active.items()
+                  if frame - start <= node.max_window}
+
+        completed = None
+        character = self.character
+        root = self.matcher.root
+        for token in tokens:
+            advanced = []
+            for node, start in list(active.items()) + [(root, frame)]:
+                child = node.children.get(token)
+                if child is None or character not in child.characters:
+                    continue
+                advanced.append((child, start))
+                move = child.moves.get(character)
+                if move and frame - start <= move.window:
+                    if completed is None or len(move.input) > len(completed.input):
+                        completed = move
+            for child, start in advanced:
+                # A later start always leaves more time, so keep the newest
+                if active.get(child, -1) < start:
+                    active[child] = start
+
+        if len(active) > COMMAND_MAX_ACTIVE:
+            newest = sorted(active.items(), key=lambda item: item[1])[-COMMAND_MAX_ACTIVE:]
+            active = dict(newest)
+        self.active = active
+
+        if completed:
+            # Don't let the same motion fire twice
+            self.active.clear()
+        return completed
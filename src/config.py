@@ -13,3 +13,87 @@ BLUE_SPAWN = (SCREEN_WIDTH - 300, SCREEN_HEIGHT - 200)
 # AI Bot Settings
 AI_ATTACK_RANGE = 50       # Pixels, how close AI needs to be to attack
 AI_ATTACK_COOLDOWN = 45    # Frames between attacks (1 sec at 60 FPS)
+AI_ADAPTIVE = True         # Learn the player's habits and counter them
+AI_NGRAM_ORDER = 2         # How many previous actions the player model looks at
+AI_MODEL_MAX_COUNT = 1000  # Counts are halved past this, so old habits fade
+AI_PREDICT_THRESHOLD = 0.35  # Act on a prediction once it's at least this likely
+AI_DODGE_DISTANCE = 220    # Pixels, jump over fireballs closer than this
+AI_PUNISH_CHANCE = 0.3     # Per-frame chance to punish an attack on cooldown
+AI_DISTANCE_BUCKET = 32    # Pixels per spacing bucket in the player model
+
+# Collision settings
+PIXEL_HITBOXES = True           # Use per-frame masks after the rect check passes
+SHOW_COLLISION_STATS = False    # Draw collision query cost in the HUD
+
+# Command input settings
+INPUT_BUFFER_FRAMES = 32    # Frames of input history kept per player
+COMMAND_MAX_ACTIVE = 32     # Cap on partial special-move inputs tracked at once
+
+# Training mode (rewind) settings
+REWIND_SECONDS = 10             # Seconds of fight history kept for rewinding
+REWIND_KEYFRAME_INTERVAL = 60   # Frames per keyframe; the rest are stored as deltas
+REWIND_MAX_FIREBALLS = 4        # Fireball slots saved per fighter per frame
+
+# Determinism
+AI_SEED = 2025              # AI random seed, so a fight replays identically
+CHECKSUM_HISTORY = 600      # Per-tick state checksums kept for comparison
+VECTOR_MIN_FIGHTERS = 32    # Fighters in a store before movement and timers switch to NumPy (party modes)
+
+# Particle effects
+PARTICLE_MAX = 4096             # Hard cap; the oldest particle is replaced when full
+PARTICLE_GRAVITY = 0.15         # Pixels per frame added to falling speed
+SHOW_PARTICLE_STATS = False     # Draw particle count and update/draw time in the HUD
+
+# Match history
+HISTORY_DB_PATH = "match_history.sqlite3"
+HISTORY_BATCH_SIZE = 500        # Most matches written in one transaction
+HISTORY_FLUSH_SECONDS = 0.5     # How long the writer waits for more results to batch
+
+# Adaptive quality
+QUALITY_GOVERNOR = True         # Lower effects automatically when frames run long
+QUALITY_WINDOW = 60             # Frames averaged before deciding
+QUALITY_DOWN_AT = 0.9           # Step down above this fraction of the frame budget
+QUALITY_UP_AT = 0.5             # Step back up below this fraction
+QUALITY_COOLDOWN = 120          # Frames to wait after a change before the next one
+SHOW_QUALITY_STATS = False      # Draw the current quality level (and last rematch reset time) in the HUD
+
+# Simulation thread
+SIMULATION_THREAD = True        # Run fights on their own thread (training and low-latency input stay inline)
+SIM_MAX_CATCH_UP = 5            # Ticks behind before the simulation stops catching up
+SIM_INPUT_POLL_MS = 1           # How often the main thread pumps input while it waits for a tick
+
+# Metrics export
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = None             # Prometheus endpoint at /metrics, e.g. 9108; or main.py --metrics-port
+METRICS_SNAPSHOT_PATH = None    # e.g. "metrics.prom", rewritten for boxes nothing scrapes
+METRICS_SNAPSHOT_SECONDS = 15
+
+# Input latency
+LOW_LATENCY_INPUT = False       # Sleep before reading input instead of after the flip
+LATENCY_MARGIN_MS = 1.0         # Slack between a frame's predicted finish and its deadline
+LATENCY_SAMPLES = 600           # Recent key presses kept for the latency report
+SHOW_LATENCY_STATS = False      # Show input-to-display latency in the fight
+
+# Asset prefetching
+ASSET_WORKERS = 2               # Threads decoding GIFs in the background
+ASSET_PUMP_MS = 2               # Main-thread time per frame for converting decoded GIFs
+ASSET_CACHE_DIR = "cache"       # Pre-scaled copies of images, rebuilt when the source changes
+
+# Audio
+AUDIO_VOICES = 6                # Channels shared by sound effects (music has its own)
+AUDIO_QUEUE = 64                # Effects waiting for the main thread; the oldest are dropped past this
+
+# Netcode
+NET_HOST = "127.0.0.1"          # The netcode harness and its relay only use localhost
+NET_MAX_ROLLBACK = 8            # Frames a client predicts ahead of its peer before it stalls
+NET_MAX_INPUTS_PER_PACKET = 64  # Unacknowledged inputs resent in each packet
+NET_FINISH_SECONDS = 3.0        # How long a finished client waits for its peer to catch up
+
+# Character roster
+ROSTER_PREFETCH = 3             # Characters whose fight animations decode while the menus are up
+ROSTER_LOADED_PACKS = 8         # Characters kept decoded; past this the least recently used are dropped
+
+# Allocation tracking (debug)
+TRACK_ALLOCATIONS = False       # Trace Python allocations made by each frame's update and draw
+SHOW_ALLOCATION_STATS = False   # Draw bytes allocated per frame over the scene
+ALLOCATION_WINDOW = 120         # Recent frames kept for the allocation report
@@ -17,10 +17,12 @@ class Controls:
         self.attack_key = attack
         self.fireball_key = fireball
         self.speed = speed
+        # Set by the simulation thread; None means ask pygame directly
+        self.keys = None
 
     def get_input(self, fighter=None):
         """Return (dx, dy, attack, fireball) based on pressed keys."""
-        keys = pygame.key.get_pressed()
+        keys = self.keys if self.keys is not None else pygame.key.get_pressed()
         dx = dy = 0
         attack = False
         fireball = False
@@ -40,6 +42,13 @@ class Controls:
 
         return dx, dy, attack, fireball
 
+    def bindings(self):
+        """Every key these controls read."""
+        return (self.left, self.right, self.up, self.down, self.attack_key, self.fireball_key)
+
+    def reset(self):
+        """Keyboard controls keep no state between rounds."""
+
 
 class Player1Controls(Controls):
     """WASD + Left Shift for Player 1."""
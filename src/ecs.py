@@ -0,0 +1,107 @@
+# src/ecs.py
+"""
+Component storage for fighters.
+
+Every number a fighter changes during a fight lives in a FighterStore: one
+array per field, one row per fighter, grouped below by component. Each
+field is an array.array (so reading one fighter's value gives a plain int)
+with a NumPy view over the same memory, so the systems in physics.py can
+update every fighter in a match with a handful of array operations.
+
+Fighter (sprite.py) is a view over one row: @component_view turns every
+field into a property, so fighter.health still works everywhere. A row
+costs FighterStore.row_bytes() bytes (under 100); images, masks and frame
+lists are shared between fighters using the same character.
+"""
+
+from array import array
+import numpy as np
+
+# component -> ((field, array typecode), ...)
+#   b = int8 (flags and facing), h = int16, i = int32
+COMPONENTS = {
+    "transform": (
+        ("pos_x", "i"), ("pos_y", "i"),  # fixed point, see physics.py
+        ("facing", "b"),                 # +1 right, -1 left
+        ("width", "h"), ("height", "h"),
+    ),
+    "physics": (
+        ("speed", "h"), ("vertical_speed", "i"), ("jump_speed", "i"), ("gravity", "i"),
+        ("max_jump_height", "h"), ("is_jumping", "b"),
+    ),
+    "health": (
+        ("health", "h"), ("max_health", "h"),
+        ("damage_timer", "h"), ("damage_cooldown", "h"), ("damage_anim_timer", "h"),
+        ("stun_timer", "h"), ("is_damaged", "b"),
+    ),
+    "cooldowns": (
+        ("attack_timer", "h"), ("attack_cooldown", "h"), ("attack_damage", "h"), ("attack_range", "h"),
+        ("fireball_timer", "h"), ("fireball_cooldown", "h"), ("fireball_damage", "h"), ("fireball_speed", "h"),
+        ("is_attacking", "b"), ("is_shooting", "b"),
+    ),
+    "animation": (
+        ("current_frame", "h"), ("frame_count", "h"), ("frame_delay", "h"),
+        ("damage_frame_index", "h"), ("damage_frame_count", "h"), ("damage_frame_delay", "h"),
+    ),
+    "controller": (
+        ("tick", "i"), ("specials_used", "h"),
+    ),
+}
+FIELDS = [field for fields in COMPONENTS.values() for field in fields]
+FLAGS = {"is_jumping", "is_damaged", "is_attacking", "is_shooting"}
+
+
+class FighterStore:
+    """Component arrays for a fixed number of fighters."""
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.arrays = {}  # field -> array.array, for one fighter at a time
+        self.views = {}   # field -> NumPy view of the same memory, for systems
+        for name, code in FIELDS:
+            column = array(code, bytes(array(code).itemsize * capacity))
+            self.arrays[name] = column
+            self.views[name] = np.frombuffer(column, dtype=column.typecode)
+        self.rects = [None] * capacity  # each fighter's pygame.Rect, kept in sync by systems
+        self.count = 0
+
+    def add(self, rect):
+        """Claim the next row for a fighter and return its id."""
+        if self.count == self.capacity:
+            raise ValueError(f"FighterStore is full ({self.capacity} fighters)")
+        fighter_id = self.count
+        self.rects[fighter_id] = rect
+        self.count += 1
+        return fighter_id
+
+    @staticmethod
+    def row_bytes():
+        """Memory one fighter takes in the store."""
+        return sum(array(code).itemsize for name, code in FIELDS)
+
+
+def store_property(name):
+    if name in FLAGS:
+        def get(self):
+            return bool(self.columns[name][self.id])
+    else:
+        def get(self):
+            return self.columns[name][self.id]
+
+    def set(self, value):
+        self.columns[name][self.id] = value
+    return property(get, set)
+
+
+def component_view(cls):
+    """Class decorator: expose every store field as an attribute of `cls`."""
+    for name, code in FIELDS:
+        setattr(cls, name, store_property(name))
+    return cls
+
+
+def by_store(fighters):
+    """Group fighters by the store they live in: {store: [fighter, ...]}."""
+    groups = {}
+    for fighter in fighters:
+        groups.setdefault(fighter.store, []).append(fighter)
+    return groups
@@ -1,22 +1,42 @@
 import pygame
+from hitbox import collide
 
 class Fireball(pygame.sprite.Sprite):
+    # Shared by every fireball, built once by load_assets()
+    IMAGE = None
+    MASK = None
+
+    @classmethod
+    def load_assets(cls):
+        """Build the fireball image and mask (call while loading, not mid-fight)."""
+        if cls.IMAGE is not None:
+            return
+        cls.IMAGE = pygame.Surface((32, 16), pygame.SRCALPHA)
+        pygame.draw.ellipse(cls.IMAGE, (255, 140, 0), [0, 0, 32, 16])
+        cls.MASK = pygame.mask.from_surface(cls.IMAGE)
+
     def __init__(self, x, y, direction, owner, speed=10, damage=15):
         super().__init__()
-        self.image = pygame.Surface((32, 16), pygame.SRCALPHA)
-        pygame.draw.ellipse(self.image, (255, 140, 0), [0, 0, 32, 16])
+        Fireball.load_assets()
+        self.image = Fireball.IMAGE
+        self.mask = Fireball.MASK
         self.rect = self.image.get_rect(center=(x, y))
         self.direction = direction 
         self.speed = speed
         self.owner = owner
         self.damage = damage
 
-    def update(self, fighters_group):
+    def update(self, fighters_group, hits=None):
+        """Fly one step; hits go into `hits` if given, otherwise land right away."""
         self.rect.x += self.speed * self.direction
         if self.rect.right < 0 or self.rect.left > 900:
             self.kill()
         for fighter in fighters_group:
-            if fighter != self.owner and self.rect.colliderect(fighter.rect):
+            if fighter != self.owner and collide(self.rect, self.mask, fighter.rect, fighter.hurt_mask):
                 from_left = self.rect.centerx < fighter.rect.centerx
-                fighter.take_damage(self.damage, from_left=from_left)
+                if hits is None:
+                    fighter.take_damage(self.damage, from_left=from_left)
+                else:
+                    hits.append((fighter, self.damage, from_left))
                 self.kill()
+                return
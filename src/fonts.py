@@ -0,0 +1,29 @@
+# src/fonts.py
+"""
+Font registry. Each font is opened once per size, the first time something
+is drawn with it, instead of all of them while the game starts up.
+"""
+
+import os
+import pygame
+from startup import profile
+
+FONT_FILES = {
+    "regular": os.path.join("assets", "fonts", "Minecraft.ttf"),
+    "bold": os.path.join("assets", "fonts", "MinecraftBold.otf"),
+}
+
+_fonts = {}  # (name, size) -> pygame.font.Font
+
+
+def get_font(name, size):
+    font = _fonts.get((name, size))
+    if font is None:
+        path = FONT_FILES[name]
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Font file not found: {path}")
+        if not pygame.font.get_init():
+            pygame.font.init()
+        with profile.span(f"font {os.path.basename(path)} {size}"):
+            font = _fonts[(name, size)] = pygame.font.Font(path, size)
+    return font
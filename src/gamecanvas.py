@@ -1,15 +1,28 @@
-import os
+import time
 import pygame
-import sys
 import config
-from PIL import Image
-from sounds import BACKGROUND_SOUND, BUTTON_SOUND
+from sounds import audio, BACKGROUND_SOUND
+from fonts import get_font
+from startup import profile
 from sprite import create_fighters
+from assets import assets
+from roster import get_roster
 from controls import Player1Controls, Player2Controls
-from ai import AIControls
-from fireball import Fireball
-from config import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, GROUND_Y
-from config import RED_SPAWN, BLUE_SPAWN
+from ai import AIControls, AdaptiveAIControls
+from config import SCREEN_WIDTH, SCREEN_HEIGHT, FPS
+from hitbox import collision_stats
+from collections import deque
+from history import MatchHistory
+from particles import ParticleSystem
+from quality import governor
+from physics import step_fight, state_checksum
+from rewind import Rewinder, pack_game
+from simulation import SimulationThread, KeyState, snapshot_game
+from latency import LatencyProbe, FrameScheduler
+from allocations import allocations
+from metrics import (metrics, TICK_SECONDS, STEP_SECONDS, FRAME_SECONDS, TICKS,
+                     ACTIVE_MATCHES, MATCHES, FIREBALLS, HITS, REMATCH_SECONDS)
+from scenes import MenuScene, InstructionsScene, CharacterSelectScene, FightScene
 
 
 class GameCanvas:
@@ -18,17 +31,20 @@ class GameCanvas:
         self.fighters = fighters_group
         self.red_fighter = red_fighter
         self.blue_fighter = blue_fighter
+        # Everyone the simulation steps; red and blue are the two the HUD follows
+        self.roster = [red_fighter, blue_fighter] if red_fighter else []
         self.fight_start_time = None
         self.selected_mode = None
+        self.loaded_choices = None
+        self.rematch_us = 0  # how long the last in-place reset took
+        self.rewinder = None  # only set in training mode
 
         # Initialize PyGame display
-        font_path = os.path.join("assets", "fonts", "Minecraft.ttf")
-        font_title_path = os.path.join("assets", "fonts", "MinecraftBold.otf")
-        self.font =pygame.font.Font(font_path)
-        self.font_title = pygame.font.Font(font_title_path)
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        with profile.span("display"):
+            self.screen = self.create_display()
         pygame.display.set_caption("Googley Fighter")
         self.clock = pygame.time.Clock()
+        self.mouse_pos = pygame.mouse.get_pos()  # kept up to date from MOUSEMOTION events
         self.running = True
 
         # Health
@@ -42,85 +58,264 @@ class GameCanvas:
         # Timer settings
         self.time_remaining = 60  # seconds
         self.total_time = 60  # seconds
-        self.start_ticks = pygame.time.get_ticks()  # starting time
-
-        # Fonts: load Minecraft.ttf
-        font_path = os.path.join("assets", "fonts", "Minecraft.ttf")
-        if not os.path.exists(font_path):
-            raise FileNotFoundError(f"Font file not found: {font_path}")
-    
-        font_title_path = os.path.join("assets", "fonts", "MinecraftBold.otf")
-        if not os.path.exists(font_path):
-            raise FileNotFoundError(f"Font file not found: {font_title_path}")
-
-        # Predefine commonly used fonts
-        self.font_tiny = pygame.font.Font(font_path, 12)
-        self.font_small = pygame.font.Font(font_path, 24)
-        self.font_medium = pygame.font.Font(font_path, 36)
-        self.font_title = pygame.font.Font(font_title_path, 72)
-        
+        self.round_tick = 0
+
+        # Rolling checksum of the fight state, updated every tick
+        self.checksum = 0
+        self.checksum_history = deque(maxlen=config.CHECKSUM_HISTORY)
+
+        # Hit sparks, fireball trails, KO bursts
+        self.effects = ParticleSystem()
+
+        # Finished matches are saved by a background writer
+        self.history = MatchHistory()
+        self.hits_landed = {1: 0, 2: 0}
+
+        # Things the simulation wants shown (hit sparks, KOs), drained by the main thread
+        self.events = []
+        self.simulation = None  # SimulationThread while a threaded fight runs
+        self.simulation_path = None  # "thread" or "inline": how the last fight was stepped
+        self.keys = KeyState()  # held keys for an inline fight, fed from key events like the thread's
+        self.keyboard = []  # the fighters' keyboard controls, reading self.keys or the thread's
+        self.view = None        # FrameSnapshot being drawn
+
+        # Input-to-display latency
+        self.input_stamp = None  # when the newest key press reached the simulation
+        self.latency = LatencyProbe()
+        self.scheduler = FrameScheduler() if config.LOW_LATENCY_INPUT else None
+
         self.label_color = (255, 255, 255)  # white for player labels
-        self.state = "menu" # initial state
         self.game_over = False
+        self.paused = False
 
-    def reset_game(self):
-        """Reset the game state after Game Over."""
-        self.red_fighter.health = self.max_health
-        self.blue_fighter.health = self.max_health
-        self.red_fighter.damage_timer = 0
-        self.blue_fighter.damage_timer = 0
-        self.time_remaining = self.total_time
-        self.fight_start_time = None
+        # Scenes: one loop in run() drives whichever one is current
+        self.scenes = {
+            "menu": MenuScene(self),
+            "instructions": InstructionsScene(self),
+            "character_select": CharacterSelectScene(self),
+            "playing": FightScene(self),
+        }
+        self.scene = None
+        self.next_scene = None
+        self.frame_work_ms = 0  # time spent on the last frame before sleeping
+        self.quality = governor
+        self.quality.enabled = config.QUALITY_GOVERNOR
 
-        # Reset positions
-        self.red_fighter.rect.topleft = RED_SPAWN
-        self.blue_fighter.rect.topleft = BLUE_SPAWN
+    # Fonts are opened the first time something is drawn with them
+    @property
+    def font_tiny(self):
+        return get_font("regular", 12)
 
-        if self.selected_mode == "singleplayer":
-            self.blue_fighter.controls = AIControls(self.blue_fighter, self.red_fighter, config)
-        else:
-            self.blue_fighter.controls = Player2Controls()
+    @property
+    def font_small(self):
+        return get_font("regular", 24)
 
-        # Switch to the game state
-        self.state = "menu"
+    @property
+    def font_medium(self):
+        return get_font("regular", 36)
+
+    @property
+    def font_title(self):
+        return get_font("bold", 72)
+
+    def reset_game(self):
+        """
+        Reset the game state after Game Over.
+
+        The fighters are reset in place, so a rematch reuses their frames,
+        masks and controllers instead of loading them again.
+        """
+        self.stop_simulation()
+        ACTIVE_MATCHES.set(0)
+        start = time.perf_counter_ns()
+        for fighter in self.fighters:
+            fighter.reset()
+        self.time_remaining = self.total_time
+        self.round_tick = 0
+        self.checksum = 0
+        self.checksum_history.clear()
+        self.effects.clear()
+        self.events.clear()
+        self.input_stamp = None
+        self.hits_landed[1] = self.hits_landed[2] = 0
+        self.fight_start_time = None
         self.game_over = False
         self.paused = False
-        BACKGROUND_SOUND.stop()
+        if self.rewinder:
+            self.rewinder.reset()
+        self.rematch_us = (time.perf_counter_ns() - start) / 1000
+        REMATCH_SECONDS.set(self.rematch_us / 1e6)
+
+        audio.stop_music()
+
+    def create_display(self):
+        """Open the window; low-latency mode asks for vsync so flips line up with vblank."""
+        size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+        if config.LOW_LATENCY_INPUT:
+            try:
+                return pygame.display.set_mode(size, pygame.SCALED, vsync=1)
+            except pygame.error:
+                pass  # no vsync here; input is still read as late as possible
+        return pygame.display.set_mode(size)
 
     def handle_events(self):
+        """Pump the event queue once per frame and pass events to the scene."""
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    self.running = False
-                elif event.key == pygame.K_p and not self.game_over:
-                    self.paused = not getattr(self, 'paused', False)
-                    if self.paused:
-                        BACKGROUND_SOUND.stop()
-                    else:
-                        BACKGROUND_SOUND.play(loops=-1)
-                elif event.key == pygame.K_r and self.game_over:
-                    self.reset_game()
+            else:
+                if event.type == pygame.MOUSEMOTION:
+                    self.mouse_pos = event.pos
+                self.scene.handle_event(event)
+
+    def change_scene(self, name):
+        """
+        Switch to another scene once its assets are loaded.
+
+        The current scene keeps running while the next one preloads in the
+        background; finish_transition() swaps them when it is ready.
+        """
+        if self.next_scene is not None:
+            return
+        self.next_scene = self.scenes[name]
+        self.next_scene.start_preload()
+
+    def finish_transition(self):
+        if self.next_scene is None or not self.next_scene.ready():
+            return
+        if self.scene is not None:
+            self.scene.exit()
+        self.scene, self.next_scene = self.next_scene, None
+        self.scene.enter()
+
+        for name in self.scene.next_scenes:
+            self.scenes[name].start_preload()
 
     def update(self):
         if not self.paused and not self.game_over:
-            # Update fighters (they handle taking damage internally)
-            self.red_fighter.update([self.blue_fighter])
-            self.blue_fighter.update([self.red_fighter])
-
-            # Check health
-            if self.red_fighter.health <= 0 or self.blue_fighter.health <= 0:
-                if not self.game_over:
-                    BACKGROUND_SOUND.stop()
+            tick_start = time.perf_counter()
+            # Both fighters act at once (they handle taking damage internally)
+            hits = step_fight(self.roster)
+            STEP_SECONDS.observe(time.perf_counter() - tick_start)
+            HITS.inc(len(hits))
+            for target, amount, from_left in hits:
+                x = target.rect.left if from_left else target.rect.right
+                self.events.append(("hit", x, target.rect.centery, from_left))
+                self.hits_landed[2 if target is self.red_fighter else 1] += 1
+
+            # Decrease countdown timer (counted in whole ticks)
+            self.round_tick += 1
+            self.time_remaining = max(0, self.total_time - self.round_tick / FPS)
+
+            # Check health, then the clock
+            ko = self.red_fighter.health <= 0 or self.blue_fighter.health <= 0
+            if ko or self.time_remaining <= 0:
+                audio.stop_music()
+                if ko:
+                    loser = self.red_fighter if self.red_fighter.health <= 0 else self.blue_fighter
+                    self.events.append(("ko", loser.rect.centerx, loser.rect.centery))
                 self.game_over = True
+                ACTIVE_MATCHES.set(0)
+                MATCHES.inc()
+                self.finish_match(ko)
+
+            self.checksum = state_checksum(pack_game(self), self.checksum)
+            self.checksum_history.append((self.round_tick, self.checksum))
+
+            FIREBALLS.set(len(self.red_fighter.fireballs) + len(self.blue_fighter.fireballs))
+            TICKS.inc()
+            TICK_SECONDS.observe(time.perf_counter() - tick_start)
+
+    def finish_match(self, ko):
+        """Queue the result for the match history (training isn't recorded)."""
+        if self.selected_mode == "training":
+            return
+        red, blue = self.red_fighter, self.blue_fighter
+        if red.health == blue.health:
+            winner = 0
+        else:
+            winner = 1 if red.health > blue.health else 2
+
+        self.history.record(
+            mode=self.selected_mode,
+            p1_character=self.player1_choice,
+            p2_character=self.player2_choice,
+            winner=winner,
+            ko=int(ko),
+            duration_ticks=self.round_tick,
+            p1_health=red.health,
+            p2_health=blue.health,
+            p1_hits=self.hits_landed[1],
+            p2_hits=self.hits_landed[2],
+            p1_specials=red.specials_used,
+            p2_specials=blue.specials_used,
+        )
 
-            # Decrease countdown timer
-            self.time_remaining = max(0, self.time_remaining - 1 / FPS)
+    def take_events(self):
+        events, self.events = self.events, []
+        return events
+
+    def apply_events(self, events):
+        """Turn simulation events into particles (main thread only)."""
+        for event in events:
+            if event[0] == "hit":
+                self.effects.hit_spark(*event[1:])
+            elif event[0] == "ko":
+                self.effects.ko_burst(*event[1:])
+
+    def update_effects(self):
+        """Advance particles; runs every frame, even after the KO."""
+        for fighter in (self.view.red, self.view.blue):
+            for image, rect, direction in fighter.fireballs:
+                self.effects.fireball_trail(rect, direction)
+        self.effects.update()
+
+    def start_simulation(self):
+        """
+        Run the fight on its own thread, unless it's training (which rewinds
+        in place) or low-latency input is on: the scheduler reads input just
+        before the vblank, which only helps if the tick runs right after.
+        """
+        self.stop_simulation()
+        self.keyboard = [fighter.controls for fighter in (self.red_fighter, self.blue_fighter)
+                         if hasattr(fighter.controls, "keys")]
+        if config.SIMULATION_THREAD and not config.LOW_LATENCY_INPUT and self.selected_mode != "training":
+            self.simulation = SimulationThread(self, self.keyboard)
+            self.simulation.start()
+            self.simulation_path = "thread"
+        else:
+            self.keys.attach(self.keyboard)
+            self.simulation_path = "inline"
+
+    def stop_simulation(self):
+        if self.simulation is not None:
+            self.simulation.stop()
+            self.simulation = None
+        self.keys.detach(self.keyboard)
+
+    def update_view(self):
+        """Pick up the newest state to draw, from the simulation thread or directly."""
+        if self.simulation is not None:
+            self.view, events = self.simulation.buffer.take()
+        else:
+            self.view, events = snapshot_game(self), self.take_events()
+        self.apply_events(events)
+
+    def wait_for_tick(self):
+        """
+        Threaded fight: rather than sleep out the frame, keep pumping input
+        until the simulation publishes its next tick (at most one frame).
+        """
+        buffer = self.simulation.buffer
+        deadline = time.perf_counter() + 1 / FPS
+        while self.running and time.perf_counter() < deadline:
+            if buffer.wait_newer(self.view.tick, config.SIM_INPUT_POLL_MS / 1000):
+                return
+            self.handle_events()
 
-    def draw_health_bars(self):
+    def draw_health_bars(self, view):
         # Player 1 Health Bar (Top-Left)
-        red_health_ratio = self.red_fighter.health / self.max_health
+        red_health_ratio = view.red.health / view.red.max_health
         red_bar_rect = pygame.Rect(
             self.health_bar_margin,
             self.health_bar_margin + 20,
@@ -135,7 +330,7 @@ class GameCanvas:
         )
 
         # Player 2 Health Bar (Top-Right)
-        blue_health_ratio = self.blue_fighter.health / self.max_health
+        blue_health_ratio = view.blue.health / view.blue.max_health
         blue_bar_rect = pygame.Rect(
             SCREEN_WIDTH - self.health_bar_margin - int(self.health_bar_width * blue_health_ratio),
             self.health_bar_margin + 20,
@@ -155,7 +350,7 @@ class GameCanvas:
         self.screen.blit(label1, (self.health_bar_margin, self.health_bar_margin))
         self.screen.blit(label2, (SCREEN_WIDTH - self.health_bar_margin - label2.get_width(), self.health_bar_margin))
 
-    def draw_cooldown_bars(self):
+    def draw_cooldown_bars(self, view):
         """Draw attack cooldown bars for both fighters (Hit + Shoot)."""
         bar_width = 100
         bar_height = 8
@@ -163,16 +358,19 @@ class GameCanvas:
         vertical_offset = 20  # shift bars + labels down
 
         # Helper function to draw one cooldown bar
+        full_hud = self.quality.settings["full_hud"]
+
         def draw_bar(x, y, ratio, full_color, label_text, align_right=False):
             color = full_color if ratio >= 1 else (234, 67, 53)
-            label = self.font_tiny.render(label_text, True, self.label_color)
+            if full_hud:
+                label = self.font_tiny.render(label_text, True, self.label_color)
 
-            if align_right:
-                label_x = x + bar_width - label.get_width()
-            else:
-                label_x = x
+                if align_right:
+                    label_x = x + bar_width - label.get_width()
+                else:
+                    label_x = x
 
-            self.screen.blit(label, (label_x, y - label.get_height() - 2))
+                self.screen.blit(label, (label_x, y - label.get_height() - 2))
 
             cooldown_rect = pygame.Rect(x, y, int(bar_width * ratio), bar_height)
             pygame.draw.rect(self.screen, color, cooldown_rect)
@@ -186,11 +384,11 @@ class GameCanvas:
         base_y = self.health_bar_margin + 20 + self.health_bar_height + margin + vertical_offset
 
         # Hit bar
-        ratio = 1 - (self.red_fighter.attack_timer / self.red_fighter.attack_cooldown) if self.red_fighter.attack_cooldown > 0 else 1
+        ratio = 1 - (view.red.attack_timer / view.red.attack_cooldown) if view.red.attack_cooldown > 0 else 1
         draw_bar(base_x, base_y, ratio, (52, 168, 83), "Hit", align_right=False)
 
         # Shoot bar (10px lower than before)
-        ratio = 1 - (self.red_fighter.fireball_timer / self.red_fighter.fireball_cooldown) if self.red_fighter.fireball_cooldown > 0 else 1
+        ratio = 1 - (view.red.fireball_timer / view.red.fireball_cooldown) if view.red.fireball_cooldown > 0 else 1
         draw_bar(base_x, base_y + bar_height + margin + 15, ratio, (255, 165, 0), "Shoot", align_right=False)
 
         # =====================
@@ -200,15 +398,15 @@ class GameCanvas:
         base_y = self.health_bar_margin + 20 + self.health_bar_height + margin + vertical_offset
 
         # Hit bar
-        ratio = 1 - (self.blue_fighter.attack_timer / self.blue_fighter.attack_cooldown) if self.blue_fighter.attack_cooldown > 0 else 1
+        ratio = 1 - (view.blue.attack_timer / view.blue.attack_cooldown) if view.blue.attack_cooldown > 0 else 1
         draw_bar(base_x, base_y, ratio, (52, 168, 83), "Hit", align_right=True)
 
         # Shoot bar (10px lower than before)
-        ratio = 1 - (self.blue_fighter.fireball_timer / self.blue_fighter.fireball_cooldown) if self.blue_fighter.fireball_cooldown > 0 else 1
+        ratio = 1 - (view.blue.fireball_timer / view.blue.fireball_cooldown) if view.blue.fireball_cooldown > 0 else 1
         draw_bar(base_x, base_y + bar_height + margin + 15, ratio, (255, 165, 0), "Shoot", align_right=True)
 
-    def draw_timer(self):
-        remaining = max(0, int(self.time_remaining))
+    def draw_timer(self, view):
+        remaining = max(0, int(view.time_remaining))
         minutes = remaining // 60
         seconds = remaining % 60
         time_text = f"{minutes:01}:{seconds:02}"
@@ -217,436 +415,147 @@ class GameCanvas:
         y = self.health_bar_margin
         self.screen.blit(timer_surface, (x, y))
 
-    def draw_fighter_labels(self):
+    def draw_fighter_labels(self, view):
         """Draw floating labels under each fighter sprite that follow them."""
         # Player 1 label (red fighter)
         red_label = self.font_tiny.render("PLAYER 1", True, (234, 67, 53))
-        red_x = self.red_fighter.rect.centerx - red_label.get_width() // 2
-        red_y = self.red_fighter.rect.bottom + 5  # 5px below sprite
+        red_x = view.red.rect.centerx - red_label.get_width() // 2
+        red_y = view.red.rect.bottom + 5  # 5px below sprite
         self.screen.blit(red_label, (red_x, red_y))
 
         # Player 2 label (blue fighter)
         blue_label = self.font_tiny.render("PLAYER 2", True, (0, 0, 255))
-        blue_x = self.blue_fighter.rect.centerx - blue_label.get_width() // 2
-        blue_y = self.blue_fighter.rect.bottom + 5
+        blue_x = view.blue.rect.centerx - blue_label.get_width() // 2
+        blue_y = view.blue.rect.bottom + 5
         self.screen.blit(blue_label, (blue_x, blue_y))
 
-    def render(self):
-        self.screen.blit(self.background, (0, 0))
-
-        if self.state == "menu":
-            self.start_menu()
-
-        elif self.state == "playing":
-            self.fighters.draw(self.screen)
-            for fighter in [self.red_fighter, self.blue_fighter]:
-                fighter.fireballs.draw(self.screen)
-            self.draw_health_bars()
-            self.draw_cooldown_bars()
-            self.draw_timer()
-            self.draw_fighter_labels()
-
-        # Show "FIGHT" for 0.5 sec at the start
-        if self.fight_start_time:
-            elapsed = (pygame.time.get_ticks() - self.fight_start_time) / 1000
-            if elapsed < 0.5:
-                fight_surface = self.font_title.render("FIGHT!", True, (255, 255, 255))
-                self.screen.blit(fight_surface, (SCREEN_WIDTH // 2 - fight_surface.get_width() // 2,
-                                                 SCREEN_HEIGHT // 2 - fight_surface.get_height() // 2))
-
-        # Draw pause and game over messages
-        if self.paused:
-            # PAUSED message
-            pause_surface = self.font_title.render("PAUSED", True, (255, 255, 255))
-            x = SCREEN_WIDTH // 2 - pause_surface.get_width() // 2
-            y = SCREEN_HEIGHT // 4 - pause_surface.get_height() // 2
-            self.screen.blit(pause_surface, (x, y))
-
-            # --- Pause menu buttons ---
-            button_color = (50, 50, 50, 180)
-            button_hover = (100, 100, 100, 220)
-            button_width, button_height = 250, 60
-            spacing = 20
-
-            buttons = {
-                "CONTINUE": pygame.Rect(SCREEN_WIDTH // 2 - button_width // 2,
-                                        y + pause_surface.get_height() + 40,
-                                        button_width, button_height),
-                "RESTART": pygame.Rect(SCREEN_WIDTH // 2 - button_width // 2,
-                                    y + pause_surface.get_height() + 40 + (button_height + spacing),
-                                    button_width, button_height),
-                "MENU": pygame.Rect(SCREEN_WIDTH // 2 - button_width // 2,
-                                    y + pause_surface.get_height() + 40 + 2 * (button_height + spacing),
-                                    button_width, button_height)
-            }
-
-            mouse_pos = pygame.mouse.get_pos()
-            mouse_click = pygame.mouse.get_pressed()[0]
-
-            for label, rect in buttons.items():
-                # Transparent button surface
-                temp_surf = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
-                color = button_hover if rect.collidepoint(mouse_pos) else button_color
-                temp_surf.fill(color)
-                self.screen.blit(temp_surf, rect.topleft)
-
-                # Draw button text using custom font
-                text_surf = self.font_medium.render(label, True, (255, 255, 255))
-                self.screen.blit(text_surf, (rect.centerx - text_surf.get_width() // 2,
-                                            rect.centery - text_surf.get_height() // 2))
-
-                # Handle button clicks
-                if mouse_click and rect.collidepoint(mouse_pos):
-                    BUTTON_SOUND.play()
-                    if label == "CONTINUE":
-                        self.paused = False
-                        BACKGROUND_SOUND.play(loops=-1)
-                    elif label == "RESTART":
-                        self.reset_game()
-                        self.state = "playing"
-                        self.start_fight()
-                    elif label == "MENU":
-                        self.reset_game()
-                        self.state = "menu"
-
-        # --- Game Over message ---
-        if self.game_over:
-            # GAME OVER title
-            over_surface = self.font_title.render("GAME OVER", True, (255, 255, 255))
-            x = SCREEN_WIDTH // 2 - over_surface.get_width() // 2
-            y = SCREEN_HEIGHT // 3 - over_surface.get_height() // 2
-            self.screen.blit(over_surface, (x, y))
-
-            # Press R hint
-            hint_surface = self.font_medium.render("Press R to play again", True, (255, 255, 255))
-            hx = SCREEN_WIDTH // 2 - hint_surface.get_width() // 2
-            hy = y + over_surface.get_height() + 20
-            self.screen.blit(hint_surface, (hx, hy))
-
-        pygame.display.flip()
-
-    def start_menu(self):
-        menu_running = True
-        button_color = (50, 50, 50, 180)
-        button_hover = (100, 100, 100, 220)
-        button_width, button_height = 300, 60
-
-        sp_button_rect = pygame.Rect(SCREEN_WIDTH//2 - button_width//2, SCREEN_HEIGHT//2 - 70, button_width, button_height)
-        mp_button_rect = pygame.Rect(SCREEN_WIDTH//2 - button_width//2, SCREEN_HEIGHT//2, button_width, button_height)
-        inst_button_rect = pygame.Rect(SCREEN_WIDTH//2 - button_width//2, SCREEN_HEIGHT//2 + 70, button_width, button_height)
-        quit_button_rect = pygame.Rect(SCREEN_WIDTH//2 - button_width//2, SCREEN_HEIGHT//2 + 140, button_width, button_height)
-
-        if not pygame.mixer.get_busy():
-            BACKGROUND_SOUND.play(loops=-1)
-
-        # Load GIF frames for menu characters
-        googley_frames = self.load_gif_frames("assets/images/googley/googley_right.gif", scale=(64, 64))
-        alex_frames = self.load_gif_frames("assets/images/alex/alex_right.gif", scale=(64, 64))
-        steve_frames = self.load_gif_frames("assets/images/steve/steve_right.gif", scale=(64, 64))
-        frame_index = {"Googley": 0, "Alex": 0, "Steve": 0}
-        frame_timer = 0
-        frame_delay = 150  # ms per frame
-
-        positions = {
-            "Googley": [SCREEN_WIDTH//4, config.GROUND_Y],
-            "Alex": [SCREEN_WIDTH*3//4, config.GROUND_Y],
-            "Steve": [SCREEN_WIDTH//2, config.GROUND_Y]
-        }
-        velocities = {
-            "Googley": [1, 0],
-            "Alex": [-0.8, 0],
-            "Steve": [1.2, 0]
-        }
+    def draw_quality_stats(self):
+        report = f"{self.quality.report()} | rematch reset {self.rematch_us:.0f} us"
+        stats_surface = self.font_tiny.render(report, True, self.label_color)
+        self.screen.blit(stats_surface, (self.health_bar_margin, SCREEN_HEIGHT - 3 * stats_surface.get_height() - 15))
 
-        while menu_running:
-            self.handle_events()
-            mouse_pos = pygame.mouse.get_pos()
-            mouse_click = pygame.mouse.get_pressed()[0]
-
-            self.screen.blit(self.background, (0, 0))
-
-            # --- Draw title using .ttf ---
-            title_surface = self.font_title.render("GOOGLEY FIGHTER", True, (255, 255, 255))
-            title_x = SCREEN_WIDTH // 2 - title_surface.get_width() // 2
-            title_y = 100
-            subtitle_surface = self.font_medium.render("RecWeek 2025 Edition", True, (255, 255, 255))
-            subtitle_x = SCREEN_WIDTH // 2 - subtitle_surface.get_width() // 2
-            subtitle_y = 175
-            self.screen.blit(title_surface, (title_x, title_y))
-            self.screen.blit(subtitle_surface, (subtitle_x, subtitle_y))
-
-            # --- Animate menu GIFs first (sprites in the back) ---
-            frame_timer += self.clock.get_time()
-            if frame_timer >= frame_delay:
-                for char in frame_index:
-                    frames = {"Googley": googley_frames, "Alex": alex_frames, "Steve": steve_frames}[char]
-                    frame_index[char] = (frame_index[char] + 1) % len(frames)
-                frame_timer = 0
-
-            for char, pos in positions.items():
-                vel = velocities[char]
-                pos[0] += vel[0]
-
-                frame = {"Googley": googley_frames, "Alex": alex_frames, "Steve": steve_frames}[char][frame_index[char]]
-                w, h = frame.get_width(), frame.get_height()
-                pos[1] = config.GROUND_Y - h//2
-
-                if pos[0] - w//2 <= 0 or pos[0] + w//2 >= SCREEN_WIDTH:
-                    vel[0] *= -1
-
-                img_to_draw = pygame.transform.flip(frame, vel[0] < 0, False)
-                self.screen.blit(img_to_draw, (pos[0] - w//2, pos[1] - h//2))
-
-            # --- Draw buttons AFTER sprites (buttons in front) ---
-            for rect, text in [(sp_button_rect, "Singleplayer"),
-                            (mp_button_rect, "Multiplayer"),
-                            (inst_button_rect, "Instructions"),
-                            (quit_button_rect, "Quit")]:
-                temp_surf = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
-                if rect == quit_button_rect and rect.collidepoint(mouse_pos):
-                    color = (234, 67, 53, 220)  # red hover color for quit
-                else:
-                    color = button_hover if rect.collidepoint(mouse_pos) else button_color
-                
-                temp_surf.fill(color)
-                self.screen.blit(temp_surf, rect.topleft)
-
-                text_surf = self.font_medium.render(text, True, (255, 255, 255))
-                self.screen.blit(text_surf, (rect.centerx - text_surf.get_width()//2,
-                                            rect.centery - text_surf.get_height()//2))
-
-            # --- Handle button clicks ---
-            if mouse_click:
-                if sp_button_rect.collidepoint(mouse_pos):
-                    BUTTON_SOUND.play()
-                    self.selected_mode = "singleplayer"
-                    self.state = "character_select"
-                    menu_running = False
-                elif mp_button_rect.collidepoint(mouse_pos):
-                    BUTTON_SOUND.play()
-                    self.selected_mode = "multiplayer"
-                    self.state = "character_select"
-                    BACKGROUND_SOUND.play(loops=-1)
-                    menu_running = False
-                elif inst_button_rect.collidepoint(mouse_pos):
-                    self.state = "instructions"
-                    menu_running = False
-                elif quit_button_rect.collidepoint(mouse_pos):
-                    pygame.quit()
-                    sys.exit()
-
-            pygame.display.flip()
-            self.clock.tick(FPS)
-
-    def instructions(self):
-        running = True
-        lines = [
-            "INSTRUCTIONS",
-            "Player 1: WASD to move, SPACE to attack, F to shoot",
-            "Player 2: Arrow keys to move, R_SHIFT to attack, H to shoot",
-            "Press P to pause the game",
-            "Reduce opponent health to 0 to win",
-            "",
-            "Click anywhere on the screen to return to the menu",
-        ]
-
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.MOUSEBUTTONDOWN or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
-                    self.state = "menu"
-                    running = False
-
-            self.screen.blit(self.background, (0, 0))
-
-            # Render instruction lines
-            for i, line in enumerate(lines):
-                if i == 0:  # Title
-                    text_surf = self.font_title.render(line, True, (255, 255, 255))
-                    y_pos = 125
-                else:
-                    text_surf = self.font_small.render(line, True, (255, 255, 255))
-                    y_pos = 175 + i * 40
-                x_pos = SCREEN_WIDTH // 2 - text_surf.get_width() // 2
-                self.screen.blit(text_surf, (x_pos, y_pos))
+    def draw_latency_stats(self):
+        stats_surface = self.font_tiny.render(self.latency.report(), True, self.label_color)
+        self.screen.blit(stats_surface, (self.health_bar_margin, SCREEN_HEIGHT - 4 * stats_surface.get_height() - 20))
 
-            pygame.display.flip()
-            self.clock.tick(FPS)
+    def draw_allocation_stats(self):
+        stats_surface = self.font_tiny.render(allocations.report(), True, self.label_color)
+        self.screen.blit(stats_surface, (self.health_bar_margin, 5))
 
-    def load_gif_frames(self, path, scale=None):
-        """Load GIF frames as a list of PyGame surfaces."""
-        pil_img = Image.open(path)
-        frames = []
-        palette = pil_img.getpalette()  # store palette for reuse
+    def draw_particle_stats(self):
+        stats_surface = self.font_tiny.render(self.effects.report(), True, self.label_color)
+        self.screen.blit(stats_surface, (self.health_bar_margin, SCREEN_HEIGHT - 2 * stats_surface.get_height() - 10))
 
-        try:
-            while True:
-                frame = pil_img.convert("RGBA")  # ensure proper format
-                if scale:
-                    frame = frame.resize(scale, Image.NEAREST)
-
-                # Only apply palette if image mode is "P"
-                if pil_img.mode == "P" and palette:
-                    pil_img.putpalette(palette)
-
-                mode = frame.mode
-                size = frame.size
-                data = frame.tobytes()
-                surface = pygame.image.fromstring(data, size, mode)
-                frames.append(surface)
-                pil_img.seek(pil_img.tell() + 1)
-        except EOFError:
-            pass
-
-        return frames
+    def draw_collision_stats(self):
+        """Debug line showing how many collision queries ran and what they cost."""
+        stats_surface = self.font_tiny.render(collision_stats.report(), True, self.label_color)
+        self.screen.blit(stats_surface, (self.health_bar_margin, SCREEN_HEIGHT - stats_surface.get_height() - 5))
 
-    def start_fight(self):
-        """Initialize fighters after character selection."""
+    def load_gif_frames(self, path, scale=None):
+        """Load GIF frames as a list of PyGame surfaces."""
+        return assets.get(path, scale)
+
+    def prefetch_roster(self):
+        """Start decoding the first characters' fight GIFs while the menus are up."""
+        characters = get_roster()
+        for name in characters.names[:config.ROSTER_PREFETCH]:
+            characters.request(name)
+
+    def load_fighters(self):
+        """
+        Create fighters for the chosen characters (runs during preload).
+
+        If the same characters and mode are picked again, the fighters we
+        already have are reset instead of being rebuilt.
+        """
+        choices = (self.player1_choice, self.player2_choice, self.selected_mode)
+        if self.fighters is not None and self.loaded_choices == choices:
+            self.reset_game()
+            return
+
+        get_roster().pin((self.player1_choice, self.player2_choice))
         player1_controls = Player1Controls()
+        player2_controls = Player2Controls()
 
-        if self.selected_mode == "singleplayer":
-            player2_controls = Player2Controls()  # still give dummy, AI replaces below
-        else:
-            player2_controls = Player2Controls()
-
-        # Create fighters
         self.fighters, self.red_fighter, self.blue_fighter = create_fighters(
             self.player1_choice,
             self.player2_choice,
             player1_controls,
             player2_controls
         )
+        self.roster = [self.red_fighter, self.blue_fighter]
 
-        # Apply AI if singleplayer
-        if self.selected_mode == "singleplayer":
-            self.blue_fighter.controls = AIControls(self.blue_fighter, self.red_fighter, config)
-
-        self.state = "playing"
-        self.fight_start_time = pygame.time.get_ticks()
-        BACKGROUND_SOUND.play(loops=-1)
-
-    def character_select(self):
-        """Show character selection screen for singleplayer or multiplayer."""
-        choosing = True
-
-        box_size = 120
-        spacing = 150
-        num_boxes = 3
-        total_width = num_boxes * box_size + (num_boxes - 1) * spacing
-        start_x = (SCREEN_WIDTH - total_width) // 2
-        y = SCREEN_HEIGHT // 2 - box_size // 2
-
-        boxes = [
-            pygame.Rect(start_x + i * (box_size + spacing), y, box_size, box_size)
-            for i in range(num_boxes)
-        ]
-
-        characters = ["Googley", "Steve", "Alex"]
-
-        # Load animated frames for previews
-        previews = {
-            "Googley": self.load_gif_frames("assets/images/googley/idle.gif", scale=(64, 64)),
-            "Steve": self.load_gif_frames("assets/images/steve/idle.gif", scale=(64, 64)),
-            "Alex": self.load_gif_frames("assets/images/alex/idle.gif", scale=(64, 64)),
-        }
-
-        # Track animation state
-        frame_index = {char: 0 for char in characters}
-        frame_timer = 0
-        frame_delay = 150  # ms per frame (adjust for speed)
-
-        turn = 1  # 1 = player1 choosing, 2 = player2 choosing (multiplayer only)
-
-        while choosing:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-
-                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    BUTTON_SOUND.play()
-                    for i, box in enumerate(boxes):
-                        if box.collidepoint(event.pos):
-                            if self.selected_mode == "singleplayer":
-                                self.player1_choice = characters[i]
-                                self.player2_choice = "Googley"  # default AI opponent
-                                choosing = False
-                            elif self.selected_mode == "multiplayer":
-                                if turn == 1:
-                                    self.player1_choice = characters[i]
-                                    turn = 2
-                                else:
-                                    if characters[i] == self.player1_choice:
-                                        continue
-                                    self.player2_choice = characters[i]
-                                    choosing = False
+        # Apply AI if singleplayer (training is against the AI too)
+        if self.selected_mode in ("singleplayer", "training"):
+            ai_class = AdaptiveAIControls if config.AI_ADAPTIVE else AIControls
+            self.blue_fighter.controls = ai_class(self.blue_fighter, self.red_fighter, config)
+        self.rewinder = Rewinder(self) if self.selected_mode == "training" else None
 
-            self.handle_events()
-            mouse_pos = pygame.mouse.get_pos()
-
-            self.screen.blit(self.background, (0, 0))
-
-            # Caption using large font
-            if self.selected_mode == "multiplayer" and turn == 2:
-                caption_surface = self.font_medium.render("Player 2, choose your character", True, (255, 255, 255))
-            else:
-                caption_surface = self.font_medium.render("Player 1, choose your character", True, (255, 255, 255))
-
-            self.screen.blit(caption_surface, (SCREEN_WIDTH // 2 - caption_surface.get_width() // 2, 160))
-
-            # Update animation every frame_delay ms
-            frame_timer += self.clock.get_time()
-            if frame_timer >= frame_delay:
-                for char in characters:
-                    frame_index[char] = (frame_index[char] + 1) % len(previews[char])
-                frame_timer = 0
-
-            # Draw character boxes with transparency (no borders)
-            for i, box in enumerate(boxes):
-                temp_surf = pygame.Surface((box.width, box.height), pygame.SRCALPHA)
-                hover = box.collidepoint(mouse_pos)
-                color = (100, 100, 100, 180) if hover else (50, 50, 50, 150)
-                temp_surf.fill(color)
-                self.screen.blit(temp_surf, box.topleft)
-
-                # Draw animated frame
-                char = characters[i]
-                preview_img = previews[char][frame_index[char]]
-                self.screen.blit(
-                    preview_img,
-                    (box.centerx - preview_img.get_width() // 2,
-                    box.centery - preview_img.get_height() // 2)
-                )
-
-                # Draw character label using medium font
-                label_surface = self.font_medium.render(char, True, (255, 255, 255))
-                self.screen.blit(label_surface, (box.centerx - label_surface.get_width() // 2, box.bottom + 10))
-
-            pygame.display.flip()
-            self.clock.tick(FPS)
-
-        # After selection, start fight
-        self.start_fight()
+        self.loaded_choices = choices
+        self.reset_game()  # round state (timer, checksum, stats) starts fresh
 
-    def run(self):
+    def start_fight(self):
+        """Start the round with the fighters already loaded."""
+        self.game_over = False
         self.paused = False
+        self.fight_start_time = pygame.time.get_ticks()
+        self.view = snapshot_game(self)
+        self.start_simulation()
+        ACTIVE_MATCHES.set(1)
+        audio.play_music(BACKGROUND_SOUND)
 
-        while self.running:
-            self.handle_events()
-
-            if self.state == "menu":
-                self.start_menu()
-            elif self.state == "character_select":
-                self.character_select()
-            elif not self.paused and not self.game_over and self.state == "playing":
-                self.update()
-            elif self.state == "instructions":
-                self.instructions()
-
-            self.render()
-            self.clock.tick(FPS)
+    def run(self):
+        """Run until the window is closed. Quitting pygame is left to the caller."""
+        metrics.start()
+        if config.TRACK_ALLOCATIONS:
+            allocations.start()
+        self.change_scene("menu")
+        self.prefetch_roster()
+        with profile.span("menu preload (wait)"):
+            self.next_scene.wait()
 
-        pygame.quit()
-        sys.exit()
\ No newline at end of file
+        try:
+            while self.running:
+                if self.scheduler:
+                    # Low-latency mode: sleep now, then read input right before it's used
+                    self.scheduler.wait()
+                self.finish_transition()
+                assets.pump()
+                input_start = time.perf_counter()
+                self.handle_events()
+
+                frame_start = time.perf_counter()
+                if allocations.enabled:
+                    allocations.frame_start()
+                self.scene.update(self.clock.get_time())
+                audio.update()
+                self.scene.draw(self.screen)
+                if allocations.enabled:
+                    allocations.frame_done()
+                    if config.SHOW_ALLOCATION_STATS:
+                        self.draw_allocation_stats()
+                drawn_time = time.perf_counter()
+                pygame.display.flip()
+                flip_time = time.perf_counter()
+                if profile.enabled:
+                    profile.first_frame()
+                frame_work = flip_time - frame_start
+                self.frame_work_ms = frame_work * 1000
+                FRAME_SECONDS.observe(frame_work)
+                if self.scene is self.scenes["playing"]:
+                    self.latency.frame_shown(self.view.input_stamp, flip_time)
+
+                self.quality.record(self.frame_work_ms)
+                self.effects.density = self.quality.settings["particles"]
+                if self.scheduler:
+                    self.scheduler.frame_done(drawn_time - input_start, flip_time)
+                    self.clock.tick()  # keeps dt and get_fps() right, doesn't sleep
+                elif self.simulation is not None and self.view is not None:
+                    self.wait_for_tick()
+                    self.clock.tick()
+                else:
+                    self.clock.tick(FPS)
+        finally:
+            self.stop_simulation()
+            self.history.close()
+            metrics.stop()
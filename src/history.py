@@ -0,0 +1,230 @@
+# src/history.py
+"""
+Match history and leaderboard storage for Googley Fighter.
+
+The game loop never touches the database. record() only puts the result on a
+queue; a background thread takes whatever has piled up and writes it in one
+transaction. The database runs in WAL mode so the stats queries can read
+while the writer is busy. The writer sets the database up once when it first
+opens it; the queries share one read-only connection opened on first use.
+
+Per-character totals are kept in their own table and updated in the same
+transaction as the match rows, so win rates and the leaderboard are a small
+indexed read no matter how many matches have been played. A mirror match
+(the same character on both sides) is won and lost by that character, so
+it says nothing about how it does against others: it is kept in matches
+but left out of the per-character totals.
+
+Whatever is still queued is written when close() is called, at the latest
+when the interpreter exits.
+
+Run this file directly to print the leaderboard.
+"""
+
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+from config import HISTORY_DB_PATH, HISTORY_BATCH_SIZE, HISTORY_FLUSH_SECONDS
+from allocations import allocations
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    played_at REAL NOT NULL,
+    mode TEXT NOT NULL,
+    p1_character TEXT NOT NULL,
+    p2_character TEXT NOT NULL,
+    winner INTEGER NOT NULL,          -- 1, 2, or 0 for a draw
+    ko INTEGER NOT NULL,              -- 1 if decided by KO, 0 on timeout
+    duration_ticks INTEGER NOT NULL,
+    p1_health INTEGER NOT NULL,
+    p2_health INTEGER NOT NULL,
+    p1_hits INTEGER NOT NULL,
+    p2_hits INTEGER NOT NULL,
+    p1_specials INTEGER NOT NULL,
+    p2_specials INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_matches_played_at ON matches (played_at);
+CREATE INDEX IF NOT EXISTS idx_matches_p1 ON matches (p1_character, winner);
+CREATE INDEX IF NOT EXISTS idx_matches_p2 ON matches (p2_character, winner);
+
+CREATE TABLE IF NOT EXISTS character_stats (
+    character TEXT PRIMARY KEY,
+    played INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    draws INTEGER NOT NULL DEFAULT 0,
+    kos INTEGER NOT NULL DEFAULT 0,
+    health_left INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_character_stats_wins ON character_stats (wins DESC);
+"""
+
+INSERT_MATCH = """
+INSERT INTO matches (played_at, mode, p1_character, p2_character, winner, ko,
+                     duration_ticks, p1_health, p2_health, p1_hits, p2_hits,
+                     p1_specials, p2_specials)
+VALUES (:played_at, :mode, :p1_character, :p2_character, :winner, :ko,
+        :duration_ticks, :p1_health, :p2_health, :p1_hits, :p2_hits,
+        :p1_specials, :p2_specials)
+"""
+
+UPSERT_CHARACTER = """
+INSERT INTO character_stats (character, played, wins, draws, kos, health_left)
+VALUES (?, 1, ?, ?, ?, ?)
+ON CONFLICT (character) DO UPDATE SET
+    played = played + 1,
+    wins = wins + excluded.wins,
+    draws = draws + excluded.draws,
+    kos = kos + excluded.kos,
+    health_left = health_left + excluded.health_left
+"""
+
+_STOP = object()
+
+
+def connect(path):
+    """Open the database for writing, creating the tables if needed."""
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")  # stored in the file, so readers get it too
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def character_stats(match):
+    """The character_stats rows one match adds to: one per character, none for a mirror match."""
+    winner = match["winner"]
+    if match["p1_character"] == match["p2_character"]:
+        return []
+    return [(
+        match[f"p{slot}_character"],
+        int(winner == slot),
+        int(winner == 0),
+        int(winner == slot and match["ko"]),
+        match[f"p{slot}_health"],
+    ) for slot in (1, 2)]
+
+
+class MatchHistory:
+    """Records finished matches on a background thread and answers stats queries."""
+    def __init__(self, path=HISTORY_DB_PATH):
+        self.path = path
+        self.queue = queue.Queue()
+        self.reader = None
+        self.read_lock = threading.Lock()
+        self.writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+
+    def record(self, **match):
+        """Queue one finished match. Never blocks on disk."""
+        match.setdefault("played_at", time.time())
+        self.queue.put_nowait(match)
+
+    def close(self):
+        """Flush anything still queued and stop the writer. Safe to call twice."""
+        atexit.unregister(self.close)
+        if self.writer.is_alive():
+            self.queue.put(_STOP)
+            self.writer.join()
+        with self.read_lock:
+            if self.reader is not None:
+                self.reader.close()
+                self.reader = None
+
+    def _write_loop(self):
+        connection = None
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            batch = []
+            # Give a burst of results a moment to pile up into one transaction
+            deadline = time.monotonic() + HISTORY_FLUSH_SECONDS
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= HISTORY_BATCH_SIZE:
+                    break
+                try:
+                    item = self.queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+
+            if batch:
+                with allocations.gate:
+                    if connection is None:
+                        connection = connect(self.path)
+                    self._write_batch(connection, batch)
+        if connection is not None:
+            connection.close()
+
+    def _write_batch(self, connection, batch):
+        stats = [row for match in batch for row in character_stats(match)]
+        with connection:
+            connection.executemany(INSERT_MATCH, batch)
+            connection.executemany(UPSERT_CHARACTER, stats)
+
+    # --- Queries (on one shared read connection) ---
+    def _read(self, sql, params=()):
+        with self.read_lock:
+            if self.reader is None:
+                if not os.path.exists(self.path):
+                    return []
+                self.reader = sqlite3.connect(self.path, check_same_thread=False)
+            try:
+                return self.reader.execute(sql, params).fetchall()
+            except sqlite3.OperationalError:
+                return []  # the writer hasn't created the tables yet
+
+    def win_rates(self):
+        """Return {character: (played, wins, win_rate)}."""
+        rows = self._read("SELECT character, played, wins FROM character_stats")
+        return {character: (played, wins, wins / played if played else 0.0)
+                for character, played, wins in rows}
+
+    def leaderboard(self, limit=10, min_played=1):
+        """Characters ranked by wins, then win rate."""
+        return self._read(
+            "SELECT character, played, wins, kos, CAST(wins AS REAL) / played AS rate "
+            "FROM character_stats WHERE played >= ? "
+            "ORDER BY wins DESC, rate DESC LIMIT ?",
+            (min_played, limit),
+        )
+
+    def head_to_head(self, character_a, character_b):
+        """
+        Return (matches, wins for a, wins for b) between two characters.
+
+        For a mirror match (a is b), a is player 1 and b player 2.
+        """
+        rows = self._read(
+            "SELECT winner, p1_character FROM matches "
+            "WHERE p1_character = ? AND p2_character = ? "
+            "UNION ALL "
+            "SELECT winner, p1_character FROM matches "
+            "WHERE p1_character = ? AND p2_character = ? AND p1_character != p2_character",
+            (character_a, character_b, character_b, character_a),
+        )
+        a_wins = sum(1 for winner, p1 in rows if (winner == 1) == (p1 == character_a) and winner)
+        b_wins = sum(1 for winner, p1 in rows if winner) - a_wins
+        return len(rows), a_wins, b_wins
+
+    def recent(self, limit=20):
+        return self._read(
+            "SELECT played_at, mode, p1_character, p2_character, winner, duration_ticks "
+            "FROM matches ORDER BY played_at DESC LIMIT ?",
+            (limit,),
+        )
+
+
+if __name__ == "__main__":
+    history = MatchHistory()
+    print(f"{'Character':<12}{'Played':>8}{'Wins':>8}{'KOs':>8}{'Win %':>8}")
+    for character, played, wins, kos, rate in history.leaderboard():
+        print(f"{character:<12}{played:>8}{wins:>8}{kos:>8}{rate * 100:>7.1f}%")
+    history.close()
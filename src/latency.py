@@ -0,0 +1,122 @@
+# src/latency.py
+"""
+Input-to-display latency for Googley Fighter.
+
+Every key press gets a timestamp when it comes off the event queue (pygame
+doesn't pass SDL's own event times through). The stamp travels with the
+input into the simulation and out again on the FrameSnapshot, and when the
+frame showing it has been flipped, LatencyProbe records how long it took.
+
+FrameScheduler is the low-latency loop. With vsync on, flip() blocks until
+the next vblank, so a frame that reads input straight after the previous
+flip shows it a whole refresh later. The scheduler instead sleeps first and
+wakes just in time to read input, update and draw before the next vblank.
+How long that takes is learned from recent frames.
+
+LatencyBot is the measuring harness. It posts key presses at random times
+from another thread, stamped when they were posted, so the numbers include
+the time an input waits in the queue before the game reads it. Fights read
+keys from a KeyState fed by these same events (see simulation.py), whether
+they step inline or on the thread, so a bot press moves the fighter just
+like a real one.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+import pygame
+from config import FPS, LATENCY_MARGIN_MS, LATENCY_SAMPLES
+from metrics import metrics
+from allocations import allocations
+
+INPUT_LATENCY = metrics.histogram("googley_input_latency_seconds",
+                                  "Time from a key press to the flip that shows it")
+
+
+def event_stamp(event):
+    """When this event was generated: the bot's stamp, or now for real input."""
+    return getattr(event, "stamp", None) or time.perf_counter()
+
+
+class LatencyProbe:
+    def __init__(self, size=LATENCY_SAMPLES):
+        self.samples = deque(maxlen=size)  # seconds
+        self.last_stamp = None
+
+    def frame_shown(self, stamp, flip_time):
+        """Call after a flip with the newest input stamp the frame reflects."""
+        if stamp is None or stamp == self.last_stamp:
+            return
+        self.last_stamp = stamp
+        latency = flip_time - stamp
+        self.samples.append(latency)
+        INPUT_LATENCY.observe(latency)
+
+    def percentile(self, fraction):
+        ordered = sorted(self.samples)
+        return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+    def report(self):
+        if not self.samples:
+            return "input latency: no samples"
+        return (f"input latency ms | p50 {self.percentile(0.5) * 1000:.1f} | "
+                f"p90 {self.percentile(0.9) * 1000:.1f} | p99 {self.percentile(0.99) * 1000:.1f} | "
+                f"max {max(self.samples) * 1000:.1f} | n {len(self.samples)}")
+
+
+class FrameScheduler:
+    """Sleeps at the start of a frame so input is read as late as possible."""
+    def __init__(self, fps=FPS):
+        self.frame_seconds = 1 / fps
+        self.next_flip = None
+        self.work_estimate = self.frame_seconds / 2
+
+    def wait(self):
+        if self.next_flip is None:
+            return
+        # No busy-wait to make up for sleep() overshooting: spinning would
+        # hold the GIL and starve the simulation thread. The margin covers it.
+        wake = self.next_flip - self.work_estimate - LATENCY_MARGIN_MS / 1000
+        delay = wake - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def frame_done(self, work_seconds, flip_time):
+        """
+        Learn how long reading input, updating and drawing take (jump up at
+        once, decay slowly), and expect the next vblank a frame after this
+        flip returned.
+        """
+        self.work_estimate = max(work_seconds, self.work_estimate * 0.98)
+        self.next_flip = flip_time + self.frame_seconds
+
+
+class LatencyBot:
+    """Presses and releases a key at random intervals, stamping each event."""
+    def __init__(self, key=pygame.K_d, hold=0.05, gap=(0.1, 0.4), seed=0):
+        self.key = key
+        self.hold = hold
+        self.gap = gap
+        self.random = random.Random(seed)
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        self.thread.join()
+
+    def post(self, event_type):
+        """Post a KEYDOWN or KEYUP for the bot's key, stamped now."""
+        with allocations.gate:
+            pygame.event.post(pygame.event.Event(event_type, key=self.key, stamp=time.perf_counter()))
+
+    def run(self):
+        while not self.stopping.wait(self.random.uniform(*self.gap)):
+            self.post(pygame.KEYDOWN)
+            if self.stopping.wait(self.hold):
+                break
+            self.post(pygame.KEYUP)
@@ -1,25 +1,84 @@
+import sys
+from startup import profile
+if "--profile-startup" in sys.argv:
+    profile.start()  # before the imports below, so they're timed too
+
+import argparse
+import os
 import pygame
-from PIL import Image
 from gamecanvas import GameCanvas
-from config import SCREEN_WIDTH, SCREEN_HEIGHT
+from latency import LatencyBot
+from metrics import metrics
+from config import SCREEN_WIDTH, SCREEN_HEIGHT, ASSET_CACHE_DIR
+
+
+def load_background(path):
+    """
+    The background scaled to the screen. Pillow scales it on the first
+    launch; after that the scaled copy in ASSET_CACHE_DIR is loaded as is,
+    until the source image changes.
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    cached = os.path.join(ASSET_CACHE_DIR, f"{name}_{SCREEN_WIDTH}x{SCREEN_HEIGHT}.bmp")
+    try:
+        if os.path.getmtime(cached) >= os.path.getmtime(path):
+            return pygame.image.load(cached)
+    except (OSError, pygame.error):
+        pass  # not cached yet, or the cache is unreadable: scale it again
 
-def load_avif_as_surface(path):
     from PIL import Image
     image = Image.open(path)
     image = image.resize((SCREEN_WIDTH, SCREEN_HEIGHT))
-    return pygame.image.fromstring(image.tobytes(), image.size, image.mode)
+    surface = pygame.image.fromstring(image.tobytes(), image.size, image.mode)
+    try:
+        os.makedirs(ASSET_CACHE_DIR, exist_ok=True)
+        temp = f"{cached}.tmp.bmp"
+        pygame.image.save(surface, temp)
+        os.replace(temp, cached)
+    except (OSError, pygame.error):
+        pass  # read-only install; scale it again next launch
+    return surface
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Googley Fighter")
+    parser.add_argument("--measure-latency", action="store_true",
+                        help="press keys automatically and print input-to-display latency on exit")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="serve Prometheus metrics at /metrics on this port")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print how long it took to reach the first menu frame, by import and asset")
+    return parser.parse_args()
 
 
 def main():
-    pygame.init()
+    args = parse_args()
+    if args.metrics_port is not None:
+        metrics.port = args.metrics_port
+    # Just the display: fonts and the mixer are opened when first used
+    with profile.span("pygame display init"):
+        pygame.display.init()
 
     # Load background
     background_path = "assets/images/background.png"
-    background_surface = load_avif_as_surface(background_path)
+    with profile.span("background"):
+        background_surface = load_background(background_path)
 
     # Create game canvas and run
     game = GameCanvas(background_surface, None, None, None)
-    game.run()
+    bot = LatencyBot() if args.measure_latency else None
+    if bot:
+        bot.start()
+    try:
+        game.run()
+    finally:
+        # The bot posts events, so it has to stop before pygame does
+        if bot:
+            bot.stop()
+            print(f"simulation: {game.simulation_path or 'no fight'} | low latency input: "
+                  f"{'on' if game.scheduler else 'off'}")
+            print(game.latency.report())
+        pygame.quit()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,244 @@
+# src/metrics.py
+"""
+Counters, gauges and histograms for Googley Fighter.
+
+Metrics are updated every tick from the main, simulation, audio and
+network threads, so recording doesn't lock: each thread gets its own
+shard of a metric (a count, or a row of bucket counts) and only ever
+writes that one. Collecting sums the shards, and shards of threads that
+have finished are folded into a total so they don't pile up. Exporting is
+the expensive part and happens elsewhere:
+
+- METRICS_PORT (or main.py --metrics-port) serves the Prometheus text
+  format at /metrics on METRICS_HOST. Off by default.
+- METRICS_SNAPSHOT_PATH, if set, gets the same text rewritten every
+  METRICS_SNAPSHOT_SECONDS, for machines nothing scrapes.
+
+Histograms are cumulative like Prometheus expects, so tail latency across
+many instances is histogram_quantile(0.99, sum by (le) (rate(..._bucket[5m]))).
+"""
+
+import logging
+import os
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config import (METRICS_HOST, METRICS_PORT, METRICS_SNAPSHOT_PATH,
+                    METRICS_SNAPSHOT_SECONDS)
+from allocations import allocations
+
+# Seconds; the 16.7 ms tick budget sits between the 0.016 and 0.033 buckets
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.002, 0.004, 0.008,
+                   0.016, 0.033, 0.066, 0.25)
+
+log = logging.getLogger(__name__)
+
+
+class Sharded:
+    """
+    Per-thread shards for one metric.
+
+    A shard is a list of numbers that only its own thread adds to. The lock
+    is only taken to register a thread's first shard and when collecting.
+    """
+    def __init__(self, size):
+        self.size = size
+        self.local = threading.local()
+        self.shards = []  # (thread, shard)
+        self.retired = [0] * size  # sums of shards whose thread has ended
+        self.lock = threading.Lock()
+
+    def shard(self):
+        try:
+            return self.local.shard
+        except AttributeError:
+            shard = self.local.shard = [0] * self.size
+            with self.lock:
+                self.shards.append((threading.current_thread(), shard))
+            return shard
+
+    def collect(self):
+        """Return the sum of every shard."""
+        with self.lock:
+            live = []
+            for thread, shard in self.shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    self.retired = [a + b for a, b in zip(self.retired, shard)]
+            self.shards = live
+            totals = list(self.retired)
+            for _, shard in live:
+                totals = [a + b for a, b in zip(totals, shard)]
+        return totals
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, description):
+        self.name = name
+        self.help = description
+        self.value = 0
+        self.deltas = Sharded(1)
+
+    def inc(self, amount=1):
+        self.deltas.shard()[0] += amount
+
+    def total(self):
+        return self.value + self.deltas.collect()[0]
+
+    def samples(self):
+        yield self.name, self.total()
+
+
+class Gauge(Counter):
+    """
+    A Counter that can also go down or be set.
+
+    Use either set() (from one thread) or inc()/dec() on a gauge, not both.
+    """
+    kind = "gauge"
+
+    def set(self, value):
+        self.value = value
+
+    def dec(self, amount=1):
+        self.deltas.shard()[0] -= amount
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, description, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = description
+        self.bounds = buckets
+        # One count per bucket, then +Inf, then the sum of observed values
+        self.rows = Sharded(len(buckets) + 2)
+
+    def observe(self, value):
+        row = self.rows.shard()
+        row[bisect_left(self.bounds, value)] += 1
+        row[-1] += value
+
+    def samples(self):
+        row = self.rows.collect()
+        counts, total_sum = row[:-1], row[-1]
+        total = 0
+        for bound, count in zip(self.bounds, counts):
+            total += count
+            yield f'{self.name}_bucket{{le="{bound}"}}', total
+        total += counts[-1]
+        yield f'{self.name}_bucket{{le="+Inf"}}', total
+        yield f"{self.name}_sum", total_sum
+        yield f"{self.name}_count", total
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+        self.port = METRICS_PORT  # main.py --metrics-port sets it
+        self.server = None
+        self.snapshot_thread = None
+        self.stopping = threading.Event()
+
+    def counter(self, name, description):
+        return self._add(Counter(name, description))
+
+    def gauge(self, name, description):
+        return self._add(Gauge(name, description))
+
+    def histogram(self, name, description, buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, description, buckets))
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Everything in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, value in metric.samples():
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    # --- Export ---
+    def start(self):
+        """Start the HTTP endpoint and snapshot writer that config asks for."""
+        if self.port is not None and self.server is None:
+            try:
+                self.server = ThreadingHTTPServer((METRICS_HOST, self.port), MetricsHandler)
+            except OSError as error:
+                # Another instance has the port; keep playing without it
+                log.warning("Metrics endpoint disabled: %s", error)
+            else:
+                self.server.registry = self
+                self.server.daemon_threads = True
+                threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        if METRICS_SNAPSHOT_PATH and self.snapshot_thread is None:
+            self.stopping.clear()
+            self.snapshot_thread = threading.Thread(target=self._snapshot_loop, daemon=True)
+            self.snapshot_thread.start()
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if self.snapshot_thread is not None:
+            self.stopping.set()
+            self.snapshot_thread.join()
+            self.snapshot_thread = None
+
+    def write_snapshot(self, path=METRICS_SNAPSHOT_PATH):
+        """Write the current metrics to `path`, replacing it in one step."""
+        temp = f"{path}.tmp"
+        with open(temp, "w") as f:
+            f.write(self.render())
+        os.replace(temp, path)
+
+    def _snapshot_loop(self):
+        while not self.stopping.wait(METRICS_SNAPSHOT_SECONDS):
+            with allocations.gate:
+                self.write_snapshot()
+        self.write_snapshot()  # last one on the way out
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        with allocations.gate:
+            body = self.server.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # no line on stdout per scrape
+
+
+metrics = MetricsRegistry()
+
+# Game loop
+TICK_SECONDS = metrics.histogram("googley_tick_seconds", "Time to run one fight tick (GameCanvas.update)")
+STEP_SECONDS = metrics.histogram("googley_fighter_step_seconds", "Time to step both fighters (physics.step_fight)")
+FRAME_SECONDS = metrics.histogram("googley_frame_seconds", "Time to update, draw and flip one frame")
+TICKS = metrics.counter("googley_ticks_total", "Fight ticks simulated")
+TICKS_BEHIND = metrics.gauge("googley_ticks_behind", "Ticks the simulation thread is behind schedule")
+INPUT_QUEUE = metrics.gauge("googley_input_queue_depth", "Key events waiting for the simulation thread")
+
+# Matches
+ACTIVE_MATCHES = metrics.gauge("googley_active_matches", "Fights currently running")
+REMATCH_SECONDS = metrics.gauge("googley_rematch_reset_seconds", "Time the last rematch took to reset the fighters in place")
+MATCHES = metrics.counter("googley_matches_finished_total", "Fights that ended by KO or timeout")
+FIREBALLS = metrics.gauge("googley_fireballs_alive", "Fireballs in flight")
+HITS = metrics.counter("googley_hits_total", "Attacks and fireballs that landed")
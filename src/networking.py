@@ -0,0 +1,665 @@
+# src/networking.py
+"""
+Rollback netcode for Googley Fighter, and a harness to measure it offline.
+
+RollbackClient runs one side of an online match. Each frame it sends its
+player's input to the peer and steps the fight straight away, guessing that
+the peer is still pressing whatever they pressed last. When the real input
+arrives and the guess was wrong, it loads the state saved at that frame and
+re-simulates up to the present. If the peer falls more than NET_MAX_ROLLBACK
+frames behind, it stalls (waits) instead of guessing further. Packets carry
+every input the peer hasn't acknowledged yet, so a lost packet is covered by
+the next one, and the CRC of the newest confirmed state, so both sides can
+check they agree.
+
+Netem impairs the traffic between two clients: latency, jitter,
+reordering, duplication and loss, following a scripted profile
+(NETEM_PROFILES, or a JSON file with the same list of phases). NetemRelay
+applies it to real UDP on localhost, with each client on its own thread.
+SimulatedNetwork applies it in memory on a SimulatedClock, and the clients
+take turns on one thread, so a match runs as fast as it can be simulated
+and plays out the same every time.
+
+run_match() plays two headless clients through either one, driven by
+AIControls or by recorded inputs, and reports rollbacks, stalls,
+re-simulated frames per second, bandwidth and desyncs. From the repo root:
+
+    python src/networking.py --profile wifi --profile spikes --frames 600
+    python src/networking.py --simulated --frames 3600
+
+The exit status is 1 if the clients ever disagreed, so CI can run it.
+"""
+
+import argparse
+import heapq
+import json
+import os
+import random
+import select
+import socket
+import struct
+import sys
+import threading
+import time
+import zlib
+from collections import deque
+import config
+from config import FPS, NET_HOST, NET_MAX_ROLLBACK, NET_MAX_INPUTS_PER_PACKET, NET_FINISH_SECONDS
+from ai import AIControls
+from metrics import metrics
+from physics import step_fight
+from rewind import pack_game, unpack_game
+from sprite import create_fighters
+
+ROLLBACKS = metrics.counter("googley_net_rollbacks_total", "Times a client rolled back to correct a prediction")
+RESIM_FRAMES = metrics.counter("googley_net_resimulated_frames_total", "Frames simulated again after a rollback")
+STALL_FRAMES = metrics.counter("googley_net_stall_frames_total", "Frames a client waited for its peer's input")
+# Frames; a rollback is never deeper than NET_MAX_ROLLBACK
+ROLLBACK_DEPTH = metrics.histogram("googley_net_rollback_depth_frames", "Frames re-simulated by one rollback",
+                                   buckets=tuple(range(1, NET_MAX_ROLLBACK + 1)))
+
+# first input's frame, inputs of ours the sender has, frame and CRC of its newest
+# confirmed state (-1 if none yet), number of inputs that follow (one byte each)
+PACKET_HEADER = struct.Struct("<iiiIB")
+UDP_OVERHEAD = 28  # IPv4 + UDP header bytes, counted in the bandwidth figures
+NEUTRAL = 5        # encode_input(0, 0, False, False)
+
+# Each profile is a list of phases; a phase lasts `seconds` (the last one
+# until the end) and sets NetemConditions for both directions
+NETEM_PROFILES = {
+    "clean": [{}],
+    "lan": [{"latency_ms": 1, "jitter_ms": 1}],
+    "wifi": [{"latency_ms": 15, "jitter_ms": 8, "loss": 0.01, "duplicate": 0.005, "reorder": 0.01}],
+    "cross_country": [{"latency_ms": 40, "jitter_ms": 4, "loss": 0.005}],
+    "mobile": [{"latency_ms": 60, "jitter_ms": 25, "loss": 0.03, "duplicate": 0.01, "reorder": 0.03}],
+    "spikes": [
+        {"seconds": 3, "latency_ms": 20, "jitter_ms": 4},
+        {"seconds": 0.5, "latency_ms": 200, "jitter_ms": 40, "loss": 0.2},
+        {"seconds": 3, "latency_ms": 20, "jitter_ms": 4},
+        {"seconds": 1, "latency_ms": 20, "loss": 1.0},
+        {"latency_ms": 20, "jitter_ms": 4},
+    ],
+}
+
+
+def encode_input(dx, dy, attack, fireball):
+    return (dx + 1) | (dy + 1) << 2 | bool(attack) << 4 | bool(fireball) << 5
+
+
+def decode_input(byte):
+    return (byte & 3) - 1, (byte >> 2 & 3) - 1, bool(byte & 16), bool(byte & 32)
+
+
+class NetControls:
+    """Controls that return whatever input the netcode set for this frame."""
+    keys = None
+
+    def __init__(self):
+        self.input = (0, 0, False, False)
+
+    def get_input(self, fighter=None):
+        return self.input
+
+    def reset(self):
+        self.input = (0, 0, False, False)
+
+
+class NetMatch:
+    """One client's copy of the fight: GameCanvas.update without the display."""
+    def __init__(self, player1_choice, player2_choice, total_time=60):
+        self.fighters, self.red_fighter, self.blue_fighter = create_fighters(
+            player1_choice, player2_choice, NetControls(), NetControls())
+        self.roster = [self.red_fighter, self.blue_fighter]
+        self.total_time = total_time
+        self.time_remaining = total_time
+        self.round_tick = 0
+        self.game_over = False
+
+    def step(self, red_input, blue_input):
+        if self.game_over:
+            return
+        self.red_fighter.controls.input = decode_input(red_input)
+        self.blue_fighter.controls.input = decode_input(blue_input)
+        step_fight(self.roster)
+        self.round_tick += 1
+        self.time_remaining = max(0, self.total_time - self.round_tick / FPS)
+        ko = self.red_fighter.health <= 0 or self.blue_fighter.health <= 0
+        self.game_over = ko or self.time_remaining <= 0
+
+    def save(self):
+        """pack_game() plus what it leaves out that the next frames depend on."""
+        return (pack_game(self),
+                [fighter.command_reader.save() for fighter in self.roster],
+                [fighter.specials_used for fighter in self.roster])
+
+    def load(self, saved):
+        packed, readers, specials = saved
+        unpack_game(self, packed)
+        for fighter, reader, used in zip(self.roster, readers, specials):
+            fighter.command_reader.restore(reader)
+            fighter.specials_used = used
+
+
+class AIInputs:
+    """Input source: an AIControls playing the local fighter."""
+    def __init__(self, controls, fighter):
+        self.controls = controls
+        self.fighter = fighter
+
+    def next(self, frame):
+        return encode_input(*self.controls.get_input(self.fighter))
+
+
+class RecordedInputs:
+    """Input source: one encoded byte per frame, neutral once they run out."""
+    def __init__(self, data):
+        self.recorded = bytes(data)
+
+    def next(self, frame):
+        return self.recorded[frame] if frame < len(self.recorded) else NEUTRAL
+
+
+class RealClock:
+    now = staticmethod(time.perf_counter)
+    sleep = staticmethod(time.sleep)
+
+
+class SimulatedClock:
+    """Time that only moves when advance() is called."""
+    def __init__(self):
+        self.time = 0.0
+
+    def now(self):
+        return self.time
+
+    def advance(self, seconds):
+        self.time += seconds
+
+
+class UdpEndpoint:
+    """A client's UDP socket; everything it sends goes to its side of the relay."""
+    def __init__(self, relay_address):
+        self.relay = relay_address
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((NET_HOST, 0))
+        self.socket.setblocking(False)
+
+    def send(self, data):
+        self.socket.sendto(data, self.relay)
+
+    def receive(self):
+        """The next waiting packet, or None."""
+        try:
+            return self.socket.recv(2048)
+        except BlockingIOError:
+            return None
+
+    def close(self):
+        self.socket.close()
+
+
+class MemoryEndpoint:
+    """A client's side of a SimulatedNetwork."""
+    def __init__(self, network, side):
+        self.network = network
+        self.side = side
+        self.inbox = deque()
+
+    def send(self, data):
+        self.network.impair(1 - self.side, data, self.network.clock.now())
+
+    def receive(self):
+        return self.inbox.popleft() if self.inbox else None
+
+    def close(self):
+        pass
+
+
+class RollbackClient:
+    def __init__(self, player, match, source, endpoint, frames, clock=RealClock):
+        self.player = player  # 0 plays red, 1 plays blue
+        self.match = match
+        self.source = source
+        self.frames = frames  # length of the match
+        self.endpoint = endpoint
+        self.clock = clock
+        self.started = None
+        self.finish_by = None
+        self.finished = False
+
+        self.frame = 0                # next frame to simulate
+        self.local = bytearray()      # our input for every frame so far
+        self.remote = bytearray()     # the peer's inputs, as far as we have them all
+        self.used = bytearray()       # the peer input each simulated frame assumed
+        self.states = {}              # frame -> match.save() from the start of that frame
+        self.checksums = {}           # frame -> CRC of the confirmed state at its start
+        self.peer_checksums = {}      # the same, as reported by the peer
+        self.peer_ack = 0             # how many of our inputs the peer has
+
+        # Stats
+        self.rollbacks = 0
+        self.max_depth = 0
+        self.resimulated = 0
+        self.resim_seconds = 0.0
+        self.stall_frames = 0
+        self.stalls = 0
+        self.stalled = False
+        self.compared = 0
+        self.desyncs = 0
+        self.first_desync = None
+        self.packets_sent = self.bytes_sent = 0
+        self.packets_received = self.bytes_received = 0
+        self.seconds = 0.0  # time taken to play every frame
+
+    # --- Simulation ---
+    def simulate(self, frame):
+        """Save the state at the start of `frame`, then step it."""
+        self.states[frame] = self.match.save()
+        if frame < len(self.remote):
+            remote = self.remote[frame]
+        else:
+            remote = self.remote[-1] if self.remote else NEUTRAL  # predict: same as last time
+        if frame < len(self.used):
+            self.used[frame] = remote
+        else:
+            self.used.append(remote)
+        local = self.local[frame]
+        if self.player == 0:
+            self.match.step(local, remote)
+        else:
+            self.match.step(remote, local)
+
+    def rollback(self, frame):
+        """Go back to the start of `frame` and simulate up to the present with corrected inputs."""
+        start = time.perf_counter()
+        self.match.load(self.states[frame])
+        for resim in range(frame, self.frame):
+            self.simulate(resim)
+        self.resim_seconds += time.perf_counter() - start
+        depth = self.frame - frame
+        self.rollbacks += 1
+        self.resimulated += depth
+        self.max_depth = max(self.max_depth, depth)
+        ROLLBACKS.inc()
+        RESIM_FRAMES.inc(depth)
+        ROLLBACK_DEPTH.observe(depth)
+
+    def advance(self):
+        """Simulate the next frame, or stall if the peer is too far behind."""
+        if self.frame - len(self.remote) >= NET_MAX_ROLLBACK:
+            if not self.stalled:
+                self.stalls += 1
+            self.stalled = True
+            self.stall_frames += 1
+            STALL_FRAMES.inc()
+            return
+        self.stalled = False
+        self.local.append(self.source.next(self.frame))
+        self.simulate(self.frame)
+        self.frame += 1
+
+    # --- Network ---
+    def receive(self):
+        """Read every waiting packet; return the first frame that was mispredicted, if any."""
+        mispredicted = None
+        while True:
+            data = self.endpoint.receive()
+            if data is None:
+                return mispredicted
+            self.packets_received += 1
+            self.bytes_received += len(data)
+            first, ack, check_frame, checksum, count = PACKET_HEADER.unpack_from(data)
+            self.peer_ack = max(self.peer_ack, ack)
+            if check_frame >= 0:
+                self.peer_checksums[check_frame] = checksum
+
+            # Take only inputs that extend what we have; a gap is filled by a later packet
+            skip = len(self.remote) - first
+            if skip < 0 or skip >= count:
+                continue
+            new_from = len(self.remote)
+            self.remote += data[PACKET_HEADER.size + skip:PACKET_HEADER.size + count]
+            for frame in range(new_from, min(len(self.remote), len(self.used))):
+                if self.used[frame] != self.remote[frame]:
+                    if mispredicted is None or frame < mispredicted:
+                        mispredicted = frame
+                    break
+
+    def send(self):
+        start = self.peer_ack
+        inputs = self.local[start:start + NET_MAX_INPUTS_PER_PACKET]
+        check_frame = max(self.checksums) if self.checksums else -1
+        packet = PACKET_HEADER.pack(start, len(self.remote), check_frame,
+                                    self.checksums.get(check_frame, 0), len(inputs)) + inputs
+        self.endpoint.send(packet)
+        self.packets_sent += 1
+        self.bytes_sent += len(packet)
+
+    def check(self):
+        """CRC every newly confirmed state, drop saves nothing can roll back to, compare with the peer."""
+        confirmed = min(len(self.remote), self.frame - 1)  # every input before it is final
+        for frame in sorted(self.states):
+            if frame > confirmed:
+                break
+            if frame not in self.checksums:
+                self.checksums[frame] = zlib.crc32(self.states[frame][0])
+            if frame < len(self.remote):
+                del self.states[frame]  # nothing can roll back this far any more
+        if len(self.checksums) > FPS * 10:
+            for frame in sorted(self.checksums)[:-FPS * 10]:
+                del self.checksums[frame]
+
+        for frame, checksum in list(self.peer_checksums.items()):
+            if frame in self.checksums:
+                self.compared += 1
+                if self.checksums[frame] != checksum:
+                    self.desyncs += 1
+                    if self.first_desync is None:
+                        self.first_desync = frame
+                del self.peer_checksums[frame]
+            elif self.checksums and frame < min(self.checksums):
+                del self.peer_checksums[frame]  # too old to compare
+
+    def step(self):
+        """One frame: take packets, roll back if needed, advance, check and send."""
+        now = self.clock.now()
+        if self.started is None:
+            self.started = now
+        mispredicted = self.receive()
+        if mispredicted is not None and mispredicted < self.frame:
+            self.rollback(mispredicted)
+        if self.frame < self.frames:
+            self.advance()
+            if self.frame == self.frames:
+                self.seconds = self.clock.now() - self.started
+        self.check()
+        self.send()
+
+        if self.frame == self.frames:
+            # Played every frame; keep sending until both sides have all the inputs
+            if len(self.remote) >= self.frames and self.peer_ack >= self.frames:
+                self.finished = True
+            self.finish_by = self.finish_by or now + NET_FINISH_SECONDS
+            if now > self.finish_by:
+                self.finished = True
+
+    def run(self):
+        """Step once a frame in real time until finished (one thread per client)."""
+        next_tick = self.clock.now()
+        while not self.finished:
+            self.step()
+            next_tick += 1 / FPS
+            delay = next_tick - self.clock.now()
+            if delay > 0:
+                self.clock.sleep(delay)
+            else:
+                next_tick = self.clock.now()  # fell behind; don't try to catch up
+        self.endpoint.close()
+
+    def report(self):
+        seconds = self.seconds or 1
+        return {
+            "frames": self.frame,
+            "seconds": round(self.seconds, 2),
+            "rollbacks": self.rollbacks,
+            "rollbacks_per_second": round(self.rollbacks / seconds, 2),
+            "mean_rollback_depth": round(self.resimulated / self.rollbacks, 2) if self.rollbacks else 0,
+            "max_rollback_depth": self.max_depth,
+            "resimulated_frames": self.resimulated,
+            "resimulated_fps": round(self.resimulated / seconds, 1),
+            "resim_ms_per_frame": round(self.resim_seconds * 1000 / self.resimulated, 3) if self.resimulated else 0,
+            "stalls": self.stalls,
+            "stall_frames": self.stall_frames,
+            "packets_sent": self.packets_sent,
+            "bytes_sent": self.bytes_sent + UDP_OVERHEAD * self.packets_sent,
+            "checksums_compared": self.compared,
+            "desyncs": self.desyncs,
+            "first_desync": self.first_desync,
+        }
+
+
+class NetemConditions:
+    """How one phase of a profile treats each packet."""
+    def __init__(self, seconds=None, latency_ms=0, jitter_ms=0, loss=0.0, duplicate=0.0,
+                 reorder=0.0, reorder_ms=None):
+        self.seconds = seconds
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.loss = loss
+        self.duplicate = duplicate
+        self.reorder = reorder
+        # A reordered packet is held back this much longer than its neighbours
+        self.reorder_delay = (reorder_ms if reorder_ms is not None else max(latency_ms, 10)) / 1000
+
+
+def load_profile(name):
+    """A profile from NETEM_PROFILES, or a JSON file holding a list of phases."""
+    if name in NETEM_PROFILES:
+        phases = NETEM_PROFILES[name]
+    else:
+        with open(name) as f:
+            phases = json.load(f)
+    return [NetemConditions(**phase) for phase in phases]
+
+
+class Netem:
+    """
+    Impairs packets between two sides following a profile, and holds each
+    one until it is due. Side i's packets go to side 1 - i.
+    """
+    def __init__(self, phases, seed=0):
+        self.phases = phases
+        self.random = random.Random(seed)
+        self.queue = []  # heap of (due, order, side to deliver to, data)
+        self.order = 0
+        self.started = 0.0
+        self.forwarded = self.dropped = self.duplicated = self.reordered = 0
+
+    def conditions(self, now):
+        elapsed = now - self.started
+        for phase in self.phases:
+            if phase.seconds is None or elapsed < phase.seconds:
+                return phase
+            elapsed -= phase.seconds
+        return self.phases[-1]
+
+    def impair(self, to_side, data, now):
+        phase = self.conditions(now)
+        if self.random.random() < phase.loss:
+            self.dropped += 1
+            return
+        copies = 2 if self.random.random() < phase.duplicate else 1
+        self.duplicated += copies - 1
+        for _ in range(copies):
+            delay = phase.latency + self.random.uniform(-phase.jitter, phase.jitter)
+            if self.random.random() < phase.reorder:
+                delay += phase.reorder_delay
+                self.reordered += 1
+            self.order += 1
+            heapq.heappush(self.queue, (now + max(delay, 0), self.order, to_side, data))
+
+    def due(self, now):
+        """Take every packet due by `now`, as (side, data), in the order they are due."""
+        while self.queue and self.queue[0][0] <= now:
+            due, order, side, data = heapq.heappop(self.queue)
+            yield side, data
+
+
+class NetemRelay(Netem):
+    """
+    Forwards UDP between two clients on localhost through Netem.
+
+    Client i sends to address(i); whatever arrives there goes to the other
+    client, from the other socket, once it is due.
+    """
+    def __init__(self, phases, seed=0):
+        super().__init__(phases, seed)
+        self.sockets = []
+        for _ in range(2):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.bind((NET_HOST, 0))
+            self.sockets.append(sock)
+        self.clients = [None, None]  # where each client sends from
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def address(self, side):
+        return self.sockets[side].getsockname()
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        self.thread.join()
+        for sock in self.sockets:
+            sock.close()
+
+    def run(self):
+        while not self.stopping.is_set():
+            now = time.perf_counter()
+            timeout = min(self.queue[0][0] - now, 0.05) if self.queue else 0.05
+            readable, _, _ = select.select(self.sockets, [], [], max(timeout, 0))
+            now = time.perf_counter()
+            for side, sock in enumerate(self.sockets):
+                if sock in readable:
+                    data, self.clients[side] = sock.recvfrom(2048)
+                    self.impair(1 - side, data, now)
+            for side, data in self.due(now):
+                if self.clients[side] is not None:
+                    self.sockets[side].sendto(data, self.clients[side])
+                    self.forwarded += 1
+
+
+class SimulatedNetwork(Netem):
+    """Netem without sockets or threads: packets wait in memory, timed by a SimulatedClock."""
+    def __init__(self, phases, seed=0):
+        super().__init__(phases, seed)
+        self.clock = SimulatedClock()
+        self.endpoints = [MemoryEndpoint(self, side) for side in (0, 1)]
+
+    def deliver(self):
+        for side, data in self.due(self.clock.now()):
+            self.endpoints[side].inbox.append(data)
+            self.forwarded += 1
+
+    def play(self, clients):
+        """Step both clients a frame at a time until both have finished."""
+        while not all(client.finished for client in clients):
+            self.deliver()
+            for client in clients:
+                if not client.finished:
+                    client.step()
+            self.clock.advance(1 / FPS)
+
+
+def run_match(profile, frames=600, characters=("Steve", "Googley"), seed=0, recordings=None,
+              simulated=False):
+    """
+    Play one match between two headless clients through a NetemRelay, or
+    a SimulatedNetwork if `simulated`.
+
+    `recordings`, if given, is one input byte string per player; otherwise
+    each side is played by AIControls. Returns (report, clients).
+    """
+    if simulated:
+        relay = SimulatedNetwork(load_profile(profile), seed=seed)
+        clock, endpoints = relay.clock, relay.endpoints
+    else:
+        relay = NetemRelay(load_profile(profile), seed=seed)
+        clock, endpoints = RealClock, [UdpEndpoint(relay.address(player)) for player in (0, 1)]
+    clients = []
+    for player in (0, 1):
+        match = NetMatch(*characters)
+        fighter, opponent = match.roster[player], match.roster[1 - player]
+        if recordings:
+            source = RecordedInputs(recordings[player])
+        else:
+            source = AIInputs(AIControls(fighter, opponent, config, seed=seed + player), fighter)
+        clients.append(RollbackClient(player, match, source, endpoints[player], frames, clock))
+
+    if simulated:
+        relay.play(clients)
+    else:
+        relay.start()
+        threads = [threading.Thread(target=client.run, daemon=True) for client in clients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        relay.stop()
+
+    states_match = pack_game(clients[0].match) == pack_game(clients[1].match)
+    report = {
+        "profile": profile,
+        "frames": frames,
+        "bytes_per_match": sum(client.report()["bytes_sent"] for client in clients),
+        "desyncs": sum(client.desyncs for client in clients) + (0 if states_match else 1),
+        "final_states_match": states_match,
+        "relay": {"forwarded": relay.forwarded, "dropped": relay.dropped,
+                  "duplicated": relay.duplicated, "reordered": relay.reordered},
+        "clients": [client.report() for client in clients],
+    }
+    return report, clients
+
+
+def format_report(report):
+    lines = [f"{report['profile']}: {report['frames']} frames, "
+             f"{report['bytes_per_match'] / 1024:.1f} KB per match, "
+             f"{report['desyncs']} desyncs (final states {'match' if report['final_states_match'] else 'DIFFER'})",
+             "  relay: " + ", ".join(f"{key} {value}" for key, value in report["relay"].items())]
+    for player, client in enumerate(report["clients"], 1):
+        lines.append(
+            f"  p{player}: {client['rollbacks_per_second']} rollbacks/s "
+            f"(mean depth {client['mean_rollback_depth']}, max {client['max_rollback_depth']}) | "
+            f"resim {client['resimulated_fps']} frames/s at {client['resim_ms_per_frame']} ms | "
+            f"{client['stalls']} stalls, {client['stall_frames']} frames | "
+            f"{client['bytes_sent'] * 8 / 1000 / (client['seconds'] or 1):.1f} kbit/s")
+    return "\n".join(lines)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Googley Fighter netcode benchmark")
+    parser.add_argument("--profile", action="append",
+                        help=f"network profile: {', '.join(NETEM_PROFILES)} or a JSON file (repeatable)")
+    parser.add_argument("--frames", type=int, default=600, help="frames per match (60 a second)")
+    parser.add_argument("--characters", nargs=2, default=["Steve", "Googley"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--record", metavar="DIR", help="save each player's inputs to DIR/p1.inputs, p2.inputs")
+    parser.add_argument("--replay", metavar="DIR", help="play inputs saved with --record instead of the AI")
+    parser.add_argument("--json", metavar="PATH", help="also write the reports as JSON")
+    parser.add_argument("--simulated", action="store_true",
+                        help="run on a simulated clock and in-memory network instead of real UDP")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    recordings = None
+    if args.replay:
+        recordings = []
+        for player in (1, 2):
+            with open(os.path.join(args.replay, f"p{player}.inputs"), "rb") as f:
+                recordings.append(f.read())
+
+    reports = []
+    for profile in args.profile or ["lan", "wifi", "mobile", "spikes"]:
+        report, clients = run_match(profile, args.frames, args.characters, args.seed, recordings,
+                                    simulated=args.simulated)
+        print(format_report(report))
+        reports.append(report)
+        if args.record:
+            os.makedirs(args.record, exist_ok=True)
+            for player, client in enumerate(clients, 1):
+                with open(os.path.join(args.record, f"p{player}.inputs"), "wb") as f:
+                    f.write(client.local)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+    return 1 if any(report["desyncs"] for report in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
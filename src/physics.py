@@ -0,0 +1,260 @@
+# src/physics.py
+"""
+Deterministic fight simulation for Googley Fighter.
+
+Positions and speeds are fixed-point integers (FIXED_ONE units per pixel),
+so sub-pixel motion is kept instead of being truncated by pygame.Rect and
+every machine computes exactly the same numbers.
+
+step_fight() advances all fighters together: everyone reads input, then
+everyone moves, then every attack and fireball is checked against the same
+positions, and only then is damage applied. Nobody gets to act first just
+because they come first in the list.
+
+Movement and timers are systems: they run over the component arrays of a
+FighterStore (see ecs.py). A store with at least VECTOR_MIN_FIGHTERS
+fighters moving (a party mode) is updated with a handful of NumPy operations
+for all of them at once; below that (a normal two-player fight) the same
+rules run row by row on plain ints, since each NumPy call costs about a
+microsecond however few rows it covers. Both give exactly the same numbers.
+"""
+
+import zlib
+import numpy as np
+from config import SCREEN_WIDTH, GROUND_Y, VECTOR_MIN_FIGHTERS
+from ecs import by_store
+
+FIXED_SHIFT = 8
+FIXED_ONE = 1 << FIXED_SHIFT
+
+
+def to_fixed(value):
+    """Convert pixels (int or float) to fixed-point units."""
+    return int(round(value * FIXED_ONE))
+
+
+def to_pixels(value):
+    """Convert fixed-point units to whole pixels (rounding down)."""
+    return value >> FIXED_SHIFT
+
+
+def move_fighters(moves):
+    """
+    Jump, walk, fall and stay on screen, for every (fighter, intent) in `moves`.
+
+    Runs once per store over all of its moving fighters, then copies the new
+    positions into their rects.
+    """
+    if len(moves) < VECTOR_MIN_FIGHTERS:
+        for fighter, intent in moves:
+            move_row(fighter.store, fighter.id, intent[0], intent[1])
+        return
+    groups = {}
+    for fighter, intent in moves:
+        groups.setdefault(fighter.store, []).append((fighter.id, intent[0], intent[1]))
+    for store, rows in groups.items():
+        if len(rows) < VECTOR_MIN_FIGHTERS:
+            for fighter_id, dx, dy in rows:
+                move_row(store, fighter_id, dx, dy)
+            continue
+        ids, dx, dy = zip(*rows)
+        move_system(store, row_index(ids), np.array(dx, dtype=np.int32), np.array(dy, dtype=np.int32))
+
+
+def row_index(ids):
+    """
+    Index for the rows `ids` of a store's arrays: a slice when they are
+    consecutive (so reading a column is a view, not a copy), else an array.
+    """
+    first = ids[0]
+    if ids == tuple(range(first, first + len(ids))):
+        return slice(first, first + len(ids))
+    return np.array(ids, dtype=np.intp)
+
+
+def index_rows(index):
+    """The row numbers a row_index() covers, as plain ints."""
+    if isinstance(index, slice):
+        return range(index.start, index.stop)
+    return index.tolist()
+
+
+def move_row(store, i, dx, dy):
+    """move_system() for one fighter, on plain ints."""
+    a = store.arrays
+    pos_y = a["pos_y"][i]
+    vertical_speed = a["vertical_speed"][i]
+    jumping = a["is_jumping"][i] != 0
+    height = a["height"][i] * FIXED_ONE
+    ground = GROUND_Y * FIXED_ONE
+
+    # Jumps only start from the ground
+    if dy < 0 and not jumping and (pos_y >> FIXED_SHIFT) + a["height"][i] >= GROUND_Y:
+        vertical_speed = a["jump_speed"][i]
+        jumping = True
+
+    pos_x = a["pos_x"][i]
+    if dx:
+        a["facing"][i] = 1 if dx > 0 else -1
+        pos_x += dx * a["speed"][i] * FIXED_ONE
+    right_edge = SCREEN_WIDTH * FIXED_ONE - a["width"][i] * FIXED_ONE
+    if pos_x < 0:
+        pos_x = 0
+    elif pos_x > right_edge:
+        pos_x = right_edge
+    a["pos_x"][i] = pos_x
+
+    # Gravity: for a jump, or when off the ground without one
+    airborne = jumping or pos_y + height < ground
+    if airborne:
+        vertical_speed += a["gravity"][i]
+        pos_y += vertical_speed
+        if jumping:
+            ceiling = a["max_jump_height"][i] * FIXED_ONE
+            if pos_y < ceiling:
+                pos_y = ceiling
+                vertical_speed = 0
+            if pos_y + height > ground:  # landed
+                pos_y = ground - height
+                vertical_speed = 0
+                jumping = False
+                a["is_jumping"][i] = 0
+            else:
+                a["is_jumping"][i] = 1
+    else:
+        pos_y = ground - height
+        vertical_speed = 0
+
+    a["pos_y"][i] = pos_y
+    a["vertical_speed"][i] = vertical_speed
+    store.rects[i].topleft = (pos_x >> FIXED_SHIFT, pos_y >> FIXED_SHIFT)
+
+
+def move_system(store, ids, dx, dy):
+    v = store.views
+
+    def load(name):
+        return v[name][ids].astype(np.int32)
+
+    pos_x, pos_y, vertical_speed = load("pos_x"), load("pos_y"), load("vertical_speed")
+    jumping = v["is_jumping"][ids] != 0
+    height = load("height") << FIXED_SHIFT
+    ground = GROUND_Y * FIXED_ONE
+
+    # Jumps only start from the ground
+    takeoff = (dy < 0) & ~jumping & ((pos_y >> FIXED_SHIFT) + load("height") >= GROUND_Y)
+    vertical_speed = np.where(takeoff, load("jump_speed"), vertical_speed)
+    jumping |= takeoff
+
+    facing = v["facing"]
+    facing[ids] = np.where(dx != 0, np.sign(dx), facing[ids])
+    pos_x += dx * (load("speed") << FIXED_SHIFT)
+
+    # Gravity: for a jump, or when off the ground without one
+    airborne = jumping | (pos_y + height < ground)
+    vertical_speed += load("gravity") * airborne
+    pos_y += vertical_speed * airborne
+
+    ceiling = load("max_jump_height") << FIXED_SHIFT
+    hit_ceiling = jumping & (pos_y < ceiling)
+    pos_y = np.where(hit_ceiling, ceiling, pos_y)
+
+    landed = jumping & (pos_y + height > ground)
+    grounded = landed | ~airborne
+    pos_y = np.where(grounded, ground - height, pos_y)
+    vertical_speed *= ~(hit_ceiling | grounded)
+    jumping &= ~landed
+
+    right_edge = (SCREEN_WIDTH << FIXED_SHIFT) - (load("width") << FIXED_SHIFT)
+    pos_x = np.minimum(np.maximum(pos_x, 0), right_edge)
+
+    v["pos_x"][ids] = pos_x
+    v["pos_y"][ids] = pos_y
+    v["vertical_speed"][ids] = vertical_speed
+    v["is_jumping"][ids] = jumping
+
+    rects = store.rects
+    for fighter_id, x, y in zip(index_rows(ids), (pos_x >> FIXED_SHIFT).tolist(), (pos_y >> FIXED_SHIFT).tolist()):
+        rects[fighter_id].topleft = (x, y)
+
+
+def advance_fighters(fighters):
+    """Count down every timer, then advance each fighter's animation."""
+    if len(fighters) < VECTOR_MIN_FIGHTERS:
+        for fighter in fighters:
+            timer_row(fighter.store, fighter.id)
+            fighter.animate()
+        return
+    for store, group in by_store(fighters).items():
+        if len(group) < VECTOR_MIN_FIGHTERS:
+            for fighter in group:
+                timer_row(store, fighter.id)
+        else:
+            timer_system(store, row_index(tuple(fighter.id for fighter in group)))
+    for fighter in fighters:
+        fighter.animate()
+
+
+def timer_system(store, ids):
+    v = store.views
+    for name in ("damage_timer", "attack_timer", "fireball_timer"):
+        timer = v[name][ids]
+        v[name][ids] = timer - (timer > 0)
+
+    # The damage animation ends once its timer has run out
+    anim = v["damage_anim_timer"][ids]
+    running = anim > 0
+    v["is_damaged"][ids] = v["is_damaged"][ids] * running
+    v["damage_anim_timer"][ids] = anim - running
+
+    v["tick"][ids] += 1
+
+
+def timer_row(store, i):
+    """timer_system() for one fighter."""
+    a = store.arrays
+    for name in ("damage_timer", "attack_timer", "fireball_timer"):
+        column = a[name]
+        if column[i] > 0:
+            column[i] -= 1
+
+    anim = a["damage_anim_timer"]
+    if anim[i] > 0:
+        anim[i] -= 1
+    else:
+        a["is_damaged"][i] = 0
+
+    a["tick"][i] += 1
+
+
+def step_fight(fighters):
+    """
+    Advance every fighter by one tick, resolving their actions simultaneously.
+
+    Returns the hits that landed as (target, damage, from_left).
+    """
+    others = [[other for other in fighters if other is not fighter] for fighter in fighters]
+
+    # 1. Everyone reads input from the same starting state
+    intents = [fighter.read_input(rivals) for fighter, rivals in zip(fighters, others)]
+
+    # 2. Everyone moves
+    move_fighters([(fighter, intent) for fighter, intent in zip(fighters, intents) if intent is not None])
+
+    # 3. Attacks, fireball spawns and fireball flight, all collected as hits
+    hits = []
+    for fighter, intent, rivals in zip(fighters, intents, others):
+        fighter.act(intent, rivals, hits)
+    for fighter, rivals in zip(fighters, others):
+        fighter.fireballs.update(rivals, hits)
+
+    # 4. Damage lands after every check has been made
+    landed = [hit for hit in hits if hit[0].take_damage(hit[1], from_left=hit[2])]
+
+    advance_fighters(fighters)
+    return landed
+
+
+def state_checksum(state, previous=0):
+    """Fold one tick's packed state into a rolling CRC32."""
+    return zlib.crc32(state, previous)
@@ -0,0 +1,77 @@
+# src/quality.py
+"""
+Adaptive quality for Googley Fighter.
+
+The governor watches how long each frame takes. If the average over the last
+QUALITY_WINDOW frames gets close to the frame budget it steps down one
+quality level; once there is plenty of headroom again it steps back up. The
+two thresholds are far apart and every change is followed by a cooldown, so
+it doesn't flip back and forth.
+
+Only presentation changes with the level. Simulation (animation indices,
+hit masks, stun, checksums) runs the same on every machine; anim_step only
+picks which frame's image is drawn.
+"""
+
+from collections import deque
+from config import (FPS, QUALITY_WINDOW, QUALITY_DOWN_AT, QUALITY_UP_AT,
+                    QUALITY_COOLDOWN)
+
+# Level -> what we can afford at that level
+QUALITY_LEVELS = [
+    {"name": "high", "particles": 1.0, "anim_step": 1, "menu_sprites": True,
+     "alpha_overlays": True, "full_hud": True},
+    {"name": "medium", "particles": 0.5, "anim_step": 2, "menu_sprites": True,
+     "alpha_overlays": True, "full_hud": True},
+    {"name": "low", "particles": 0.25, "anim_step": 2, "menu_sprites": False,
+     "alpha_overlays": False, "full_hud": True},
+    {"name": "minimal", "particles": 0.0, "anim_step": 3, "menu_sprites": False,
+     "alpha_overlays": False, "full_hud": False},
+]
+
+
+class QualityGovernor:
+    def __init__(self, budget_ms=1000 / FPS, window=QUALITY_WINDOW):
+        self.budget_ms = budget_ms
+        self.samples = deque(maxlen=window)
+        self.total = 0.0
+        self.level = 0
+        self.settings = QUALITY_LEVELS[0]
+        self.frames_since_change = 0
+        self.enabled = True
+
+    def average_ms(self):
+        return self.total / len(self.samples) if self.samples else 0.0
+
+    def record(self, frame_ms):
+        """Add one frame's work time and step the level if needed."""
+        if len(self.samples) == self.samples.maxlen:
+            self.total -= self.samples[0]
+        self.samples.append(frame_ms)
+        self.total += frame_ms
+        self.frames_since_change += 1
+
+        if not self.enabled or len(self.samples) < self.samples.maxlen:
+            return
+        if self.frames_since_change < QUALITY_COOLDOWN:
+            return
+
+        average = self.average_ms()
+        if average > self.budget_ms * QUALITY_DOWN_AT and self.level < len(QUALITY_LEVELS) - 1:
+            self.set_level(self.level + 1)
+        elif average < self.budget_ms * QUALITY_UP_AT and self.level > 0:
+            self.set_level(self.level - 1)
+
+    def set_level(self, level):
+        self.level = level
+        self.settings = QUALITY_LEVELS[level]
+        self.samples.clear()
+        self.total = 0.0
+        self.frames_since_change = 0
+
+    def report(self):
+        return (f"quality {self.settings['name']} ({self.level}) | "
+                f"frame {self.average_ms():.2f}/{self.budget_ms:.2f} ms")
+
+
+governor = QualityGovernor()
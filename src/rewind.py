@@ -0,0 +1,343 @@
+# src/rewind.py
+"""
+Rewind support for training mode.
+
+Every frame of a training fight is packed into a fixed-size byte string.
+Every REWIND_KEYFRAME_INTERVAL frames we keep that string as a keyframe; the
+frames in between are stored as the XOR against their keyframe, zlib
+compressed. Almost nothing changes from one frame to the next, so most delta
+bytes are zero and compress down to a few dozen bytes.
+
+The AI opponent is part of the frame too: its cooldowns, how far along its
+RNG is and what its player model has learned, so after a rewind it neither
+remembers the future nor rolls different dice. The model's count tables are
+~100 KB and only change when the player's input does, so frames store the
+tables' revision and the Rewinder keeps one compressed copy per revision.
+"""
+
+import struct
+import sys
+import time
+import zlib
+from array import array
+from collections import deque
+from config import FPS, REWIND_SECONDS, REWIND_KEYFRAME_INTERVAL, REWIND_MAX_FIREBALLS
+from fireball import Fireball
+from physics import to_pixels
+
+GAME_FORMAT = struct.Struct("<i?")
+FIGHTER_FORMAT = struct.Struct("<iiiBiiii?B?ii?i?iiii")
+FIREBALL_FORMAT = struct.Struct("<?iibii")
+EMPTY_FIREBALL = FIREBALL_FORMAT.pack(False, 0, 0, 0, 0, 0)
+AI_FORMAT = struct.Struct("<iiii")
+MODEL_FORMAT = struct.Struct("<iiii?")
+
+
+def xor_bytes(a, b):
+    """XOR two byte strings of the same length."""
+    n = len(a)
+    return (int.from_bytes(a, "little") ^ int.from_bytes(b, "little")).to_bytes(n, "little")
+
+
+def pack_fighter(fighter):
+    if not fighter.active_damage_frames:
+        damage_side = 0
+    elif fighter.active_damage_frames is fighter.damage_frames_right:
+        damage_side = 1
+    else:
+        damage_side = 2
+
+    parts = [FIGHTER_FORMAT.pack(
+        fighter.pos_x, fighter.pos_y, fighter.health,
+        0 if fighter.direction == "right" else 1,
+        fighter.damage_timer, fighter.damage_frame_index,
+        fighter.damage_frame_count, fighter.damage_anim_timer,
+        fighter.is_damaged, damage_side,
+        fighter.is_attacking, fighter.attack_timer, fighter.stun_timer,
+        fighter.is_shooting, fighter.fireball_timer,
+        fighter.is_jumping, fighter.vertical_speed,
+        fighter.current_frame, fighter.frame_count, fighter.tick,
+    )]
+
+    fireballs = fighter.fireballs.sprites()[:REWIND_MAX_FIREBALLS]
+    for fb in fireballs:
+        parts.append(FIREBALL_FORMAT.pack(True, fb.rect.x, fb.rect.y, fb.direction, fb.speed, fb.damage))
+    parts.extend([EMPTY_FIREBALL] * (REWIND_MAX_FIREBALLS - len(fireballs)))
+    return b"".join(parts)
+
+
+def unpack_fighter(fighter, data, offset):
+    """Restore a fighter from `data` at `offset` and return the next offset."""
+    (fighter.pos_x, fighter.pos_y, fighter.health, direction,
+     fighter.damage_timer, fighter.damage_frame_index,
+     fighter.damage_frame_count, fighter.damage_anim_timer,
+     fighter.is_damaged, damage_side,
+     fighter.is_attacking, fighter.attack_timer, fighter.stun_timer,
+     fighter.is_shooting, fighter.fireball_timer,
+     fighter.is_jumping, fighter.vertical_speed,
+     fighter.current_frame, fighter.frame_count, fighter.tick,
+     ) = FIGHTER_FORMAT.unpack_from(data, offset)
+    offset += FIGHTER_FORMAT.size
+
+    fighter.rect.topleft = (to_pixels(fighter.pos_x), to_pixels(fighter.pos_y))
+    fighter.direction = "right" if direction == 0 else "left"
+    fighter.active_damage_frames = {
+        0: (), 1: fighter.damage_frames_right, 2: fighter.damage_frames_left
+    }[damage_side]
+
+    fighter.fireballs.empty()
+    for _ in range(REWIND_MAX_FIREBALLS):
+        active, fx, fy, fdir, speed, damage = FIREBALL_FORMAT.unpack_from(data, offset)
+        offset += FIREBALL_FORMAT.size
+        if active:
+            fb = Fireball(0, 0, fdir, fighter, speed=speed, damage=damage)
+            fb.rect.topleft = (fx, fy)
+            fighter.fireballs.add(fb)
+
+    # Show the frame the fighter was showing at the time
+    frames = fighter.frames_right if fighter.direction == "right" else fighter.frames_left
+    if fighter.is_damaged and fighter.active_damage_frames:
+        fighter.image = fighter.active_damage_frames[fighter.damage_frame_index]
+    elif frames:
+        fighter.image = frames[fighter.current_frame % len(frames)]
+    else:
+        fighter.image = fighter.spawn_image
+    fighter.command_reader.reset()
+    fighter.update_masks()
+    return offset
+
+
+def pack_game(game):
+    """
+    Pack the fight state of a GameCanvas into bytes.
+
+    Everything packed is an integer, so the same state always gives the same
+    bytes; GameCanvas also uses this for its per-tick checksum.
+    """
+    parts = [GAME_FORMAT.pack(game.round_tick, game.game_over)]
+    for fighter in (game.red_fighter, game.blue_fighter):
+        parts.append(pack_fighter(fighter))
+    return b"".join(parts)
+
+
+def unpack_game(game, data):
+    """Restore a GameCanvas from pack_game() bytes and return the next offset."""
+    game.round_tick, game.game_over = GAME_FORMAT.unpack_from(data, 0)
+    game.time_remaining = max(0, game.total_time - game.round_tick / FPS)
+    offset = GAME_FORMAT.size
+    for fighter in (game.red_fighter, game.blue_fighter):
+        offset = unpack_fighter(fighter, data, offset)
+    return offset
+
+
+def pack_ai(controls):
+    """Pack an AIControls; for an adaptive one, everything but the model's count tables."""
+    parts = [AI_FORMAT.pack(controls.attack_cooldown, controls.fireball_cooldown_timer,
+                            controls.move_cooldown, controls.draws)]
+    model = getattr(controls, "model", None)
+    if model is not None:
+        last_action = -1 if model.last_action is None else model.last_action
+        parts.append(MODEL_FORMAT.pack(model.revision, model.frames_total, model.attacks_total,
+                                       last_action, model.was_attacking))
+        parts.append(array("i", model.history).tobytes())
+        parts.append(model.frames_at.tobytes())
+        parts.append(model.attacks_at.tobytes())
+    return b"".join(parts)
+
+
+def unpack_ai(controls, data, offset):
+    """Restore an AIControls from pack_ai() bytes and return the next offset."""
+    (controls.attack_cooldown, controls.fireball_cooldown_timer,
+     controls.move_cooldown, draws) = AI_FORMAT.unpack_from(data, offset)
+    offset += AI_FORMAT.size
+    controls.skip_to(draws)
+    model = getattr(controls, "model", None)
+    if model is not None:
+        (model.revision, model.frames_total, model.attacks_total,
+         last_action, model.was_attacking) = MODEL_FORMAT.unpack_from(data, offset)
+        offset += MODEL_FORMAT.size
+        model.last_action = None if last_action == -1 else last_action
+        size = len(model.history) * 4
+        model.history = array("i", data[offset:offset + size]).tolist()
+        offset += size
+        for counts in (model.frames_at, model.attacks_at):
+            size = len(counts) * counts.itemsize
+            counts[:] = array("H", data[offset:offset + size])
+            offset += size
+    return offset
+
+
+def pack_tables(model):
+    """A player model's count tables, compressed; they're mostly zeros."""
+    return zlib.compress(b"".join(
+        table.counts.tobytes() + table.totals.tobytes() + table.attacks.tobytes() + table.fireballs.tobytes()
+        for table in model.tables), 1)
+
+
+def unpack_tables(model, data):
+    data = zlib.decompress(data)
+    offset = 0
+    for table in model.tables:
+        for counts in (table.counts, table.totals, table.attacks, table.fireballs):
+            size = len(counts) * counts.itemsize
+            counts[:] = array("H", data[offset:offset + size])
+            offset += size
+
+
+class RewindBuffer:
+    """
+    Ring buffer of frames stored as keyframes plus compressed XOR deltas.
+
+    Frames are kept in groups: one raw keyframe followed by the deltas that
+    depend on it. When the buffer is full the oldest whole group is dropped,
+    so a delta never outlives its keyframe.
+    """
+    def __init__(self, seconds=REWIND_SECONDS, fps=FPS, keyframe_interval=REWIND_KEYFRAME_INTERVAL):
+        self.capacity = seconds * fps
+        self.keyframe_interval = keyframe_interval
+        self.groups = deque()  # [keyframe, [delta, ...]]
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.groups.clear()
+        self.count = 0
+
+    def push(self, frame):
+        if not self.groups or len(self.groups[-1][1]) + 1 >= self.keyframe_interval:
+            self.groups.append([frame, []])
+        else:
+            keyframe, deltas = self.groups[-1]
+            deltas.append(zlib.compress(xor_bytes(frame, keyframe), 1))
+        self.count += 1
+
+        # Drop whole groups while we'd still have a full history without them
+        while self.count - (len(self.groups[0][1]) + 1) >= self.capacity:
+            keyframe, deltas = self.groups.popleft()
+            self.count -= len(deltas) + 1
+
+    def get(self, index):
+        """Return frame `index`, where 0 is the oldest frame kept."""
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        for keyframe, deltas in self.groups:
+            size = len(deltas) + 1
+            if index < size:
+                if index == 0:
+                    return keyframe
+                return xor_bytes(zlib.decompress(deltas[index - 1]), keyframe)
+            index -= size
+
+    def truncate(self, length):
+        """Forget every frame after the first `length`."""
+        while self.count > length:
+            keyframe, deltas = self.groups[-1]
+            if deltas:
+                deltas.pop()
+            else:
+                self.groups.pop()
+            self.count -= 1
+
+    def memory_bytes(self):
+        """Approximate memory held by the stored frames, including object overhead."""
+        total = sys.getsizeof(self.groups)
+        for keyframe, deltas in self.groups:
+            total += sys.getsizeof(keyframe) + sys.getsizeof(deltas)
+            total += sum(sys.getsizeof(delta) for delta in deltas)
+        return total
+
+
+class Rewinder:
+    """Records a training fight every frame and lets the player scrub through it."""
+    def __init__(self, game):
+        self.game = game
+        self.buffer = RewindBuffer()
+        self.active = False
+        self.position = 0
+        self.seek_ms = 0
+        self.tables = {}  # (fighter index, model revision) -> pack_tables()
+
+    def ai_controls(self):
+        """(index, controls) for each fighter driven by an AI."""
+        fighters = (self.game.red_fighter, self.game.blue_fighter)
+        return [(i, fighter.controls) for i, fighter in enumerate(fighters)
+                if hasattr(fighter.controls, "draws")]
+
+    def reset(self):
+        self.buffer.clear()
+        self.tables.clear()
+        self.active = False
+        self.position = 0
+
+    def record(self):
+        parts = [pack_game(self.game)]
+        size = len(parts[0])
+        revision_offsets = {}  # where each model's revision sits in the frame
+        for i, controls in self.ai_controls():
+            parts.append(pack_ai(controls))
+            model = getattr(controls, "model", None)
+            if model is not None:
+                revision_offsets[i] = size + AI_FORMAT.size
+                if (i, model.revision) not in self.tables:
+                    self.tables[i, model.revision] = pack_tables(model)
+            size += len(parts[-1])
+        self.buffer.push(b"".join(parts))
+        if len(self.tables) > len(revision_offsets) * REWIND_KEYFRAME_INTERVAL:
+            self.drop_old_tables(revision_offsets)
+
+    def drop_old_tables(self, revision_offsets):
+        """Forget table copies from before the oldest frame still kept."""
+        oldest = self.buffer.get(0)
+        first = {i: MODEL_FORMAT.unpack_from(oldest, offset)[0] for i, offset in revision_offsets.items()}
+        self.tables = {key: tables for key, tables in self.tables.items() if key[1] >= first[key[0]]}
+
+    def restore(self, frame):
+        offset = unpack_game(self.game, frame)
+        for i, controls in self.ai_controls():
+            offset = unpack_ai(controls, frame, offset)
+            model = getattr(controls, "model", None)
+            if model is not None:
+                unpack_tables(model, self.tables[i, model.revision])
+
+    def start(self):
+        """Freeze the fight on the newest recorded frame."""
+        if not len(self.buffer):
+            return
+        self.active = True
+        self.position = len(self.buffer) - 1
+
+    def step(self, frames):
+        """Move `frames` frames back (negative) or forward (positive) and show it."""
+        position = max(0, min(len(self.buffer) - 1, self.position + frames))
+        if position == self.position:
+            return
+        self.position = position
+
+        start = time.perf_counter()
+        self.restore(self.buffer.get(position))
+        self.seek_ms = (time.perf_counter() - start) * 1000
+
+    def resume(self):
+        """Carry on playing from the frame on screen, dropping what came after."""
+        self.buffer.truncate(self.position + 1)
+        self.active = False
+        # The model learns again from here, so later revisions will differ
+        for i, controls in self.ai_controls():
+            model = getattr(controls, "model", None)
+            if model is not None:
+                self.tables = {key: tables for key, tables in self.tables.items()
+                               if key[0] != i or key[1] <= model.revision}
+
+    def tables_bytes(self):
+        return sum(sys.getsizeof(tables) for tables in self.tables.values())
+
+    def seconds_back(self):
+        return (len(self.buffer) - 1 - self.position) / FPS
+
+    def report(self):
+        """Overlay text: history length, memory used and seek time."""
+        return (f"history {len(self.buffer) / FPS:.1f}s ({len(self.buffer)} frames) | "
+                f"{(self.buffer.memory_bytes() + self.tables_bytes()) / 1024:.1f} KB | "
+                f"seek {self.seek_ms:.2f} ms")
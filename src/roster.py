@@ -0,0 +1,138 @@
+# src/roster.py
+"""
+The character roster.
+
+assets/data/roster.json is the index: each character's name, the directory
+holding its pack and the animation shown on the select screen. That's all
+that is read at startup, however many characters there are.
+
+A pack is the character.json in that directory: the file for each
+animation and the character's stats (any stat left out keeps its default).
+It's read the first time the character is needed. Its fight animations
+are decoded by the asset prefetcher on request, and once more than
+ROSTER_LOADED_PACKS characters have been used, the least recently used
+one's frames are dropped again. Characters in the current fight are never
+dropped.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from config import ROSTER_LOADED_PACKS
+from assets import assets, PRIORITY_LATER
+
+ROSTER_PATH = os.path.join("assets", "data", "roster.json")
+PACK_FILE = "character.json"
+
+# Size every character frame is scaled to
+FRAME_SCALE = (64, 64)
+
+# What a Fighter is built from, in order
+FIGHT_ANIMATIONS = ("walk_right", "walk_left", "damage_right", "damage_left")
+
+
+class Stats:
+    """A character's numbers, from the "stats" in its pack."""
+    def __init__(self, speed=5, max_health=100, attack_damage=10, attack_range=40, attack_cooldown=120,
+                 fireball_damage=15, fireball_speed=10, fireball_cooldown=300):
+        self.speed = speed
+        self.max_health = max_health
+        self.attack_damage = attack_damage
+        self.attack_range = attack_range
+        self.attack_cooldown = attack_cooldown      # ticks
+        self.fireball_damage = fireball_damage
+        self.fireball_speed = fireball_speed
+        self.fireball_cooldown = fireball_cooldown  # ticks
+
+
+class CharacterPack:
+    """One character's animations and stats."""
+    def __init__(self, name, directory, animations, stats=None):
+        self.name = name
+        self.directory = directory
+        self.animations = animations  # animation -> file in directory
+        self.stats = Stats(**(stats or {}))
+
+    @classmethod
+    def load(cls, name, directory):
+        with open(os.path.join(directory, PACK_FILE)) as f:
+            data = json.load(f)
+        return cls(name, directory, data["animations"], data.get("stats"))
+
+    def path(self, animation):
+        return os.path.join(self.directory, self.animations[animation])
+
+    def fight_paths(self):
+        return tuple(self.path(animation) for animation in FIGHT_ANIMATIONS)
+
+
+class Roster:
+    def __init__(self, path=ROSTER_PATH, max_loaded=ROSTER_LOADED_PACKS):
+        with open(path) as f:
+            data = json.load(f)
+        self.entries = {entry["name"]: entry for entry in data["characters"]}
+        self.names = tuple(self.entries)
+        self.default_opponent = data.get("default_opponent", self.names[0])
+        self.max_loaded = max_loaded
+        self.packs = {}               # name -> CharacterPack, read on first use
+        self.loaded = OrderedDict()   # characters with frames requested, least recently used first
+        self.pinned = frozenset()     # the characters fighting right now
+        self.lock = threading.Lock()  # the fight's loader thread uses packs too
+
+    def preview_path(self, name):
+        entry = self.entries[name]
+        return os.path.join(entry["pack"], entry["preview"])
+
+    def pack(self, name):
+        with self.lock:
+            pack = self.packs.get(name)
+            if pack is None:
+                pack = self.packs[name] = CharacterPack.load(name, self.entries[name]["pack"])
+            return pack
+
+    def use(self, name):
+        """The pack for `name`, marked as just used. May unload the least recently used one."""
+        pack = self.pack(name)
+        with self.lock:
+            self.loaded[name] = True
+            self.loaded.move_to_end(name)
+            excess = len(self.loaded) - self.max_loaded
+            unused = [other for other in self.loaded if other != name and other not in self.pinned]
+            evicted = unused[:max(0, excess)]
+            for other in evicted:
+                del self.loaded[other]
+        for other in evicted:
+            if not self.unload(other):
+                with self.lock:
+                    # Still decoding: first in line to go next time
+                    self.loaded[other] = True
+                    self.loaded.move_to_end(other, last=False)
+        return pack
+
+    def request(self, name, priority=PRIORITY_LATER):
+        """Start decoding a character's fight animations in the background."""
+        for path in self.use(name).fight_paths():
+            assets.request(path, FRAME_SCALE, priority)
+
+    def pin(self, names):
+        """Keep these characters' frames loaded until the next pin()."""
+        with self.lock:
+            self.pinned = frozenset(names)
+
+    def unload(self, name):
+        """Drop a character's fight frames; False if some were still decoding."""
+        # The pack itself is a few hundred bytes and stays; only the frames go
+        forgotten = [assets.forget(path, FRAME_SCALE) for path in self.packs[name].fight_paths()]
+        return all(forgotten)
+
+
+_roster = None
+
+
+def get_roster():
+    """Return the shared Roster, reading the index on first use."""
+    global _roster
+    if _roster is None:
+        _roster = Roster()
+    return _roster
@@ -0,0 +1,508 @@
+# src/scenes.py
+"""
+Scenes for Googley Fighter.
+
+GameCanvas runs a single loop and hands each frame to the current scene:
+events go to handle_event(), then update(dt) and draw(screen) are called once.
+Scenes never flip the display or tick the clock themselves.
+
+Before a scene is shown its preload() runs on a background thread, so the
+scene we are leaving keeps animating while the next one decodes its assets.
+"""
+
+import threading
+import pygame
+import config
+from config import SCREEN_WIDTH, SCREEN_HEIGHT
+from sounds import audio, preload, BACKGROUND_SOUND, BUTTON_SOUND, DAMAGE_SOUND, DEATH_SOUND
+from quality import governor
+from latency import event_stamp
+from assets import assets, PRIORITY_SOON
+from roster import get_roster, FRAME_SCALE
+from widgets import Button, Label, flipped
+
+
+class Scene:
+    """Base class for a screen of the game."""
+    next_scenes = ()  # scenes worth preloading as soon as this one is shown
+
+    def __init__(self, game):
+        self.game = game
+        self.loaded = False
+        self.error = None
+        self._loader = None
+
+    # --- Loading ---
+    def preload(self):
+        """Load assets. Runs on a background thread, so don't touch the display."""
+
+    def start_preload(self):
+        if self.loaded or self._loader is not None:
+            return
+        self._loader = threading.Thread(target=self._run_preload, daemon=True)
+        self._loader.start()
+
+    def _run_preload(self):
+        try:
+            self.preload()
+            self.loaded = True
+        except Exception as error:  # re-raised on the main thread by ready()
+            self.error = error
+
+    def ready(self):
+        if self.error is not None:
+            raise self.error
+        return self.loaded
+
+    def wait(self):
+        self.start_preload()
+        self._loader.join()
+        return self.ready()
+
+    def invalidate(self):
+        """Forget loaded assets so the next preload() starts fresh."""
+        self.loaded = False
+        self.error = None
+        self._loader = None
+
+    # --- Per-frame hooks ---
+    def enter(self):
+        pass
+
+    def exit(self):
+        pass
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            self.game.running = False
+
+    def update(self, dt):
+        pass
+
+    def draw(self, screen):
+        pass
+
+    # --- Helpers ---
+    def draw_asset_progress(self, screen):
+        """Thin bar along the bottom while character art is still loading."""
+        finished, requested = assets.progress()
+        if finished >= requested:
+            return
+        width = SCREEN_WIDTH * finished // requested
+        pygame.draw.rect(screen, (40, 40, 40), (0, SCREEN_HEIGHT - 4, SCREEN_WIDTH, 4))
+        pygame.draw.rect(screen, (255, 255, 255), (0, SCREEN_HEIGHT - 4, width, 4))
+
+
+class MenuScene(Scene):
+    next_scenes = ("character_select", "instructions")
+
+    button_color = (50, 50, 50, 180)
+    button_hover = (100, 100, 100, 220)
+    quit_hover = (234, 67, 53, 220)  # red hover color for quit
+    # (center x, speed) of each character walking across the menu, first in the roster first
+    walkers = ((SCREEN_WIDTH / 4, 1.0), (SCREEN_WIDTH / 2, 1.2), (SCREEN_WIDTH * 3 / 4, -0.8))
+
+    def __init__(self, game):
+        super().__init__(game)
+        button_width, button_height = 300, 60
+        x = SCREEN_WIDTH // 2 - button_width // 2
+        self.buttons = [
+            Button((x, SCREEN_HEIGHT // 2 - 70 + i * 70, button_width, button_height), text,
+                   self.button_color, self.quit_hover if text == "Quit" else self.button_hover)
+            for i, text in enumerate(("Singleplayer", "Multiplayer", "Training", "Instructions", "Quit"))
+        ]
+        self.title = Label("GOOGLEY FIGHTER", "bold", 72, midtop=(SCREEN_WIDTH // 2, 100))
+        self.subtitle = Label("RecWeek 2025 Edition", midtop=(SCREEN_WIDTH // 2, 175))
+        self.characters = get_roster().names[:len(self.walkers)]
+        self.frames = {}
+        self.frames_left = {}  # the same frames mirrored, for walking left
+        self.frame_delay = 150  # ms per frame
+
+    def preload(self):
+        # Load GIF frames for menu characters
+        characters = get_roster()
+        self.frames = {
+            char: self.game.load_gif_frames(characters.pack(char).path("walk_right"), scale=FRAME_SCALE)
+            for char in self.characters
+        }
+        self.frames_left = {char: flipped(frames) for char, frames in self.frames.items()}
+
+    def enter(self):
+        if not audio.music_playing():
+            # Loads on a thread and starts when it's ready, rather than
+            # holding up the first frame
+            audio.play_music(BACKGROUND_SOUND)
+
+        self.frame_index = {char: 0 for char in self.frames}
+        self.frame_timer = 0
+        # [center x, top]; x is a float so moving it doesn't allocate new ints
+        self.positions = {
+            char: [x, config.GROUND_Y - self.frames[char][0].get_height()]
+            for char, (x, speed) in zip(self.characters, self.walkers)
+        }
+        self.velocities = {char: [speed, 0] for char, (x, speed) in zip(self.characters, self.walkers)}
+
+    def handle_event(self, event):
+        super().handle_event(event)
+        if event.type != pygame.MOUSEBUTTONDOWN or event.button != 1:
+            return
+
+        for button in self.buttons:
+            if not button.rect.collidepoint(event.pos):
+                continue
+            text = button.label
+            if text == "Singleplayer":
+                audio.trigger(BUTTON_SOUND)
+                self.game.selected_mode = "singleplayer"
+                self.game.change_scene("character_select")
+            elif text == "Multiplayer":
+                audio.trigger(BUTTON_SOUND)
+                self.game.selected_mode = "multiplayer"
+                self.game.change_scene("character_select")
+            elif text == "Training":
+                audio.trigger(BUTTON_SOUND)
+                self.game.selected_mode = "training"
+                self.game.change_scene("character_select")
+            elif text == "Instructions":
+                self.game.change_scene("instructions")
+            elif text == "Quit":
+                self.game.running = False
+
+    def update(self, dt):
+        # --- Animate menu GIFs ---
+        self.frame_timer += dt
+        if self.frame_timer >= self.frame_delay:
+            for char in self.characters:
+                self.frame_index[char] = (self.frame_index[char] + 1) % len(self.frames[char])
+            self.frame_timer = 0
+
+        # Loops go over a tuple: a dict view would be built every frame
+        for char in self.characters:
+            pos = self.positions[char]
+            vel = self.velocities[char]
+            pos[0] += vel[0]
+
+            half_width = self.frames[char][self.frame_index[char]].get_width() // 2
+            if pos[0] - half_width <= 0 or pos[0] + half_width >= SCREEN_WIDTH:
+                vel[0] *= -1
+
+    def draw(self, screen):
+        game = self.game
+        screen.blit(game.background, (0, 0))
+
+        self.title.draw(screen)
+        self.subtitle.draw(screen)
+
+        # --- Sprites first (in the back), dropped at low quality ---
+        if governor.settings["menu_sprites"]:
+            self.draw_sprites(screen)
+
+        # --- Buttons AFTER sprites (buttons in front) ---
+        for button in self.buttons:
+            button.draw(screen, game.mouse_pos)
+        self.draw_asset_progress(screen)
+
+
+    def draw_sprites(self, screen):
+        for char in self.characters:
+            pos = self.positions[char]
+            frames = self.frames_left[char] if self.velocities[char][0] < 0 else self.frames[char]
+            frame = frames[self.frame_index[char]]
+            screen.blit(frame, (pos[0] - frame.get_width() // 2, pos[1]))
+
+
+class InstructionsScene(Scene):
+    lines = [
+        "INSTRUCTIONS",
+        "Player 1: WASD to move, SPACE to attack, F to shoot",
+        "Player 2: Arrow keys to move, R_SHIFT to attack, H to shoot",
+        "Special: down, down-forward, forward + shoot",
+        "Training: TAB to rewind, LEFT/RIGHT to scrub, TAB to resume",
+        "Press P to pause the game",
+        "Reduce opponent health to 0 to win",
+        "",
+        "Click anywhere on the screen to return to the menu",
+    ]
+
+    def __init__(self, game):
+        super().__init__(game)
+        self.labels = [Label(self.lines[0], "bold", 72, midtop=(SCREEN_WIDTH // 2, 125))]
+        self.labels += [Label(line, size=24, midtop=(SCREEN_WIDTH // 2, 175 + i * 40))
+                        for i, line in enumerate(self.lines) if i and line]
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+            self.game.change_scene("menu")
+
+    def draw(self, screen):
+        game = self.game
+        screen.blit(game.background, (0, 0))
+
+        for label in self.labels:
+            label.draw(screen)
+
+
+class CharacterSelectScene(Scene):
+    """Character selection screen for singleplayer or multiplayer."""
+    def __init__(self, game):
+        super().__init__(game)
+        self.characters = get_roster().names
+        box_size = 120
+        spacing = 150
+        num_boxes = len(self.characters)
+        total_width = num_boxes * box_size + (num_boxes - 1) * spacing
+        start_x = (SCREEN_WIDTH - total_width) // 2
+        y = SCREEN_HEIGHT // 2 - box_size // 2
+
+        self.boxes = [
+            pygame.Rect(start_x + i * (box_size + spacing), y, box_size, box_size)
+            for i in range(num_boxes)
+        ]
+        self.panels = [Button(box, color=(50, 50, 50, 150), hover_color=(100, 100, 100, 180)) for box in self.boxes]
+        self.labels = [Label(char, midtop=(box.centerx, box.bottom + 10))
+                       for char, box in zip(self.characters, self.boxes)]
+        self.captions = {
+            caption: Label(caption, midtop=(SCREEN_WIDTH // 2, 160))
+            for caption in ("Loading...", "Player 1, choose your character", "Player 2, choose your character")
+        }
+        self.previews = {}
+        self.preview_positions = []  # top-left of each box's preview, set once they're loaded
+        self.frame_delay = 150  # ms per frame (adjust for speed)
+        self.hovered = None
+
+    def preload(self):
+        # Load animated frames for previews
+        characters = get_roster()
+        self.previews = {
+            char: self.game.load_gif_frames(characters.preview_path(char), scale=FRAME_SCALE)
+            for char in self.characters
+        }
+
+    def enter(self):
+        self.preview_positions = [
+            self.previews[char][0].get_rect(center=box.center).topleft
+            for char, box in zip(self.characters, self.boxes)
+        ]
+        self.frame_index = {char: 0 for char in self.characters}
+        self.frame_timer = 0
+        self.turn = 1  # 1 = player1 choosing, 2 = player2 choosing (multiplayer only)
+        self.choosing = True
+
+    def handle_event(self, event):
+        super().handle_event(event)
+        if not self.choosing or event.type != pygame.MOUSEBUTTONDOWN or event.button != 1:
+            return
+
+        audio.trigger(BUTTON_SOUND)
+        game = self.game
+        for i, box in enumerate(self.boxes):
+            if not box.collidepoint(event.pos):
+                continue
+            if game.selected_mode in ("singleplayer", "training"):
+                game.player1_choice = self.characters[i]
+                game.player2_choice = get_roster().default_opponent
+                self.choose()
+            elif game.selected_mode == "multiplayer":
+                if self.turn == 1:
+                    game.player1_choice = self.characters[i]
+                    self.turn = 2
+                elif self.characters[i] != game.player1_choice:
+                    game.player2_choice = self.characters[i]
+                    self.choose()
+
+    def choose(self):
+        """Both characters picked: start loading the fight."""
+        self.choosing = False
+        self.game.scenes["playing"].invalidate()
+        self.game.change_scene("playing")
+
+    def update(self, dt):
+        # Decode the fighter under the cursor ahead of the rest
+        mouse_pos = self.game.mouse_pos
+        for char, box in zip(self.characters, self.boxes):
+            if box.collidepoint(mouse_pos) and char != self.hovered:
+                self.hovered = char
+                get_roster().request(char, PRIORITY_SOON)
+
+        # Update animation every frame_delay ms
+        self.frame_timer += dt
+        if self.frame_timer >= self.frame_delay:
+            for char in self.characters:
+                self.frame_index[char] = (self.frame_index[char] + 1) % len(self.previews[char])
+            self.frame_timer = 0
+
+    def draw(self, screen):
+        game = self.game
+        screen.blit(game.background, (0, 0))
+
+        # Caption using large font
+        if not self.choosing:
+            caption = "Loading..."
+        elif game.selected_mode == "multiplayer" and self.turn == 2:
+            caption = "Player 2, choose your character"
+        else:
+            caption = "Player 1, choose your character"
+        self.captions[caption].draw(screen)
+
+        # Character boxes with transparency (no borders), preview and name
+        for i, char in enumerate(self.characters):
+            self.panels[i].draw(screen, game.mouse_pos)
+            screen.blit(self.previews[char][self.frame_index[char]], self.preview_positions[i])
+            self.labels[i].draw(screen)
+        self.draw_asset_progress(screen)
+
+
+class FightScene(Scene):
+    """The fight itself, plus the pause and game over overlays."""
+    button_color = (50, 50, 50, 180)
+    button_hover = (100, 100, 100, 220)
+
+    def __init__(self, game):
+        super().__init__(game)
+        button_width, button_height = 250, 60
+        spacing = 20
+        self.pause_title_y = SCREEN_HEIGHT // 4
+        top = self.pause_title_y + 40 + 40  # below the PAUSED title
+        x = SCREEN_WIDTH // 2 - button_width // 2
+        self.pause_buttons = [
+            Button((x, top + i * (button_height + spacing), button_width, button_height), label,
+                   self.button_color, self.button_hover)
+            for i, label in enumerate(("CONTINUE", "RESTART", "MENU"))
+        ]
+        self.pause_title = Label("PAUSED", "bold", 72, center=(SCREEN_WIDTH // 2, self.pause_title_y))
+        self.fight_title = Label("FIGHT!", "bold", 72, center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
+        self.game_over_title = Label("GAME OVER", "bold", 72, center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 3))
+        self.game_over_hint = Label("Press R to play again", below=(self.game_over_title, 20))
+
+    def preload(self):
+        # Build both fighters while character select keeps drawing (their
+        # GIFs are normally prefetched by now, see assets.py)
+        self.game.load_fighters()
+        preload(DAMAGE_SOUND, DEATH_SOUND)  # no decoding when the first hit lands
+
+    def enter(self):
+        self.game.start_fight()
+
+    def exit(self):
+        self.game.stop_simulation()
+
+    def handle_event(self, event):
+        super().handle_event(event)
+        game = self.game
+        if event.type in (pygame.KEYDOWN, pygame.KEYUP):
+            stamp = event_stamp(event)
+            if game.simulation:
+                game.simulation.push_key(event.key, event.type == pygame.KEYDOWN, stamp)
+            elif event.type == pygame.KEYDOWN:
+                game.keys.press(event.key)
+                game.input_stamp = stamp  # read by this frame's update
+            else:
+                game.keys.release(event.key)
+
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_p and not game.game_over:
+                game.paused = not game.paused
+                if game.paused:
+                    audio.stop_music()
+                else:
+                    audio.play_music(BACKGROUND_SOUND)
+            elif event.key == pygame.K_r and game.game_over:
+                game.reset_game()
+                game.change_scene("menu")
+            elif event.key == pygame.K_TAB and game.rewinder and not game.paused and not game.game_over:
+                if game.rewinder.active:
+                    game.rewinder.resume()
+                else:
+                    game.rewinder.start()
+
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and game.paused:
+            for button in self.pause_buttons:
+                if not button.rect.collidepoint(event.pos):
+                    continue
+                audio.trigger(BUTTON_SOUND)
+                label = button.label
+                if label == "CONTINUE":
+                    game.paused = False
+                    audio.play_music(BACKGROUND_SOUND)
+                elif label == "RESTART":
+                    game.reset_game()
+                    game.start_fight()
+                elif label == "MENU":
+                    game.reset_game()
+                    game.change_scene("menu")
+
+    def update(self, dt):
+        game = self.game
+        rewinder = game.rewinder
+        if rewinder and rewinder.active:
+            keys = pygame.key.get_pressed()
+            if keys[pygame.K_LEFT]:
+                rewinder.step(-1)
+            elif keys[pygame.K_RIGHT]:
+                rewinder.step(1)
+        elif game.simulation is None and not game.paused and not game.game_over:
+            game.update()
+            if rewinder:
+                rewinder.record()
+
+        game.update_view()
+        if not game.paused and not (rewinder and rewinder.active):
+            game.update_effects()
+
+    def draw(self, screen):
+        game = self.game
+        view = game.view
+        screen.blit(game.background, (0, 0))
+
+        for fighter in (view.red, view.blue):
+            screen.blit(fighter.image, fighter.rect)
+            for image, rect, direction in fighter.fireballs:
+                screen.blit(image, rect)
+        game.effects.draw(screen)
+        game.draw_health_bars(view)
+        game.draw_cooldown_bars(view)
+        game.draw_timer(view)
+        if governor.settings["full_hud"]:
+            game.draw_fighter_labels(view)
+        if config.SHOW_COLLISION_STATS:
+            game.draw_collision_stats()
+        if config.SHOW_PARTICLE_STATS:
+            game.draw_particle_stats()
+        if config.SHOW_QUALITY_STATS:
+            game.draw_quality_stats()
+        if config.SHOW_LATENCY_STATS:
+            game.draw_latency_stats()
+
+        # Show "FIGHT" for 0.5 sec at the start
+        if game.fight_start_time:
+            elapsed = (pygame.time.get_ticks() - game.fight_start_time) / 1000
+            if elapsed < 0.5:
+                self.fight_title.draw(screen)
+
+        if game.rewinder:
+            self.draw_rewind_overlay(screen)
+        if game.paused:
+            self.draw_pause_menu(screen)
+        if game.game_over:
+            self.draw_game_over(screen)
+
+    def draw_rewind_overlay(self, screen):
+        """Training mode: rewind position, history size and seek time."""
+        game = self.game
+        rewinder = game.rewinder
+        report = game.font_tiny.render(rewinder.report(), True, game.label_color)
+        screen.blit(report, (SCREEN_WIDTH // 2 - report.get_width() // 2, SCREEN_HEIGHT - report.get_height() - 5))
+
+        if rewinder.active:
+            text = f"REWIND  -{rewinder.seconds_back():.2f}s"
+            rewind_surface = game.font_medium.render(text, True, (255, 255, 255))
+            screen.blit(rewind_surface, (SCREEN_WIDTH // 2 - rewind_surface.get_width() // 2, 90))
+
+    def draw_pause_menu(self, screen):
+        self.pause_title.draw(screen)
+        for button in self.pause_buttons:
+            button.draw(screen, self.game.mouse_pos)
+
+    def draw_game_over(self, screen):
+        self.game_over_title.draw(screen)
+        self.game_over_hint.draw(screen)
@@ -0,0 +1,204 @@
+# src/simulation.py
+"""
+Running the fight simulation on its own thread.
+
+The main thread keeps pumping pygame events and drawing. Key presses are
+stamped with the time they were pumped and handed to the simulation thread,
+which runs GameCanvas.update() at a fixed FPS tick rate. After every tick it
+publishes an immutable FrameSnapshot; the main thread draws whichever one is
+newest, so a slow frame (font rendering, display.flip) never holds up a tick
+and a slow tick never stalls drawing.
+
+The same snapshot types are used when the simulation runs inline, so the
+fight is drawn the same way in both modes.
+
+A key only reaches the screen once a tick has used it and the main thread
+has drawn that tick's snapshot. So instead of sleeping out the rest of a
+frame, the main thread keeps pumping events into the queue until the next
+snapshot is published and draws it straight away (GameCanvas.wait_for_tick):
+a press waits for one tick at most, not for a tick and then a frame.
+"""
+
+import queue
+import threading
+import time
+from collections import namedtuple
+import pygame
+from config import FPS, SIM_MAX_CATCH_UP
+from metrics import TICKS_BEHIND, INPUT_QUEUE
+from allocations import allocations
+
+FighterSnapshot = namedtuple("FighterSnapshot", [
+    "image", "rect", "health", "max_health",
+    "attack_timer", "attack_cooldown", "fireball_timer", "fireball_cooldown",
+    "fireballs",  # tuple of (image, rect, direction)
+])
+
+FrameSnapshot = namedtuple("FrameSnapshot", [
+    "tick", "red", "blue", "time_remaining", "game_over",
+    "input_stamp",  # when the newest key press in this frame happened
+])
+
+
+def snapshot_fighter(fighter):
+    return FighterSnapshot(
+        fighter.image, fighter.rect.copy(), fighter.health, fighter.max_health,
+        fighter.attack_timer, fighter.attack_cooldown,
+        fighter.fireball_timer, fighter.fireball_cooldown,
+        tuple((fb.image, fb.rect.copy(), fb.direction) for fb in fighter.fireballs),
+    )
+
+
+def snapshot_game(game):
+    return FrameSnapshot(
+        game.round_tick,
+        snapshot_fighter(game.red_fighter),
+        snapshot_fighter(game.blue_fighter),
+        game.time_remaining,
+        game.game_over,
+        game.input_stamp,
+    )
+
+
+class KeyState:
+    """
+    Which keys are held, fed from KEYDOWN/KEYUP events instead of pygame.key.
+
+    Fights always read keys from one of these (the thread's own, or
+    GameCanvas.keys inline), so posted events count the same as real ones.
+    """
+    def __init__(self):
+        self.held = set()
+
+    def __getitem__(self, key):
+        return key in self.held
+
+    def press(self, key):
+        self.held.add(key)
+
+    def release(self, key):
+        self.held.discard(key)
+
+    def seed(self, pressed, keys):
+        """Start with whichever of `keys` are down in pygame's `pressed` state."""
+        self.held = {key for key in keys if pressed[key]}
+
+    def attach(self, controls):
+        """Make `controls` read from here, starting with the keys already held."""
+        # Keys held since before the fight have no KEYDOWN still to come
+        self.seed(pygame.key.get_pressed(), [key for control in controls for key in control.bindings()])
+        for control in controls:
+            control.keys = self
+
+    @staticmethod
+    def detach(controls):
+        for control in controls:
+            control.keys = None
+
+
+class SnapshotBuffer:
+    """
+    Double buffer between the simulation and the main thread.
+
+    publish() swaps in a new front snapshot and adds that tick's events;
+    take() returns the newest snapshot plus every event since the last take(),
+    so nothing is lost when drawing is slower than the simulation.
+    """
+    def __init__(self):
+        self.front = None
+        self.events = []
+        self.published = threading.Condition()
+
+    def publish(self, snapshot, events):
+        with self.published:
+            self.front = snapshot
+            if events:
+                self.events.extend(events)
+            self.published.notify_all()
+
+    def take(self):
+        with self.published:
+            events, self.events = self.events, []
+            return self.front, events
+
+    def wait_newer(self, tick, timeout):
+        """Wait up to `timeout` for a snapshot of a tick other than `tick`; True if there is one."""
+        with self.published:
+            return self.published.wait_for(
+                lambda: self.front is not None and self.front.tick != tick, timeout)
+
+
+class SimulationThread:
+    """Runs GameCanvas.update() at a fixed tick rate on a background thread."""
+    def __init__(self, game, controls):
+        self.game = game
+        self.keys = KeyState()
+        self.inputs = queue.SimpleQueue()  # (timestamp, pressed, key)
+        self.buffer = SnapshotBuffer()
+        self.tick_seconds = 1 / FPS
+        self.ticks_behind = 0
+        self.last_tick_ms = 0
+        self.stopping = False
+        self.pending = None
+
+        self.controls = controls
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.keys.attach(self.controls)
+        self.buffer.publish(snapshot_game(self.game), ())
+        self.thread.start()
+
+    def stop(self):
+        self.stopping = True
+        if self.thread.is_alive():
+            self.thread.join()
+        self.keys.detach(self.controls)
+
+    def push_key(self, key, pressed, stamp=None):
+        """Called on the main thread when a key goes down or up."""
+        self.inputs.put((stamp or time.perf_counter(), pressed, key))
+
+    def apply_inputs(self, until):
+        """Apply every key change stamped before `until`; later ones wait a tick."""
+        while True:
+            if self.pending is None:
+                try:
+                    self.pending = self.inputs.get_nowait()
+                except queue.Empty:
+                    return
+            stamp, pressed, key = self.pending
+            if stamp > until:
+                return
+            if pressed:
+                self.keys.press(key)
+                self.game.input_stamp = stamp
+            else:
+                self.keys.release(key)
+            self.pending = None
+
+    def run(self):
+        next_tick = time.perf_counter()
+        while not self.stopping:
+            now = time.perf_counter()
+            if now < next_tick:
+                time.sleep(next_tick - now)
+                continue
+
+            # Don't try to make up for a long stall all at once
+            behind = int((now - next_tick) / self.tick_seconds)
+            self.ticks_behind = behind
+            TICKS_BEHIND.set(behind)
+            INPUT_QUEUE.set(self.inputs.qsize())
+            if behind > SIM_MAX_CATCH_UP:
+                next_tick = now
+
+            with allocations.gate:
+                start = time.perf_counter()
+                self.apply_inputs(next_tick)
+                self.game.update()
+                events = self.game.take_events()
+                self.buffer.publish(snapshot_game(self.game), events)
+                self.last_tick_ms = (time.perf_counter() - start) * 1000
+
+            next_tick += self.tick_seconds
@@ -1,12 +1,201 @@
 # src/sounds.py
-import pygame
+"""
+Sounds for Googley Fighter.
+
+Nothing is loaded at import. The mixer is opened and each sound loaded the
+first time it's needed. An MP3 is only decoded once: the samples are kept
+in ASSET_CACHE_DIR in the mixer's own format, so later launches hand them
+straight to the mixer. Sounds that mustn't hitch the first time they play
+are loaded ahead with preload() from a scene's loader.
+
+All mixer calls go through `audio`, on the main thread:
+
+- Music loops on a channel of its own, so effects can never cut it off.
+  play_music() and stop_music() just say what should be playing; update()
+  makes it so (and waits for a long track to finish loading on a thread).
+- Effects share AUDIO_VOICES channels. When all are busy a new effect takes
+  over the lowest-priority, oldest voice, or is dropped if everything
+  playing outranks it. Each sound also has a minimum gap between starts, so
+  a flurry of hits doesn't stack the same sound over itself.
+- trigger() only appends to a queue, so the simulation thread can ask for
+  an effect without touching the mixer; update() plays the queue each frame.
+"""
+
 import os
+import threading
+import time
+from collections import deque
+import pygame
+from config import ASSET_CACHE_DIR, AUDIO_VOICES, AUDIO_QUEUE
+from metrics import metrics
+from startup import profile
+from allocations import allocations
+
+SOUNDS_DROPPED = metrics.counter("googley_sounds_dropped_total",
+                                 "Effects not played: rate limited or every voice outranked them")
+VOICES_STOLEN = metrics.counter("googley_voices_stolen_total",
+                                "Effects that cut off a lower-priority effect to play")
+
+_mixer_lock = threading.Lock()
+
+
+def init_mixer():
+    with _mixer_lock:
+        if not pygame.mixer.get_init():
+            with profile.span("mixer init"):
+                pygame.mixer.init()
+
+
+def load_pcm(path):
+    """A Sound for `path`, from the decoded copy in the cache when there is one."""
+    frequency, size, channels = pygame.mixer.get_init()
+    name = os.path.splitext(os.path.basename(path))[0]
+    cached = os.path.join(ASSET_CACHE_DIR, "sounds", f"{name}_{frequency}_{size}_{channels}.pcm")
+    try:
+        if os.path.getmtime(cached) >= os.path.getmtime(path):
+            with open(cached, "rb") as f:
+                return pygame.mixer.Sound(buffer=f.read())
+    except OSError:
+        pass  # not cached yet: decode it
+
+    sound = pygame.mixer.Sound(path)
+    try:
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        temp = f"{cached}.tmp"
+        with open(temp, "wb") as f:
+            f.write(sound.get_raw())
+        os.replace(temp, cached)
+    except OSError:
+        pass  # read-only install; decode it again next launch
+    return sound
+
+
+class LazySound:
+    """A sound that is loaded the first time it's needed."""
+    def __init__(self, filename, priority=0, min_gap_ms=0):
+        self.path = os.path.join("assets", "sounds", filename)
+        self.priority = priority          # higher takes voices from lower
+        self.min_gap = min_gap_ms / 1000  # seconds between two starts of this sound
+        self.sound = None
+        self.loader = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        if self.sound is None:
+            init_mixer()
+            with self.lock:
+                if self.sound is None:
+                    with profile.span(f"sound {os.path.basename(self.path)}"):
+                        self.sound = load_pcm(self.path)
+        return self.sound
+
+    def _load_gated(self):
+        with allocations.gate:
+            self.load()
+
+    def load_in_background(self):
+        with self.lock:
+            if self.sound is not None or self.loader is not None:
+                return
+            self.loader = threading.Thread(target=self._load_gated, daemon=True)
+        self.loader.start()
+
+
+def preload(*sounds):
+    for sound in sounds:
+        sound.load()
+
+
+class AudioService:
+    def __init__(self, voices=AUDIO_VOICES):
+        self.voices = voices
+        self.channels = None  # effect voices, once the mixer is open
+        self.music_channel = None
+        self.queue = deque(maxlen=AUDIO_QUEUE)  # effects triggered since the last update()
+        self.playing = [(0, 0.0)] * voices      # per voice: (priority, started)
+        self.last_started = {}                  # LazySound -> when it last started
+        self.music = None          # (sound, loops, request number) that should be playing
+        self.music_playing_now = None
+        self.music_requests = 0
+
+    def open(self):
+        if self.channels is not None:
+            return
+        init_mixer()
+        pygame.mixer.set_num_channels(1 + self.voices)
+        pygame.mixer.set_reserved(1)  # channel 0 is never handed out for effects
+        self.music_channel = pygame.mixer.Channel(0)
+        self.channels = [pygame.mixer.Channel(1 + voice) for voice in range(self.voices)]
+
+    # --- Any thread ---
+    def trigger(self, sound):
+        """Ask for an effect to be played on the next update()."""
+        self.queue.append(sound)
+
+    def play_music(self, sound, loops=-1):
+        """Start `sound` from the top on the music channel (loading it first if needed)."""
+        self.music_requests += 1
+        self.music = (sound, loops, self.music_requests)
+        sound.load_in_background()
+
+    def stop_music(self):
+        self.music = None
+
+    def music_playing(self):
+        return self.music is not None
+
+    # --- Main thread, once a frame ---
+    def update(self):
+        if self.music != self.music_playing_now:
+            self.update_music()
+        if not self.queue:
+            return
+        self.open()
+        now = time.perf_counter()
+        while self.queue:
+            self.play_effect(self.queue.popleft(), now)
+
+    def update_music(self):
+        music = self.music
+        if music is not None and music[0].sound is None:
+            return  # still loading; keep what's playing until it's ready
+        self.open()
+        self.music_channel.stop()
+        if music is not None:
+            sound, loops, request = music
+            self.music_channel.play(sound.sound, loops=loops)
+        self.music_playing_now = music
+
+    def play_effect(self, sound, now):
+        last = self.last_started.get(sound)
+        if last is not None and now - last < sound.min_gap:
+            SOUNDS_DROPPED.inc()
+            return
+        voice = self.pick_voice(sound.priority)
+        if voice is None:
+            SOUNDS_DROPPED.inc()
+            return
+        channel = self.channels[voice]
+        if channel.get_busy():
+            VOICES_STOLEN.inc()
+        channel.play(sound.load())
+        self.playing[voice] = (sound.priority, now)
+        self.last_started[sound] = now
+
+    def pick_voice(self, priority):
+        """A free voice, else the lowest-priority, oldest one that doesn't outrank `priority`."""
+        steal = None
+        for voice, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return voice
+            if self.playing[voice][0] <= priority and (steal is None or self.playing[voice] < self.playing[steal]):
+                steal = voice
+        return steal
+
 
-# Initialize the sound mixer
-pygame.mixer.init()
+audio = AudioService()
 
-# Load sounds
-BACKGROUND_SOUND = pygame.mixer.Sound(os.path.join("assets", "sounds", "background.mp3"))
-DAMAGE_SOUND = pygame.mixer.Sound(os.path.join("assets", "sounds", "damage.mp3"))
-DEATH_SOUND = pygame.mixer.Sound(os.path.join("assets", "sounds", "death.mp3"))
-BUTTON_SOUND = pygame.mixer.Sound(os.path.join("assets", "sounds", "button.mp3"))
\ No newline at end of file
+BACKGROUND_SOUND = LazySound("background.mp3")
+DAMAGE_SOUND = LazySound("damage.mp3", priority=1, min_gap_ms=50)
+DEATH_SOUND = LazySound("death.mp3", priority=3)
+BUTTON_SOUND = LazySound("button.mp3", priority=2)
@@ -1,24 +1,56 @@
 # src/sprite.py
+import weakref
 import pygame
-from config import SCREEN_WIDTH, SCREEN_HEIGHT, GROUND_Y
-from sounds import DAMAGE_SOUND, DEATH_SOUND
+from config import GROUND_Y, PIXEL_HITBOXES
+from config import RED_SPAWN, BLUE_SPAWN
+from sounds import audio, DAMAGE_SOUND, DEATH_SOUND
 from fireball import Fireball
-from PIL import Image
+from hitbox import FrameMasks, collide, hit_origin
+from commands import CommandReader
+from physics import to_fixed, move_fighters, advance_fighters
+from ecs import FighterStore, component_view
+from assets import assets
+from quality import governor
+from roster import get_roster, Stats, FRAME_SCALE
 
+# What a stunned fighter "presses": nothing, but gravity still applies
+NEUTRAL_INTENT = (0, 0, False, False, None)
 
+# Masks for loaded GIFs, shared by every fighter using them and dropped
+# with the last one (so an unloaded character's masks go too)
+_mask_cache = weakref.WeakValueDictionary()
+
+
+@component_view
 class Fighter(pygame.sprite.Sprite):
-    """Fighter with GIF animation, health, damage + attack cooldown system."""
+    """
+    Fighter with GIF animation, health, damage + attack cooldown system.
+
+    The numbers (position, health, timers...) live in a FighterStore row,
+    see ecs.py; pass `store` to put several fighters in one store.
+    """
     def __init__(self, x, y, gif_right=None, gif_left=None,
                  damage_right_gif=None, damage_left_gif=None,
-                 color=(255, 0, 0), controls=None, speed=5):
+                 color=(255, 0, 0), controls=None, stats=None, name=None, store=None):
         super().__init__()
-        self.controls = controls
-        self.speed = speed
         self.rect = pygame.Rect(x, y, 64, 64)
+        self.store = store or FighterStore(1)
+        self.columns = self.store.arrays
+        self.id = self.store.add(self.rect)
+        self.width, self.height = self.rect.size
+
+        stats = stats or Stats()
+        self.name = name
+        self.controls = controls
+        self.speed = stats.speed
+        self.spawn = (x, y)
+        # Fixed-point position; rect is derived from it after every move
+        self.pos_x = to_fixed(x)
+        self.pos_y = to_fixed(y)
         self.fireballs = pygame.sprite.Group()
 
         # Health system
-        self.max_health = 100
+        self.max_health = stats.max_health
         self.health = self.max_health
 
         # Damage system
@@ -27,7 +59,7 @@ class Fighter(pygame.sprite.Sprite):
         self.is_damaged = False
         self.damage_frames_right = []
         self.damage_frames_left = []
-        self.active_damage_frames = []
+        self.active_damage_frames = ()
         self.damage_frame_index = 0
         self.damage_frame_delay = 5
         self.damage_frame_count = 0
@@ -35,22 +67,23 @@ class Fighter(pygame.sprite.Sprite):
 
         # Attack system
         self.is_attacking = False
-        self.attack_damage = 10
-        self.attack_range = 40
-        self.attack_cooldown = 120
+        self.attack_damage = stats.attack_damage
+        self.attack_range = stats.attack_range
+        self.attack_cooldown = stats.attack_cooldown
         self.attack_timer = 0
         self.stun_timer = 0
 
         # Fireball system
         self.is_shooting = False
-        self.fireball_damage = 15
-        self.fireball_cooldown = 300
+        self.fireball_damage = stats.fireball_damage
+        self.fireball_speed = stats.fireball_speed
+        self.fireball_cooldown = stats.fireball_cooldown
         self.fireball_timer = 0
 
-        # Jump system
+        # Jump system (speeds in fixed-point units, see physics.py)
         self.is_jumping = False
-        self.jump_speed = -10
-        self.gravity = 0.5
+        self.jump_speed = to_fixed(-10)
+        self.gravity = to_fixed(0.5)
         self.vertical_speed = 0
         self.max_jump_height = GROUND_Y - 150
 
@@ -61,41 +94,145 @@ class Fighter(pygame.sprite.Sprite):
         self.frame_delay = 5
         self.frame_count = 0
 
-        self.image = pygame.Surface((64, 64))
-        self.image.fill(color)
-
         # Load GIFs
         if gif_right:
-            self.frames_right = self.load_gif(gif_right, scale=(64, 64))
+            self.frames_right = self.load_gif(gif_right, scale=FRAME_SCALE)
         if gif_left:
-            self.frames_left = self.load_gif(gif_left, scale=(64, 64))
+            self.frames_left = self.load_gif(gif_left, scale=FRAME_SCALE)
         if damage_right_gif:
-            self.damage_frames_right = self.load_gif(damage_right_gif, scale=(64, 64))
+            self.damage_frames_right = self.load_gif(damage_right_gif, scale=FRAME_SCALE)
         if damage_left_gif:
-            self.damage_frames_left = self.load_gif(damage_left_gif, scale=(64, 64))
+            self.damage_frames_left = self.load_gif(damage_left_gif, scale=FRAME_SCALE)
+
+        # A plain square only for fighters without animation (it costs 16 KB each)
+        if self.frames_right:
+            self.image = self.frames_right[0]
+        else:
+            self.image = pygame.Surface((64, 64))
+            self.image.fill(color)
+        self.spawn_image = self.image
 
         self.direction = "right"
 
+        # Special moves (command inputs)
+        self.command_reader = CommandReader(name)
+        self.tick = 0
+        self.last_special = None
+        self.specials_used = 0
+        # What this fighter did on its last tick (the adaptive AI learns from it)
+        self.last_intent = None
+
+        # Collision masks (built once here, only looked up during the fight)
+        self.hurt_mask = None
+        if PIXEL_HITBOXES:
+            self.build_masks()
+            Fireball.load_assets()
+
+    @property
+    def direction(self):
+        return "right" if self.facing >= 0 else "left"
+
+    @direction.setter
+    def direction(self, value):
+        self.facing = 1 if value == "right" else -1
+
+    def build_masks(self):
+        """Precompute hurt/hit masks for every loaded animation frame."""
+        reaches = {self.attack_range}
+        reaches.update(move.range for move in self.command_reader.moves() if move.range)
+        self.masks_right = self.frame_masks(self.frames_right, reaches, "right")
+        self.masks_left = self.frame_masks(self.frames_left, reaches, "left")
+        self.damage_masks_right = self.frame_masks(self.damage_frames_right)
+        self.damage_masks_left = self.frame_masks(self.damage_frames_left)
+        self.update_masks()
+
+    @staticmethod
+    def frame_masks(frames, reaches=(), facing=None):
+        key = (id(frames), frozenset(reaches), facing)
+        masks = _mask_cache.get(key)
+        if masks is None:
+            masks = _mask_cache[key] = FrameMasks(frames, reaches, facing)
+        return masks
+
+    def walk_masks(self):
+        return self.masks_right if self.direction == "right" else self.masks_left
+
+    def update_masks(self):
+        """Point hurt_mask at the mask for the frame being shown."""
+        if not PIXEL_HITBOXES:
+            return
+        walk = self.walk_masks()
+        if self.is_damaged and self.active_damage_frames:
+            damage = self.damage_masks_right if self.active_damage_frames is self.damage_frames_right else self.damage_masks_left
+            self.hurt_mask = damage.hurt[self.damage_frame_index] if damage.hurt else None
+        elif walk.hurt:
+            self.hurt_mask = walk.hurt[self.current_frame % len(walk)]
+        else:
+            self.hurt_mask = None
+
+    def hit_mask(self, reach):
+        """Return the precomputed hit mask for the current frame, or None."""
+        if not PIXEL_HITBOXES:
+            return None
+        walk = self.walk_masks()
+        masks = walk.hit.get(reach)
+        if not masks:
+            return None
+        return masks[self.current_frame % len(walk)]
+
+    def reset(self):
+        """
+        Put the fighter back in its spawn state for a rematch.
+
+        Everything is reset in place: frames, masks and controls are kept,
+        and nothing new is allocated.
+        """
+        self.rect.topleft = self.spawn
+        self.pos_x = to_fixed(self.spawn[0])
+        self.pos_y = to_fixed(self.spawn[1])
+        self.direction = "right"
+        self.health = self.max_health
+
+        self.damage_timer = 0
+        self.is_damaged = False
+        self.active_damage_frames = ()
+        self.damage_frame_index = 0
+        self.damage_frame_count = 0
+        self.damage_anim_timer = 0
+
+        self.is_attacking = False
+        self.attack_timer = 0
+        self.stun_timer = 0
+
+        self.is_shooting = False
+        self.fireball_timer = 0
+        self.fireballs.empty()
+
+        self.is_jumping = False
+        self.vertical_speed = 0
+
+        self.current_frame = 0
+        self.frame_count = 0
+        self.image = self.spawn_image
+
+        self.tick = 0
+        self.last_special = None
+        self.specials_used = 0
+        self.last_intent = None
+        self.command_reader.reset()
+        if self.controls:
+            self.controls.reset()
+        self.update_masks()
+
     def load_gif(self, path, scale=None):
-        pil_image = Image.open(path)
-        frames = []
-        try:
-            while True:
-                frame = pil_image.convert("RGBA")
-                if scale:
-                    frame = frame.resize(scale, Image.NEAREST)
-                mode = frame.mode
-                size = frame.size
-                data = frame.tobytes()
-                surface = pygame.image.fromstring(data, size, mode)
-                frames.append(surface)
-                pil_image.seek(pil_image.tell() + 1)
-        except EOFError:
-            pass
-        return frames
+        return assets.get(path, scale)
 
     def take_damage(self, amount, from_left=True):
-        """Take damage and trigger damage animation if not on cooldown."""
+        """
+        Take damage and trigger damage animation if not on cooldown.
+
+        Returns True if the hit landed.
+        """
         if self.damage_timer == 0:
             self.health -= amount
             if self.health < 0:
@@ -108,37 +245,52 @@ class Fighter(pygame.sprite.Sprite):
             self.damage_frame_index = 0
             self.damage_frame_count = 0
 
-            DAMAGE_SOUND.play()
+            audio.trigger(DAMAGE_SOUND)
             if self.health == 0:
-                DEATH_SOUND.play()
+                audio.trigger(DEATH_SOUND)
 
             # --- Add stun here ---
             self.stun_timer = 1 * 60  # 1 second at 60 FPS
+            return True
+        return False
 
-    def attack(self, others):
-        """Attack if not on cooldown."""
+    def attack(self, others, damage=None, reach=None, hits=None):
+        """
+        Attack if not on cooldown.
+
+        If `hits` is given, hits are appended to it as (target, damage,
+        from_left) instead of being applied straight away.
+        """
         if self.attack_timer > 0:
             return
 
         self.is_attacking = True
         self.attack_timer = self.attack_cooldown
+        damage = damage or self.attack_damage
+        reach = reach or self.attack_range
+        hit_mask = self.hit_mask(reach)
 
         for other in others:
-            if self.direction == "right":
-                attack_rect = pygame.Rect(self.rect.right, self.rect.top, self.attack_range, self.rect.height)
-                if attack_rect.colliderect(other.rect):
-                    # I am to the left of other → hit comes from left
-                    other.take_damage(self.attack_damage, from_left=True)
+            if hit_mask is not None:
+                x, y = hit_origin(self.rect, reach, self.direction)
+                attack_rect = pygame.Rect((x, y), hit_mask.get_size())
+            elif self.direction == "right":
+                attack_rect = pygame.Rect(self.rect.right, self.rect.top, reach, self.rect.height)
             else:
-                attack_rect = pygame.Rect(self.rect.left - self.attack_range, self.rect.top, self.attack_range, self.rect.height)
-                if attack_rect.colliderect(other.rect):
-                    # I am to the right of other → hit comes from right
-                    other.take_damage(self.attack_damage, from_left=False)
+                attack_rect = pygame.Rect(self.rect.left - reach, self.rect.top, reach, self.rect.height)
+
+            if collide(attack_rect, hit_mask, other.rect, other.hurt_mask):
+                # Facing right means I am to the left of other → hit comes from left
+                from_left = self.direction == "right"
+                if hits is None:
+                    other.take_damage(damage, from_left=from_left)
+                else:
+                    hits.append((other, damage, from_left))
 
-    def shoot_fireball(self):
+    def shoot_fireball(self, damage=None, speed=None):
         if self.fireball_timer > 0:
             return
-        
+
         self.is_shooting = True
         self.fireball_timer = self.fireball_cooldown
 
@@ -147,53 +299,41 @@ class Fighter(pygame.sprite.Sprite):
             y=self.rect.centery,
             direction=1 if self.direction == "right" else -1,
             owner=self,
-            damage=self.fireball_damage
+            speed=speed or self.fireball_speed,
+            damage=damage or self.fireball_damage
         )
         self.fireballs.add(fb)
 
-    def move(self, dx, dy, others):
-        if dx > 0:
-            self.direction = "right"
-        elif dx < 0:
-            self.direction = "left"
-
-        self.rect.x += dx * self.speed
-
-        if self.is_jumping:
-            self.vertical_speed += self.gravity
-            self.rect.y += self.vertical_speed
-            if self.rect.top < self.max_jump_height:
-                self.rect.top = self.max_jump_height
-                self.vertical_speed = 0
-            if self.rect.bottom > GROUND_Y:
-                self.rect.bottom = GROUND_Y
-                self.is_jumping = False
-                self.vertical_speed = 0
-        else:
-            if self.rect.bottom < GROUND_Y:
-                self.vertical_speed += self.gravity
-                self.rect.y += self.vertical_speed
-            else:
-                self.rect.bottom = GROUND_Y
-                self.vertical_speed = 0
-
-        if self.rect.left < 0:
-            self.rect.left = 0
-        if self.rect.right > SCREEN_WIDTH:
-            self.rect.right = SCREEN_WIDTH
-
-    def jump(self):
-        if not self.is_jumping and self.rect.bottom >= GROUND_Y:
-            self.is_jumping = True
-            self.vertical_speed = self.jump_speed
+    def perform_special(self, move, others, hits=None):
+        """Run a special move recognised by the command reader."""
+        self.last_special = move
+        self.specials_used += 1
+        if move.action == "fireball":
+            self.shoot_fireball(damage=move.damage, speed=move.speed)
+        elif move.action == "attack":
+            self.attack(others, damage=move.damage, reach=move.range, hits=hits)
+
+    def facing_sign(self, others):
+        """+1 if the nearest opponent is to the right, -1 if to the left."""
+        if others:
+            nearest = min(others, key=lambda other: abs(other.rect.centerx - self.rect.centerx))
+            if nearest.rect.centerx != self.rect.centerx:
+                return 1 if nearest.rect.centerx > self.rect.centerx else -1
+        return 1 if self.direction == "right" else -1
 
     def animate(self):
+        # Frame indices (and so the hit masks and stun) advance the same on
+        # every machine. Only the image shown depends on quality: at lower
+        # levels it sticks to every anim_step-th frame of the animation.
+        anim_step = governor.settings["anim_step"]
         if self.is_damaged and self.active_damage_frames:
             self.damage_frame_count += 1
             if self.damage_frame_count >= self.damage_frame_delay:
                 self.damage_frame_count = 0
                 self.damage_frame_index = (self.damage_frame_index + 1) % len(self.active_damage_frames)
-            self.image = self.active_damage_frames[self.damage_frame_index]
+            shown = self.damage_frame_index - self.damage_frame_index % anim_step
+            self.image = self.active_damage_frames[shown]
+            self.update_masks()
             return
 
         frames = self.frames_right if self.direction == "right" else self.frames_left
@@ -203,66 +343,103 @@ class Fighter(pygame.sprite.Sprite):
         if self.frame_count >= self.frame_delay:
             self.frame_count = 0
             self.current_frame = (self.current_frame + 1) % len(frames)
-            self.image = frames[self.current_frame]
-
-    def update(self, others):
+        index = self.current_frame % len(frames)
+        self.image = frames[index - index % anim_step]
+        self.update_masks()
+
+    def read_input(self, others):
+        """
+        Phase 1 of a tick: return this tick's intent.
+
+        The intent is (dx, dy, attack, fireball, special). A stunned fighter
+        gets a neutral intent so gravity still applies; a fighter without
+        controls gets None and stays put.
+        """
         if self.stun_timer > 0:
             self.stun_timer -= 1
-            # Still apply gravity/landing while stunned
-            self.move(0, 0, others)  
-        else:
-            if self.controls:
-                dx, dy, attack, fireballs = self.controls.get_input(self)
-                if dy < 0:
-                    self.jump()
-                    dy = 0
-                self.move(dx, dy, others)
-                if attack:
-                    self.attack(others)
-                if fireballs:
-                    self.shoot_fireball()
-
-        if self.damage_timer > 0:
-            self.damage_timer -= 1
-        if self.attack_timer > 0:
-            self.attack_timer -= 1
-        if self.fireball_timer > 0:
-            self.fireball_timer -= 1
-        if self.damage_anim_timer > 0:
-            self.damage_anim_timer -= 1
-        else:
-            self.is_damaged = False
-        self.fireballs.update(others)
+            return NEUTRAL_INTENT
+        if not self.controls:
+            return None
+
+        dx, dy, attack, fireballs = self.controls.get_input(self)
+        special = self.command_reader.feed(self.tick, dx, dy, attack, fireballs,
+                                           self.facing_sign(others))
+        return dx, dy, attack, fireballs, special
+
+    def apply_movement(self, intent, others):
+        """Phase 2: jump and move."""
+        if intent is None:
+            return
 
-        self.animate()
+        move_fighters([(self, intent)])
 
+    def act(self, intent, others, hits=None):
+        """Phase 3: attack, shoot or perform a special."""
+        self.last_intent = intent
+        if intent is None:
+            return
+        dx, dy, attack, fireballs, special = intent
+        if special:
+            # The special replaces the plain button press that finished it
+            self.perform_special(special, others, hits)
+        else:
+            if attack:
+                self.attack(others, hits=hits)
+            if fireballs:
+                self.shoot_fireball()
 
-def create_fighters(player1_choice, player2_choice, player1_controls, player2_controls):
-    def get_paths(name):
-        return (
-            f"assets/images/{name}/{name}_right.gif",
-            f"assets/images/{name}/{name}_left.gif",
-            f"assets/images/{name}/damage_right.gif",
-            f"assets/images/{name}/damage_left.gif"
-        )
+    def advance_timers(self):
+        """Last phase: count down timers and advance the animation."""
+        advance_fighters([self])
 
-    p1_right, p1_left, p1_damage_r, p1_damage_l = get_paths(player1_choice)
-    p2_right, p2_left, p2_damage_r, p2_damage_l = get_paths(player2_choice)
+    def update(self, others):
+        """Run a whole tick for this fighter alone (see physics.step_fight for both)."""
+        intent = self.read_input(others)
+        self.apply_movement(intent, others)
+        self.act(intent, others)
+        self.fireballs.update(others)
+        self.advance_timers()
+
+
+def party_spawns(count):
+    """Spread `count` fighters evenly across the floor."""
+    if count == 1:
+        return [RED_SPAWN]
+    left, right = RED_SPAWN[0], BLUE_SPAWN[0]
+    return [(left + (right - left) * i // (count - 1), RED_SPAWN[1]) for i in range(count)]
+
+
+def create_roster(choices, controls, spawns=None):
+    """
+    Create one fighter per (character, controls) pair, all in one FighterStore.
+
+    Works for any number of fighters; spawns default to party_spawns().
+    Animations and stats come from each character's pack (see roster.py).
+    Returns (sprite group, list of fighters).
+    """
+    spawns = spawns or party_spawns(len(choices))
+    store = FighterStore(len(choices))
+    characters = get_roster()
+    roster = []
+    for name, control, (x, y) in zip(choices, controls, spawns):
+        pack = characters.use(name)
+        gif_right, gif_left, damage_right, damage_left = pack.fight_paths()
+        roster.append(Fighter(
+            x=x, y=y,
+            gif_right=gif_right, gif_left=gif_left,
+            damage_right_gif=damage_right, damage_left_gif=damage_left,
+            controls=control,
+            stats=pack.stats,
+            name=name,
+            store=store
+        ))
+    return pygame.sprite.Group(roster), roster
 
-    red_fighter = Fighter(
-        x=100, y=GROUND_Y,
-        gif_right=p1_right, gif_left=p1_left,
-        damage_right_gif=p1_damage_r, damage_left_gif=p1_damage_l,
-        controls=player1_controls
-    )
 
-    blue_fighter = Fighter(
-        x=600, y=GROUND_Y,
-        gif_right=p2_right, gif_left=p2_left,
-        damage_right_gif=p2_damage_r, damage_left_gif=p2_damage_l,
-        controls=player2_controls
+def create_fighters(player1_choice, player2_choice, player1_controls, player2_controls):
+    fighters, (red_fighter, blue_fighter) = create_roster(
+        (player1_choice, player2_choice),
+        (player1_controls, player2_controls),
+        spawns=(RED_SPAWN, BLUE_SPAWN)
     )
-
-    fighters = pygame.sprite.Group()
-    fighters.add(red_fighter, blue_fighter)
     return fighters, red_fighter, blue_fighter
@@ -0,0 +1,127 @@
+# src/startup.py
+"""
+Startup timing for --profile-startup.
+
+main.py switches the profile on before its other imports, so the report
+covers everything from process start to the first menu frame on screen:
+the interpreter getting as far as main.py, every package imported on the
+way (own time, not counting the packages it imports in turn) and every
+asset loaded before that first flip.
+
+Assets loaded on loading threads are listed separately: they overlap the
+main thread, so they only cost time where the main thread waits for them.
+
+Nothing here imports pygame or config, so this can be imported first.
+"""
+
+import builtins
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+def process_age():
+    """Seconds since this process was started, or None if the OS won't say (Linux only)."""
+    try:
+        with open("/proc/self/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")  # field 22, starttime
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class StartupProfile:
+    def __init__(self):
+        self.enabled = False
+        self.origin = None       # perf_counter() at process start
+        self.interpreter = None  # seconds before main.py got going, if known
+        self.imports = {}        # top-level module -> seconds importing it
+        self.assets = []         # (label, seconds, on the main thread?)
+        self._stack = []         # seconds spent in nested imports, per open import
+        self._import = None
+        self._thread = None
+
+    def start(self):
+        """Start timing. Call before anything worth measuring is imported."""
+        now = time.perf_counter()
+        self.interpreter = process_age()
+        self.origin = now - (self.interpreter or 0)
+        self._thread = threading.get_ident()
+        self._import = builtins.__import__
+        builtins.__import__ = self._timed_import
+        self.enabled = True
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules or threading.get_ident() != self._thread:
+            return self._import(name, globals, locals, fromlist, level)
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._stack.pop()
+            module = name.partition(".")[0]
+            self.imports[module] = self.imports.get(module, 0.0) + elapsed - nested
+            if self._stack:
+                self._stack[-1] += elapsed
+
+    @contextmanager
+    def span(self, label):
+        """Time loading one asset (from any thread)."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            main = threading.get_ident() == self._thread
+            self.assets.append((label, time.perf_counter() - start, main))
+
+    def first_frame(self):
+        """Call after the first menu frame is flipped: stop timing and print the report."""
+        if not self.enabled:
+            return
+        total = time.perf_counter() - self.origin
+        builtins.__import__ = self._import
+        self.enabled = False
+        print(self.report(total))
+
+    def report(self, total, top=10):
+        row = lambda label, seconds: f"{label:<32}{seconds * 1000:8.1f} ms"
+        lines = [row("startup, process to first frame", total)]
+        accounted = 0.0
+        if self.interpreter is not None:
+            lines.append(row("  interpreter", self.interpreter))
+            accounted += self.interpreter
+
+        imports = sorted(self.imports.items(), key=lambda item: -item[1])
+        accounted += sum(seconds for module, seconds in imports)
+        lines.append(row("  imports", sum(seconds for module, seconds in imports)))
+        for module, seconds in imports[:top]:
+            lines.append(row(f"    {module}", seconds))
+        if len(imports) > top:
+            rest = imports[top:]
+            lines.append(row(f"    ({len(rest)} more)", sum(seconds for module, seconds in rest)))
+
+        main_assets = [(label, seconds) for label, seconds, main in self.assets if main]
+        accounted += sum(seconds for label, seconds in main_assets)
+        lines.append(row("  assets", sum(seconds for label, seconds in main_assets)))
+        for label, seconds in main_assets:
+            lines.append(row(f"    {label}", seconds))
+        lines.append(row("  everything else", max(total - accounted, 0.0)))
+
+        loading = [(label, seconds) for label, seconds, main in self.assets if not main]
+        if loading:
+            lines.append("  on loading threads (overlaps the above)")
+            for label, seconds in loading:
+                lines.append(row(f"    {label}", seconds))
+        return "\n".join(lines)
+
+
+profile = StartupProfile()
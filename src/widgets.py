@@ -0,0 +1,96 @@
+# src/widgets.py
+"""
+Pre-rendered UI pieces for the menus and overlays.
+
+A menu frame used to build a translucent surface for every button, render
+every label and flip every walking sprite. Here each of those is baked the
+first time it's drawn, and drawing a frame is only blits:
+
+- Label is a piece of static text with its position worked out once.
+- Button keeps its box and label as one image per state: normal and
+  hovered, translucent and (for low quality) opaque.
+- flipped() mirrors a list of animation frames once, up front.
+"""
+
+import pygame
+from fonts import get_font
+from quality import governor
+
+WHITE = (255, 255, 255)
+
+
+def render_text(string, font, size, color):
+    return get_font(font, size).render(string, True, color)
+
+
+def panel(size, color, translucent=True):
+    """A filled box; opaque (alpha dropped) when translucent overlays are off."""
+    if translucent:
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        surface.fill(color)
+    else:
+        surface = pygame.Surface(size)
+        surface.fill(color[:3])
+    return surface
+
+
+def flipped(frames):
+    """The same frames facing the other way."""
+    return [pygame.transform.flip(frame, True, False) for frame in frames]
+
+
+class Label:
+    """
+    Text that doesn't change, placed with a pygame.Rect keyword such as
+    center=(x, y) or midtop=(x, y). `below=(label, gap)` puts it under
+    another label instead.
+    """
+    def __init__(self, string, font="regular", size=36, color=WHITE, below=None, **anchor):
+        self.string = string
+        self.font = font
+        self.size = size
+        self.color = color
+        self.below = below
+        self.anchor = anchor
+        self.image = None
+        self.rect = None
+
+    def bake(self):
+        self.image = render_text(self.string, self.font, self.size, self.color)
+        if self.below:
+            other, gap = self.below
+            if other.image is None:
+                other.bake()
+            self.anchor = {"midtop": (other.rect.centerx, other.rect.bottom + gap)}
+        self.rect = self.image.get_rect(**self.anchor)
+
+    def draw(self, screen):
+        if self.image is None:
+            self.bake()
+        screen.blit(self.image, self.rect)
+
+
+class Button:
+    """A box with an optional centred label, pre-rendered in each state."""
+    def __init__(self, rect, label=None, color=(50, 50, 50, 180), hover_color=(100, 100, 100, 220),
+                 font="regular", size=36):
+        self.rect = pygame.Rect(rect)
+        self.label = label
+        self.colors = {False: color, True: hover_color}
+        self.font = font
+        self.size = size
+        self.images = {}  # (hovered, translucent) -> Surface
+
+    def bake(self, hovered, translucent):
+        surface = panel(self.rect.size, self.colors[hovered], translucent)
+        if self.label:
+            text = render_text(self.label, self.font, self.size, WHITE)
+            surface.blit(text, text.get_rect(center=(self.rect.width // 2, self.rect.height // 2)))
+        return surface
+
+    def draw(self, screen, mouse_pos):
+        key = (self.rect.collidepoint(mouse_pos), governor.settings["alpha_overlays"])
+        image = self.images.get(key)
+        if image is None:
+            image = self.images[key] = self.bake(*key)
+        screen.blit(image, self.rect)
@@ -0,0 +1,55 @@
+# tests/conftest.py
+"""
+Shared test setup: SDL runs headless, src/ is importable the way main.py
+sees it, and paths like assets/data/moves.json resolve from the repo root.
+make_game builds GameCanvas fights without a window or the real history file.
+"""
+
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import pygame
+import pytest
+
+
+@pytest.fixture(scope="session")
+def display():
+    """A tiny dummy display, for anything that converts or draws surfaces."""
+    pygame.display.init()
+    yield pygame.display.set_mode((10, 10))
+    pygame.display.quit()
+
+
+@pytest.fixture
+def make_game(display, tmp_path, monkeypatch):
+    """Steve vs an AI Googley, with the red side AI-driven too; update() is stepped by the test."""
+    import config
+    from ai import AIControls
+    from gamecanvas import GameCanvas
+    from history import MatchHistory
+    monkeypatch.setattr(config, "SIMULATION_THREAD", False)
+    games = []
+
+    def make():
+        game = GameCanvas(pygame.Surface((config.SCREEN_WIDTH, config.SCREEN_HEIGHT)), None, None, None)
+        game.history.close()
+        game.history = MatchHistory(str(tmp_path / f"history{len(games)}.sqlite3"))
+        game.selected_mode = "singleplayer"
+        game.player1_choice, game.player2_choice = "Steve", "Googley"
+        game.load_fighters()
+        game.start_fight()
+        game.red_fighter.controls = AIControls(game.red_fighter, game.blue_fighter, config, seed=7)
+        games.append(game)
+        return game
+
+    yield make
+    for game in games:
+        game.stop_simulation()
+        game.history.close()
@@ -0,0 +1,65 @@
+# tests/test_ai.py
+import config
+from ai import ACTIONS, AIControls, CountTable, PlayerModel, encode_action
+
+
+def test_actions_encode_to_distinct_symbols():
+    symbols = {encode_action(dx, dy, attack, fireball)
+               for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+               for attack in (False, True) for fireball in (False, True)}
+    assert symbols == set(range(ACTIONS))
+
+
+def test_count_table_halves_at_max_count():
+    table = CountTable(contexts=2, max_count=10)
+    attack = encode_action(1, 0, True, False)
+    fireball = encode_action(0, 0, False, True)
+    for _ in range(6):
+        table.add(1, attack)
+    for _ in range(3):
+        table.add(1, fireball)
+    assert (table.totals[1], table.attacks[1], table.fireballs[1]) == (9, 6, 3)
+
+    table.add(1, fireball)  # the tenth observation halves the context
+    assert table.counts[ACTIONS + attack] == 3
+    assert table.counts[ACTIONS + fireball] == 2
+    assert (table.totals[1], table.attacks[1], table.fireballs[1]) == (5, 3, 2)
+    assert table.totals[0] == 0  # other contexts are untouched
+
+
+def test_counts_stay_bounded():
+    table = CountTable(contexts=1, max_count=config.AI_MODEL_MAX_COUNT)
+    for i in range(20 * config.AI_MODEL_MAX_COUNT):
+        table.add(0, i % 3)
+    assert table.totals[0] < config.AI_MODEL_MAX_COUNT
+    assert sum(table.counts[:ACTIONS]) == table.totals[0]
+
+
+def test_model_predicts_a_habit():
+    model = PlayerModel()
+    walk = (1, 0, False, False)
+    throw = (0, 0, False, True)
+    for _ in range(30):
+        model.observe(*walk, distance=300)
+        model.observe(*throw, distance=300)
+    model.observe(*walk, distance=300)
+    # After walking forward this player always throws a fireball next
+    assert model.fireball_chance() == 1.0
+    assert model.attack_chance() == 0.0
+
+
+def test_held_input_is_one_action():
+    model = PlayerModel()
+    for _ in range(100):
+        model.observe(1, 0, False, False, distance=100)
+    assert model.tables[0].totals[0] == 1
+    assert model.frames_total == 100
+
+
+def test_seeded_ai_rerolls_after_skip_to():
+    ai = AIControls(None, None, config, seed=3)
+    rolls = [ai.roll() for _ in range(50)]
+    ai.skip_to(20)
+    assert [ai.roll() for _ in range(30)] == rolls[20:]
+    ai.reset()
+    assert ai.draws == 0 and ai.roll() == rolls[0]
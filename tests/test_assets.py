@@ -0,0 +1,100 @@
+# tests/test_assets.py
+import threading
+import pytest
+import assets as assets_module
+from assets import AssetPrefetcher, PRIORITY_NOW, PRIORITY_SOON
+
+RAW = [(bytes(4 * 2 * 2), (2, 2))] * 3  # three 2x2 RGBA frames
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    """Count decode_gif calls; set `gate` to hold decoding until the test lets it go."""
+    class Decodes:
+        calls = []
+        gate = None
+        started = threading.Event()
+
+        @classmethod
+        def decode(cls, path, scale=None):
+            cls.calls.append((path, scale))
+            cls.started.set()
+            if cls.gate is not None:
+                assert cls.gate.wait(5)
+            if path == "broken.gif":
+                raise OSError("not a GIF")
+            return RAW
+
+    Decodes.calls = []
+    monkeypatch.setattr(assets_module, "decode_gif", Decodes.decode)
+    return Decodes
+
+
+def test_requested_again_is_decoded_once(display, decodes):
+    loader = AssetPrefetcher(workers=2)
+    loader.request("a.gif")
+    loader.request("a.gif", priority=PRIORITY_SOON)  # moved up: queued twice
+    results = []
+    getters = [threading.Thread(target=lambda: results.append(loader.get("a.gif"))) for _ in range(4)]
+    for getter in getters:
+        getter.start()
+    frames = loader.get("a.gif")
+    for getter in getters:
+        getter.join(5)
+    loader.request("a.gif", priority=PRIORITY_NOW)  # already decoded: nothing to do
+    assert loader.get("a.gif") is frames
+    assert all(result is frames for result in results) and len(results) == 4
+    assert decodes.calls == [("a.gif", None)]
+    assert len(frames) == 3
+    assert loader.progress() == (1, 1)
+
+
+def test_forget_during_decode_is_refused(display, decodes):
+    decodes.gate = threading.Event()
+    loader = AssetPrefetcher(workers=1)
+    loader.request("a.gif")
+    assert decodes.started.wait(5)
+    assert loader.forget("a.gif") is False  # mid-load: left alone
+    decodes.gate.set()
+    frames = loader.get("a.gif")
+    assert len(frames) == 3 and decodes.calls == [("a.gif", None)]
+
+    assert loader.forget("a.gif") is True
+    assert loader.progress() == (0, 0)
+    assert loader.get("a.gif") is not frames  # asked for after forgetting: decoded again
+    assert decodes.calls == [("a.gif", None)] * 2
+
+
+def test_forget_while_queued_is_refused(display, decodes):
+    decodes.gate = threading.Event()
+    loader = AssetPrefetcher(workers=1)
+    loader.request("busy.gif")
+    assert decodes.started.wait(5)  # the only worker is held up
+    loader.request("later.gif")
+    assert loader.forget("later.gif") is False
+    decodes.gate.set()
+    assert len(loader.get("later.gif")) == 3
+    assert decodes.calls == [("busy.gif", None), ("later.gif", None)]
+
+
+def test_frames_from_a_loading_thread_are_converted_in_place(display, decodes):
+    loader = AssetPrefetcher(workers=1)
+    loaded = []
+    thread = threading.Thread(target=lambda: loaded.append(loader.get("a.gif")))
+    thread.start()
+    thread.join(5)
+    frames = loaded[0]
+    assert ("a.gif", None) in loader.unconverted
+    loader.pump(budget_ms=100)
+    assert not loader.unconverted
+    assert loader.get("a.gif") is frames  # same list, converted surfaces
+    assert decodes.calls == [("a.gif", None)]
+
+
+def test_decode_error_is_raised_every_time(display, decodes):
+    loader = AssetPrefetcher(workers=1)
+    for _ in range(2):
+        with pytest.raises(OSError):
+            loader.get("broken.gif")
+    assert decodes.calls == [("broken.gif", None)]
+    assert loader.finished()
@@ -0,0 +1,92 @@
+# tests/test_commands.py
+import pytest
+from commands import CommandMatcher, CommandReader, InputBuffer, load_moves
+
+
+def token_input(token, facing):
+    """(dx, dy) that reads as a numpad direction token for a fighter facing `facing`."""
+    row, column = divmod(int(token) - 1, 3)
+    return (column - 1) * facing, 1 - row
+
+
+def perform(reader, tokens, facing=1, hold=2, start=0):
+    """Feed a motion one token at a time; return every Move completed along the way."""
+    frame = start
+    dx = dy = 0
+    completed = []
+    for token in tokens:
+        if token in ("A", "F"):
+            inputs = [(dx, dy, token == "A", token == "F"), (dx, dy, False, False)]
+        else:
+            dx, dy = token_input(token, facing)
+            inputs = [(dx, dy, False, False)] * hold
+        for state in inputs:
+            move = reader.feed(frame, *state, facing)
+            if move:
+                completed.append(move)
+            frame += 1
+    return completed
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return CommandMatcher(load_moves())
+
+
+def every_move():
+    moves = load_moves()
+    return [(character, move) for character, character_moves in moves.items() for move in character_moves]
+
+
+@pytest.mark.parametrize("facing", [1, -1])
+@pytest.mark.parametrize("character, move", every_move(), ids=lambda value: getattr(value, "name", value))
+def test_every_move_matches_its_motion(matcher, character, move, facing):
+    reader = CommandReader(character, matcher)
+    assert [completed.name for completed in perform(reader, ("5",) + move.input, facing)] == [move.name]
+
+
+def test_longest_motion_wins(matcher):
+    # 4 1 2 3 6 F ends in 2 3 6 F too, but Googley Beam is the longer input
+    reader = CommandReader("Googley", matcher)
+    assert [move.name for move in perform(reader, ["4", "1", "2", "3", "6", "F"])] == ["Googley Beam"]
+
+
+def test_slip_between_directions_still_counts(matcher):
+    reader = CommandReader("Alex", matcher)
+    assert [move.name for move in perform(reader, ["2", "1", "3", "6", "F"])] == ["Power Fireball"]
+
+
+def test_motion_slower_than_its_window_does_not_match(matcher):
+    reader = CommandReader("Alex", matcher)
+    move = next(move for move in reader.moves() if move.name == "Power Fireball")
+    assert perform(reader, move.input, hold=move.window) == []
+
+
+def test_motion_does_not_fire_twice(matcher):
+    reader = CommandReader("Steve", matcher)
+    completed = perform(reader, ["6", "2", "3", "A", "A"])
+    assert [move.name for move in completed] == ["Pickaxe Uppercut"]
+
+
+def test_unknown_character_gets_default_moves(matcher):
+    reader = CommandReader("Nobody", matcher)
+    assert reader.character == "default"
+    assert [move.name for move in reader.moves()] == ["Power Fireball", "Dash Strike"]
+
+
+def test_save_and_restore_resume_a_motion(matcher):
+    reader = CommandReader("Steve", matcher)
+    perform(reader, ["6", "2"])
+    saved = reader.save()
+    perform(reader, ["5", "5", "4"], start=4)
+    reader.restore(saved)
+    assert [move.name for move in perform(reader, ["3", "A"], start=4)] == ["Pickaxe Uppercut"]
+
+
+def test_input_buffer_keeps_newest_first():
+    buffer = InputBuffer(size=3)
+    for frame in range(5):
+        buffer.push(frame, (frame % 3 - 1, 0, frame == 4, False))
+    assert len(buffer) == 3
+    assert list(buffer) == [(4, (0, 0, True, False)), (3, (-1, 0, False, False)), (2, (1, 0, False, False))]
+    assert buffer.latest() == (4, (0, 0, True, False))
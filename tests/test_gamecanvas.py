@@ -0,0 +1,37 @@
+# tests/test_gamecanvas.py
+import pygame
+from metrics import REMATCH_SECONDS
+
+
+def test_rematch_reuses_fighters(make_game):
+    game = make_game()
+    fighters = list(game.roster)
+    frames = [fighter.frames_right for fighter in fighters]
+    for _ in range(300):
+        game.update()
+    assert game.round_tick == 300
+
+    game.load_fighters()  # same characters and mode: a rematch
+    assert game.roster == fighters and all(a is b for a, b in zip(game.roster, fighters))
+    assert [fighter.frames_right for fighter in game.roster] == frames
+    assert game.round_tick == 0
+    for fighter in game.roster:
+        assert fighter.health == fighter.max_health
+        assert fighter.rect.topleft == fighter.spawn
+    assert game.rematch_us > 0
+    assert dict(REMATCH_SECONDS.samples())["googley_rematch_reset_seconds"] == game.rematch_us / 1e6
+
+
+def test_rematch_time_is_shown(make_game, monkeypatch):
+    game = make_game()
+    game.reset_game()
+    rendered = []
+
+    class Font:
+        def render(self, text, antialias, color):
+            rendered.append(text)
+            return pygame.Surface((1, 1))
+
+    monkeypatch.setattr(type(game), "font_tiny", property(lambda self: Font()))
+    game.draw_quality_stats()
+    assert rendered[0].endswith(f"rematch reset {game.rematch_us:.0f} us")
@@ -0,0 +1,79 @@
+# tests/test_history.py
+import pytest
+from config import HISTORY_BATCH_SIZE
+from history import MatchHistory
+
+
+def match(p1, p2, winner, ko=1, p1_health=40, p2_health=0):
+    return dict(mode="multiplayer", p1_character=p1, p2_character=p2, winner=winner, ko=ko,
+                duration_ticks=600, p1_health=p1_health, p2_health=p2_health,
+                p1_hits=3, p2_hits=1, p1_specials=0, p2_specials=0)
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = MatchHistory(str(tmp_path / "history.sqlite3"))
+    yield history
+    history.close()
+
+
+def test_queries_before_anything_is_written(history):
+    assert history.win_rates() == {}
+    assert history.leaderboard() == []
+
+
+def test_burst_is_written_in_batches(tmp_path, monkeypatch):
+    batches = []
+    write_batch = MatchHistory._write_batch
+
+    def record_batch(self, connection, batch):
+        batches.append(len(batch))
+        write_batch(self, connection, batch)
+
+    monkeypatch.setattr(MatchHistory, "_write_batch", record_batch)
+    history = MatchHistory(str(tmp_path / "history.sqlite3"))
+    count = HISTORY_BATCH_SIZE * 3 + 5
+    for i in range(count):
+        history.record(**match("Steve", "Googley", winner=1 + i % 2))
+    history.close()
+
+    assert sum(batches) == count
+    assert len(batches) <= count // HISTORY_BATCH_SIZE + 2
+    assert history.win_rates() == {
+        "Steve": (count, (count + 1) // 2, (count + 1) // 2 / count),
+        "Googley": (count, count // 2, count // 2 / count),
+    }
+
+
+def test_stats_and_leaderboard(history):
+    history.record(played_at=1.0, **match("Steve", "Googley", winner=1))
+    history.record(played_at=2.0, **match("Alex", "Steve", winner=2))
+    history.record(played_at=3.0, **match("Googley", "Alex", winner=0, ko=0, p1_health=30, p2_health=30))
+    history.close()
+
+    leaderboard = history.leaderboard()
+    assert leaderboard[0] == ("Steve", 2, 2, 2, 1.0)
+    assert sorted(leaderboard[1:]) == [("Alex", 2, 0, 0, 0.0), ("Googley", 2, 0, 0, 0.0)]
+    assert history.head_to_head("Steve", "Alex") == (1, 1, 0)
+    assert [row[2:5] for row in history.recent()] == [
+        ("Googley", "Alex", 0), ("Alex", "Steve", 2), ("Steve", "Googley", 1)]
+
+
+def test_mirror_matches(history):
+    history.record(**match("Steve", "Steve", winner=2, p1_health=0, p2_health=55))
+    history.record(**match("Steve", "Steve", winner=1))
+    history.record(**match("Steve", "Steve", winner=0, ko=0, p1_health=20, p2_health=20))
+    history.record(**match("Steve", "Googley", winner=1))
+    history.close()
+    # Counted once each, and never as a win for Steve against himself
+    assert history.head_to_head("Steve", "Steve") == (3, 1, 1)
+    assert history.head_to_head("Steve", "Googley") == (1, 1, 0)
+    assert history.win_rates() == {"Steve": (1, 1, 1.0), "Googley": (1, 0, 0.0)}
+    assert len(history.recent()) == 4
+
+
+def test_close_twice(history):
+    history.record(**match("Steve", "Googley", winner=1))
+    history.close()
+    history.close()
+    assert history.win_rates()["Steve"][0] == 1
@@ -0,0 +1,97 @@
+# tests/test_hitbox.py
+import pygame
+import pytest
+from hitbox import CollisionStats, FrameMasks, build_hit_mask, collide, hit_origin
+
+
+def frame(width, height, body):
+    """A transparent frame with `body` (a Rect) opaque."""
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    surface.fill((255, 0, 0, 255), body)
+    return surface
+
+
+def bits(mask):
+    width, height = mask.get_size()
+    return {(x, y) for x in range(width) for y in range(height) if mask.get_at((x, y))}
+
+
+def mirrored(points, width):
+    return {(width - 1 - x, y) for x, y in points}
+
+
+def solid(size):
+    mask = pygame.mask.Mask(size)
+    mask.fill()
+    return mask
+
+
+def test_overlapping_vs_touching():
+    a, b = pygame.Rect(0, 0, 10, 10), pygame.Rect(9, 0, 10, 10)
+    assert collide(a, solid(a.size), b, solid(b.size), CollisionStats())
+    touching = pygame.Rect(10, 0, 10, 10)  # shares an edge, no pixel in common
+    assert not collide(a, solid(a.size), touching, solid(touching.size), CollisionStats())
+    assert not a.colliderect(touching)  # the rect test agreed
+
+
+@pytest.mark.parametrize("dx", range(-12, 13, 3))
+@pytest.mark.parametrize("dy", range(-12, 13, 4))
+def test_full_masks_match_the_rect_test(dx, dy):
+    a, b = pygame.Rect(20, 20, 10, 10), pygame.Rect(20 + dx, 20 + dy, 8, 6)
+    assert collide(a, solid(a.size), b, solid(b.size), CollisionStats()) == a.colliderect(b)
+    assert collide(a, None, b, None, CollisionStats()) == a.colliderect(b)
+
+
+def test_transparent_corners_dont_hit():
+    a, b = pygame.Rect(0, 0, 16, 16), pygame.Rect(12, 12, 16, 16)
+    body = pygame.Rect(0, 0, 8, 8)  # both frames are only opaque in their top-left quarter
+    mask_a = pygame.mask.from_surface(frame(16, 16, body))
+    mask_b = pygame.mask.from_surface(frame(16, 16, body))
+    stats = CollisionStats()
+    assert a.colliderect(b)
+    assert not collide(a, mask_a, b, mask_b, stats)
+    assert (stats.queries, stats.prefilter_rejects, stats.mask_tests, stats.hits) == (1, 0, 1, 0)
+
+
+def test_hit_zone_is_in_front_of_the_body():
+    hurt = pygame.mask.from_surface(frame(8, 4, pygame.Rect(2, 1, 3, 2)))
+    right = build_hit_mask(hurt, 3, "right")
+    assert right.get_size() == (11, 4)
+    assert bits(right) == {(x, y) for x in range(5, 8) for y in (1, 2)}  # 3 px right of the body
+    left = build_hit_mask(hurt, 3, "left")
+    assert bits(left) == {(x, y) for x in range(2, 5) for y in (1, 2)}  # 3 px left, body at x 3+2
+    assert hit_origin(pygame.Rect(100, 50, 8, 4), 3, "left") == (97, 50)
+    assert hit_origin(pygame.Rect(100, 50, 8, 4), 3, "right") == (100, 50)
+
+
+def test_flipped_frame_gives_mirrored_masks():
+    image = frame(12, 6, pygame.Rect(1, 0, 4, 6))  # body near the left edge, facing right
+    flipped = pygame.transform.flip(image, True, False)
+    right = FrameMasks([image], reaches=(5,), facing="right")
+    left = FrameMasks([flipped], reaches=(5,), facing="left")
+    assert bits(left.hurt[0]) == mirrored(bits(right.hurt[0]), 12)
+    width = 12 + 5
+    assert bits(left.hit[5][0]) == mirrored(bits(right.hit[5][0]), width)
+
+
+def test_flipped_attack_hits_the_same_target_from_the_other_side():
+    image = frame(12, 6, pygame.Rect(1, 0, 4, 6))
+    flipped = pygame.transform.flip(image, True, False)
+    right = FrameMasks([image], reaches=(5,), facing="right")
+    left = FrameMasks([flipped], reaches=(5,), facing="left")
+    target = pygame.mask.Mask((4, 6), fill=True)
+
+    attacker = pygame.Rect(100, 0, 12, 6)
+    x, y = hit_origin(attacker, 5, "right")
+    in_front = pygame.Rect(106, 0, 4, 6)  # just past the body, inside the reach
+    assert collide(pygame.Rect((x, y), right.hit[5][0].get_size()), right.hit[5][0],
+                   in_front, target, CollisionStats())
+
+    x, y = hit_origin(attacker, 5, "left")
+    mirror = pygame.Rect(attacker.right - (in_front.right - attacker.left), 0, 4, 6)
+    assert collide(pygame.Rect((x, y), left.hit[5][0].get_size()), left.hit[5][0],
+                   mirror, target, CollisionStats())
+    behind = pygame.Rect(90, 0, 4, 6)  # nothing reaches back there when facing right
+    x, y = hit_origin(attacker, 5, "right")
+    assert not collide(pygame.Rect((x, y), right.hit[5][0].get_size()), right.hit[5][0],
+                       behind, target, CollisionStats())
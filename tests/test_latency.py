@@ -0,0 +1,64 @@
+# tests/test_latency.py
+import pygame
+import pytest
+import config
+from controls import Player1Controls
+from latency import LatencyBot, LatencyProbe
+
+
+def keyboard_game(make_game, monkeypatch, threaded):
+    """A fight where red is on the keyboard (the bot presses D, red's right)."""
+    game = make_game()
+    game.red_fighter.controls = Player1Controls()
+    monkeypatch.setattr(config, "SIMULATION_THREAD", threaded)
+    monkeypatch.setattr(config, "LOW_LATENCY_INPUT", False)
+    game.scene = game.scenes["playing"]
+    pygame.event.clear()
+    game.start_simulation()
+    assert game.simulation_path == ("thread" if threaded else "inline")
+    return game
+
+
+def test_bot_press_moves_inline_fighter(make_game, monkeypatch):
+    game = keyboard_game(make_game, monkeypatch, threaded=False)
+    bot = LatencyBot()
+    start_x = game.red_fighter.pos_x
+
+    bot.post(pygame.KEYDOWN)
+    game.handle_events()
+    game.update()  # the frame that read the press moves on it
+    assert game.red_fighter.pos_x > start_x
+    assert game.input_stamp is not None
+
+    bot.post(pygame.KEYUP)
+    game.handle_events()
+    game.update()
+    stopped_x = game.red_fighter.pos_x
+    game.update()
+    assert game.red_fighter.pos_x == stopped_x
+
+
+def test_bot_press_moves_threaded_fighter(make_game, monkeypatch):
+    game = keyboard_game(make_game, monkeypatch, threaded=True)
+    buffer = game.simulation.buffer
+    assert buffer.wait_newer(0, 1)
+    start = buffer.take()[0]
+
+    LatencyBot().post(pygame.KEYDOWN)
+    game.handle_events()
+    pressed_at = buffer.take()[0].tick
+    snapshot = start
+    while snapshot.red.rect.x == start.red.rect.x:
+        assert buffer.wait_newer(snapshot.tick, 1)
+        snapshot = buffer.take()[0]
+    assert snapshot.tick - pressed_at <= 2  # the next tick or the one after
+    assert snapshot.input_stamp is not None
+
+
+def test_probe_counts_each_stamp_once():
+    probe = LatencyProbe()
+    probe.frame_shown(1.0, 1.010)
+    probe.frame_shown(1.0, 1.026)  # still the same press on screen
+    probe.frame_shown(None, 1.040)
+    probe.frame_shown(2.0, 2.005)
+    assert list(probe.samples) == pytest.approx([0.010, 0.005])
@@ -0,0 +1,55 @@
+# tests/test_metrics.py
+import threading
+from metrics import MetricsRegistry
+
+
+def run_threads(target, count=4):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_counter_from_many_threads():
+    counter = MetricsRegistry().counter("test_total", "test")
+
+    def work():
+        for _ in range(50000):
+            counter.inc()
+
+    run_threads(work)
+    counter.inc(2)
+    assert dict(counter.samples()) == {"test_total": 200002}
+    # Finished threads are folded into one total
+    assert len(counter.deltas.shards) == 1
+
+
+def test_histogram_from_many_threads():
+    histogram = MetricsRegistry().histogram("test_seconds", "test", buckets=(1, 2))
+
+    def work():
+        for value in (0.5, 1.5, 3):
+            histogram.observe(value)
+
+    run_threads(work)
+    assert dict(histogram.samples()) == {
+        'test_seconds_bucket{le="1"}': 4,
+        'test_seconds_bucket{le="2"}': 8,
+        'test_seconds_bucket{le="+Inf"}': 12,
+        "test_seconds_sum": 20.0,
+        "test_seconds_count": 12,
+    }
+
+
+def test_gauge_set_and_inc():
+    registry = MetricsRegistry()
+    level, active = registry.gauge("level", "test"), registry.gauge("active", "test")
+    level.set(3)
+    level.set(5)
+    active.inc(2)
+    active.dec()
+    text = registry.render()
+    assert "# TYPE level gauge\nlevel 5\n" in text
+    assert "active 1\n" in text
+
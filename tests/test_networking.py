@@ -0,0 +1,110 @@
+# tests/test_networking.py
+import random
+import pytest
+import config
+from networking import (ROLLBACK_DEPTH, NetMatch, Netem, NetemConditions, decode_input, encode_input,
+                        load_profile, run_match)
+from rewind import pack_game
+
+
+def test_input_encoding_round_trip():
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            for attack in (False, True):
+                for fireball in (False, True):
+                    state = (dx, dy, attack, fireball)
+                    assert decode_input(encode_input(*state)) == state
+
+
+def random_inputs(count, seed):
+    rng = random.Random(seed)
+    return [encode_input(rng.choice((-1, 0, 1)), rng.choice((-1, 0, 0, 0)),
+                         rng.random() < 0.1, rng.random() < 0.05) for _ in range(count)]
+
+
+def test_load_rewinds_a_match_exactly(display):
+    match = NetMatch("Steve", "Googley")
+    red, blue = random_inputs(300, seed=1), random_inputs(300, seed=2)
+    for frame in range(100):
+        match.step(red[frame], blue[frame])
+    saved = match.save()
+    for frame in range(100, 300):
+        match.step(red[frame], blue[frame])
+    final = pack_game(match)
+
+    match.load(saved)
+    assert pack_game(match) == saved[0]
+    for frame in range(100, 300):
+        match.step(red[frame], blue[frame])
+    assert pack_game(match) == final
+
+
+def without_timings(report):
+    """The report minus wall-clock figures (how long re-simulating took)."""
+    return {**report, "clients": [{key: value for key, value in client.items() if key != "resim_ms_per_frame"}
+                                  for client in report["clients"]]}
+
+
+@pytest.mark.parametrize("profile", ["wifi", "mobile", "spikes"])
+def test_rollback_match_has_no_desyncs(display, profile):
+    recorded = dict(ROLLBACK_DEPTH.samples())["googley_net_rollback_depth_frames_count"]
+    report, clients = run_match(profile, frames=600, simulated=True)
+    rollbacks = sum(client["rollbacks"] for client in report["clients"])
+    assert rollbacks > 0  # the guesses were tested
+    assert report["desyncs"] == 0
+    assert report["final_states_match"]
+    assert all(client.frame == 600 for client in clients)
+    assert dict(ROLLBACK_DEPTH.samples())["googley_net_rollback_depth_frames_count"] == recorded + rollbacks
+
+
+def test_simulated_match_is_repeatable(display):
+    first, _ = run_match("mobile", frames=300, simulated=True)
+    second, _ = run_match("mobile", frames=300, simulated=True)
+    assert without_timings(first) == without_timings(second)
+    assert first["relay"]["dropped"] and first["relay"]["reordered"] and first["relay"]["duplicated"]
+
+
+def test_outage_stalls_instead_of_predicting_too_far(display):
+    report, clients = run_match("spikes", frames=600, simulated=True)  # 1 s with every packet lost
+    assert all(client["stalls"] > 0 for client in report["clients"])
+    assert max(client["max_rollback_depth"] for client in report["clients"]) <= config.NET_MAX_ROLLBACK
+    assert report["desyncs"] == 0
+
+
+def test_netem_delivers_in_due_order():
+    netem = Netem([NetemConditions(latency_ms=10)])
+    netem.impair(1, b"first", now=0.0)
+    netem.impair(1, b"second", now=0.001)
+    assert list(netem.due(0.0105)) == [(1, b"first")]
+    assert list(netem.due(1.0)) == [(1, b"second")]
+
+    lossy = Netem([NetemConditions(loss=1.0)])
+    lossy.impair(0, b"gone", now=0.0)
+    assert list(lossy.due(1.0)) == [] and lossy.dropped == 1
+
+    doubled = Netem([NetemConditions(duplicate=1.0)])
+    doubled.impair(0, b"twice", now=0.0)
+    assert list(doubled.due(0.0)) == [(0, b"twice"), (0, b"twice")]
+
+
+def test_netem_follows_profile_phases():
+    netem = Netem(load_profile("spikes"))
+    assert netem.conditions(1.0).latency == 0.02
+    assert netem.conditions(3.2).loss == 0.2
+    assert netem.conditions(7.0).loss == 1.0
+    assert netem.conditions(100.0).loss == 0.0
+
+
+def test_replayed_inputs_give_the_same_match(display):
+    report, clients = run_match("lan", frames=300, simulated=True)
+    replayed, replay_clients = run_match("mobile", frames=300, simulated=True,
+                                         recordings=[client.local for client in clients])
+    assert replayed["desyncs"] == 0
+    assert pack_game(replay_clients[0].match) == pack_game(clients[0].match)
+
+
+def test_udp_relay_smoke(display):
+    """One short match over real sockets through the relay thread."""
+    report, clients = run_match("lan", frames=30)
+    assert report["desyncs"] == 0 and report["final_states_match"]
+    assert report["relay"]["forwarded"] > 0
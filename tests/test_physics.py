@@ -0,0 +1,87 @@
+# tests/test_physics.py
+import pytest
+import config
+import physics
+from ai import AIControls
+from quality import governor, QUALITY_LEVELS
+from physics import step_fight, state_checksum, to_fixed, to_pixels
+from rewind import pack_fighter
+from sprite import create_roster
+
+
+def fight_checksum(seeds=(1, 2), ticks=1200):
+    """CRC of every tick of an AI-vs-AI fight between real character packs."""
+    group, fighters = create_roster(("Steve", "Googley"), (None, None),
+                                    spawns=(config.RED_SPAWN, config.BLUE_SPAWN))
+    red, blue = fighters
+    red.controls = AIControls(red, blue, config, seed=seeds[0])
+    blue.controls = AIControls(blue, red, config, seed=seeds[1])
+    checksum = 0
+    for _ in range(ticks):
+        step_fight(fighters)
+        checksum = state_checksum(pack_fighter(red) + pack_fighter(blue), checksum)
+    return checksum
+
+
+def test_fixed_point_round_trip():
+    assert to_pixels(to_fixed(123)) == 123
+    assert to_pixels(to_fixed(123) + physics.FIXED_ONE - 1) == 123
+
+
+def test_same_inputs_same_checksum(display):
+    assert fight_checksum() == fight_checksum()
+
+
+def test_different_inputs_different_checksum(display):
+    assert fight_checksum(seeds=(1, 2)) != fight_checksum(seeds=(3, 4))
+
+
+def test_numpy_and_row_paths_agree(display, monkeypatch):
+    rows = fight_checksum()
+    monkeypatch.setattr(physics, "VECTOR_MIN_FIGHTERS", 0)
+    assert fight_checksum() == rows
+
+
+def test_quality_level_does_not_change_checksum(display):
+    level = governor.level
+    try:
+        governor.set_level(0)
+        high = fight_checksum()
+        governor.set_level(len(QUALITY_LEVELS) - 1)
+        minimal = fight_checksum()
+    finally:
+        governor.set_level(level)
+    assert QUALITY_LEVELS[-1]["anim_step"] > 1
+    assert minimal == high
+
+
+def party_checksum(count, vector_min, ticks=300):
+    """CRC after `ticks` of a party fight, with NumPy systems from `vector_min` fighters."""
+    from benchmark import make_fighters
+    physics.VECTOR_MIN_FIGHTERS = vector_min
+    fighters = make_fighters(count)
+    for _ in range(ticks):
+        step_fight(fighters)
+    return state_checksum(b"".join(pack_fighter(fighter) for fighter in fighters))
+
+
+def test_row_index():
+    assert physics.row_index((3, 4, 5)) == slice(3, 6)
+    assert physics.row_index((0, 2)).tolist() == [0, 2]
+    assert list(physics.index_rows(slice(3, 6))) == [3, 4, 5]
+
+
+@pytest.mark.parametrize("count", [32, 64])
+def test_party_numpy_and_row_paths_agree(display, monkeypatch, count):
+    monkeypatch.setattr(physics, "VECTOR_MIN_FIGHTERS", config.VECTOR_MIN_FIGHTERS)
+    assert config.VECTOR_MIN_FIGHTERS <= count  # a party this size uses NumPy by default
+    assert party_checksum(count, vector_min=0) == party_checksum(count, vector_min=count + 1)
+
+
+def test_same_inputs_same_pack_game_checksum(make_game):
+    first, second = make_game(), make_game()
+    for _ in range(900):
+        first.update()
+        second.update()
+    assert first.round_tick == second.round_tick > 0
+    assert list(first.checksum_history) == list(second.checksum_history)
@@ -0,0 +1,96 @@
+# tests/test_rewind.py
+import random
+import pygame
+import pytest
+import config
+from ai import AIControls
+from rewind import RewindBuffer, xor_bytes, pack_game, pack_ai, pack_tables
+
+
+def frames(count, size=64, seed=0):
+    """Byte strings that change a little from one to the next, like fight frames."""
+    rng = random.Random(seed)
+    frame = bytearray(rng.randbytes(size))
+    for _ in range(count):
+        frame[rng.randrange(size)] = rng.randrange(256)
+        yield bytes(frame)
+
+
+def test_xor_round_trip():
+    a, b = frames(2)
+    assert xor_bytes(xor_bytes(a, b), b) == a
+
+
+def test_buffer_returns_every_frame_it_keeps():
+    buffer = RewindBuffer(seconds=1, fps=50, keyframe_interval=7)
+    pushed = list(frames(200))
+    for frame in pushed:
+        buffer.push(frame)
+    assert 50 <= len(buffer) < 50 + 7
+    kept = pushed[-len(buffer):]
+    assert [buffer.get(i) for i in range(len(buffer))] == kept
+    with pytest.raises(IndexError):
+        buffer.get(len(buffer))
+
+
+def test_truncate_then_push_continues_from_there():
+    buffer = RewindBuffer(seconds=1, fps=50, keyframe_interval=7)
+    pushed = list(frames(40))
+    for frame in pushed:
+        buffer.push(frame)
+    buffer.truncate(12)
+    assert len(buffer) == 12
+    extra = list(frames(5, seed=1))
+    for frame in extra:
+        buffer.push(frame)
+    assert [buffer.get(i) for i in range(len(buffer))] == pushed[:12] + extra
+
+
+@pytest.fixture
+def training(display):
+    from gamecanvas import GameCanvas
+    game = GameCanvas(pygame.Surface((config.SCREEN_WIDTH, config.SCREEN_HEIGHT)), None, None, None)
+    game.selected_mode = "training"
+    game.player1_choice, game.player2_choice = "Steve", "Googley"
+    game.load_fighters()
+    game.start_fight()
+    # Something for the opponent's player model to learn from
+    game.red_fighter.controls = AIControls(game.red_fighter, game.blue_fighter, config, seed=5)
+    yield game
+    game.stop_simulation()
+
+
+def fight_state(game):
+    opponent = game.blue_fighter.controls
+    return (pack_game(game), pack_ai(game.red_fighter.controls), pack_ai(opponent),
+            pack_tables(opponent.model) if hasattr(opponent, "model") else None)
+
+
+def test_rewind_restores_fight_and_ai(training):
+    game, rewinder = training, training.rewinder
+    states = []
+    for _ in range(400):
+        game.update()
+        rewinder.record()
+        states.append(fight_state(game))
+
+    rewinder.start()
+    rewinder.step(-150)
+    assert fight_state(game) == states[-151]
+
+    # Playing on from there replays the same fight
+    rewinder.resume()
+    for _ in range(150):
+        game.update()
+        rewinder.record()
+    assert fight_state(game) == states[-1]
+
+
+def test_no_rewind_after_game_over(training):
+    game = training
+    for _ in range(10):
+        game.update()
+        game.rewinder.record()
+    game.game_over = True
+    game.scenes["playing"].handle_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_TAB))
+    assert not game.rewinder.active
@@ -0,0 +1,108 @@
+# tests/test_roster.py
+import json
+import os
+import pytest
+import roster as roster_module
+from roster import Roster, Stats, FIGHT_ANIMATIONS
+
+NAMES = ("A", "B", "C", "D", "E")
+
+
+class FakeAssets:
+    """Records what the roster asks the prefetcher for; `busy` paths are still decoding."""
+    def __init__(self):
+        self.requested = []
+        self.forgotten = []
+        self.busy = set()
+
+    def request(self, path, scale=None, priority=None):
+        self.requested.append(path)
+
+    def forget(self, path, scale=None):
+        if path in self.busy:
+            return False
+        self.forgotten.append(path)
+        return True
+
+
+@pytest.fixture
+def fake_assets(monkeypatch):
+    fake = FakeAssets()
+    monkeypatch.setattr(roster_module, "assets", fake)
+    return fake
+
+
+@pytest.fixture
+def make_roster(tmp_path, fake_assets):
+    characters = []
+    for name in NAMES:
+        directory = tmp_path / name
+        directory.mkdir()
+        animations = {animation: f"{animation}.gif" for animation in FIGHT_ANIMATIONS}
+        stats = {"speed": 7} if name == "A" else {}
+        (directory / "character.json").write_text(json.dumps({"animations": animations, "stats": stats}))
+        characters.append({"name": name, "pack": str(directory), "preview": "idle.gif"})
+    index = tmp_path / "roster.json"
+    index.write_text(json.dumps({"characters": characters}))
+    return lambda max_loaded: Roster(str(index), max_loaded=max_loaded)
+
+
+def dropped(fake_assets):
+    """Characters whose frames were forgotten, in order."""
+    names = []
+    for path in fake_assets.forgotten:
+        name = os.path.basename(os.path.dirname(path))
+        if name not in names:
+            names.append(name)
+    return names
+
+
+def test_pack_is_read_once_with_default_stats(make_roster):
+    roster = make_roster(max_loaded=2)
+    assert roster.pack("A") is roster.pack("A")
+    assert roster.pack("A").stats.speed == 7
+    assert roster.pack("B").stats.max_health == Stats().max_health
+    assert roster.default_opponent == "A"
+
+
+def test_evicts_least_recently_used(make_roster, fake_assets):
+    roster = make_roster(max_loaded=2)
+    for name in ("A", "B", "C"):
+        roster.use(name)
+    assert list(roster.loaded) == ["B", "C"] and dropped(fake_assets) == ["A"]
+
+    roster.use("B")  # B is now the most recent, so C goes next
+    roster.use("D")
+    assert list(roster.loaded) == ["B", "D"] and dropped(fake_assets) == ["A", "C"]
+    assert len(fake_assets.forgotten) == 2 * len(FIGHT_ANIMATIONS)
+
+
+def test_never_holds_more_than_the_limit(make_roster):
+    roster = make_roster(max_loaded=3)
+    for name in NAMES * 3:
+        roster.request(name)
+        assert len(roster.loaded) <= 3
+
+
+def test_pinned_characters_stay(make_roster, fake_assets):
+    roster = make_roster(max_loaded=2)
+    roster.pin(("A", "B"))
+    for name in ("A", "B", "C"):
+        roster.use(name)
+    # Only C itself is unpinned, and the one just used is never dropped
+    assert set(roster.loaded) == {"A", "B", "C"} and dropped(fake_assets) == []
+    roster.pin(("C",))
+    roster.use("D")
+    assert list(roster.loaded) == ["C", "D"] and dropped(fake_assets) == ["A", "B"]
+
+
+def test_still_decoding_goes_first_next_time(make_roster, fake_assets):
+    roster = make_roster(max_loaded=2)
+    roster.use("A")
+    fake_assets.busy = set(roster.pack("A").fight_paths()[:1])
+    roster.use("B")
+    roster.use("C")
+    assert list(roster.loaded) == ["A", "B", "C"]  # A couldn't go yet; it's first in line
+    fake_assets.busy = set()
+    roster.use("D")
+    assert "A" not in roster.loaded and len(roster.loaded) <= 3
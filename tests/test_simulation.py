@@ -0,0 +1,87 @@
+# tests/test_simulation.py
+import threading
+import time
+import pygame
+import config
+from simulation import FrameSnapshot, SnapshotBuffer, KeyState
+
+
+def frame(tick):
+    return FrameSnapshot(tick, None, None, 60, False, None)
+
+
+def test_snapshot_buffer_producer_and_consumer():
+    buffer = SnapshotBuffer()
+    ticks = 2000
+    seen, events = [], []
+
+    def produce():
+        for tick in range(1, ticks + 1):
+            buffer.publish(frame(tick), [tick])
+
+    def consume():
+        last = 0
+        while last < ticks:
+            if not buffer.wait_newer(last, 1):
+                break
+            snapshot, new_events = buffer.take()
+            seen.append(snapshot.tick)
+            events.extend(new_events)
+            last = snapshot.tick
+
+    consumer = threading.Thread(target=consume)
+    producer = threading.Thread(target=produce)
+    consumer.start()
+    producer.start()
+    producer.join()
+    consumer.join(5)
+    assert not consumer.is_alive()
+    assert seen == sorted(set(seen)) and seen[-1] == ticks  # newest wins, never goes back
+    assert events == list(range(1, ticks + 1))  # no event lost or repeated
+
+
+def test_wait_newer_times_out_without_a_new_tick():
+    buffer = SnapshotBuffer()
+    buffer.publish(frame(5), ())
+    assert buffer.wait_newer(4, 0)
+    start = time.perf_counter()
+    assert not buffer.wait_newer(5, 0.02)
+    assert time.perf_counter() - start >= 0.015
+
+
+def test_key_state_seed():
+    keys = KeyState()
+    keys.seed({pygame.K_a: True, pygame.K_d: False}, (pygame.K_a, pygame.K_d))
+    assert keys[pygame.K_a] and not keys[pygame.K_d]
+    keys.release(pygame.K_a)
+    keys.press(pygame.K_d)
+    assert not keys[pygame.K_a] and keys[pygame.K_d]
+
+
+def test_threaded_fight_ticks_and_reads_keys(display, monkeypatch, tmp_path):
+    from gamecanvas import GameCanvas
+    from history import MatchHistory
+    monkeypatch.setattr(config, "SIMULATION_THREAD", True)
+    monkeypatch.setattr(config, "LOW_LATENCY_INPUT", False)
+    game = GameCanvas(pygame.Surface((config.SCREEN_WIDTH, config.SCREEN_HEIGHT)), None, None, None)
+    game.history.close()
+    game.history = MatchHistory(str(tmp_path / "history.sqlite3"))
+    game.selected_mode = "multiplayer"
+    game.player1_choice, game.player2_choice = "Steve", "Googley"
+    game.load_fighters()
+    try:
+        game.start_fight()
+        assert game.simulation_path == "thread"
+        start_x = game.red_fighter.rect.x
+        game.simulation.push_key(game.red_fighter.controls.right, True)
+        buffer = game.simulation.buffer
+        tick = 0
+        while tick < 20:
+            assert buffer.wait_newer(tick, 1)
+            tick = buffer.take()[0].tick
+        snapshot = buffer.take()[0]
+        assert snapshot.red.rect.x > start_x
+        assert snapshot.input_stamp is not None
+    finally:
+        game.stop_simulation()
+        game.history.close()
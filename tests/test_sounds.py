@@ -0,0 +1,125 @@
+# tests/test_sounds.py
+import os
+import pygame
+import pytest
+import sounds
+from sounds import AudioService, LazySound, load_pcm
+
+
+class FakeChannel:
+    """Stands in for a mixer channel: busy from play() until finish()."""
+    def __init__(self):
+        self.busy = False
+        self.sound = None
+
+    def get_busy(self):
+        return self.busy
+
+    def play(self, sound, loops=0):
+        self.busy = True
+        self.sound = sound
+
+    def stop(self):
+        self.busy = False
+
+    def finish(self):
+        self.busy = False
+
+
+def effect(name, priority=0, min_gap_ms=0):
+    sound = LazySound(f"{name}.mp3", priority, min_gap_ms)
+    sound.sound = name  # already "loaded": the fake channels just keep it
+    return sound
+
+
+@pytest.fixture
+def service():
+    service = AudioService(voices=3)
+    service.channels = [FakeChannel() for _ in range(3)]
+    return service
+
+
+def playing(service):
+    return [channel.sound if channel.busy else None for channel in service.channels]
+
+
+def test_free_voices_first(service):
+    service.play_effect(effect("a"), now=1.0)
+    service.channels[0].finish()
+    service.play_effect(effect("b"), now=2.0)
+    service.play_effect(effect("c"), now=3.0)
+    assert playing(service) == ["b", "c", None]
+
+
+def test_full_pool_steals_the_oldest_of_the_lowest_priority(service):
+    for now, (name, priority) in enumerate([("hit1", 1), ("hit2", 1), ("ko", 3)]):
+        service.play_effect(effect(name, priority), now=float(now))
+    service.play_effect(effect("hit3", 1), now=10.0)
+    assert playing(service) == ["hit3", "hit2", "ko"]  # hit1 was the oldest of the priority 1 voices
+    service.play_effect(effect("button", 2), now=11.0)
+    assert playing(service) == ["hit3", "button", "ko"]
+
+
+def test_effect_outranked_by_every_voice_is_dropped(service):
+    for now, name in enumerate(("ko1", "ko2", "ko3")):
+        service.play_effect(effect(name, 3), now=float(now))
+    service.play_effect(effect("hit", 1), now=5.0)
+    assert playing(service) == ["ko1", "ko2", "ko3"]
+
+
+def test_min_gap_between_starts(service):
+    hit = effect("hit", 1, min_gap_ms=50)
+    service.play_effect(hit, now=1.0)
+    service.play_effect(hit, now=1.02)   # too soon: dropped
+    service.play_effect(hit, now=1.06)
+    assert playing(service) == ["hit", "hit", None]
+
+
+def test_triggers_play_on_update(service):
+    service.trigger(effect("a"))
+    service.trigger(effect("b"))
+    assert playing(service) == [None, None, None]
+    service.update()
+    assert playing(service) == ["a", "b", None]
+
+
+@pytest.fixture
+def mixer(tmp_path, monkeypatch):
+    monkeypatch.setattr(sounds, "ASSET_CACHE_DIR", str(tmp_path))
+    pygame.mixer.init()
+    yield tmp_path
+    pygame.mixer.quit()
+
+
+@pytest.fixture
+def decoded(mixer, monkeypatch):
+    """Paths pygame.mixer.Sound is asked to decode (loads from a buffer aren't listed)."""
+    paths = []
+    sound_class = pygame.mixer.Sound
+
+    def sound(*args, **kwargs):
+        if args:
+            paths.append(args[0])
+        return sound_class(*args, **kwargs)
+
+    monkeypatch.setattr(pygame.mixer, "Sound", sound)
+    return paths
+
+
+def test_pcm_cache_is_reused(mixer, decoded):
+    path = os.path.join("assets", "sounds", "damage.mp3")
+    first = load_pcm(path)
+    assert decoded == [path] and len(os.listdir(mixer / "sounds")) == 1
+    second = load_pcm(path)
+    assert decoded == [path]  # read back from the cache, not decoded again
+    assert second.get_raw() == first.get_raw()
+
+
+def test_pcm_cache_is_refreshed_when_the_source_changes(mixer, decoded):
+    path = os.path.join("assets", "sounds", "button.mp3")
+    load_pcm(path)
+    cached = mixer / "sounds" / os.listdir(mixer / "sounds")[0]
+    os.utime(cached, (0, 0))  # older than the MP3
+    load_pcm(path)
+    assert decoded == [path, path]
+    assert os.path.getmtime(cached) >= os.path.getmtime(path)
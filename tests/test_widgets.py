@@ -0,0 +1,70 @@
+# tests/test_widgets.py
+import tracemalloc
+import pygame
+import pytest
+import widgets
+from allocations import AllocationCounter
+from widgets import Button, Label
+
+FRAMES = 20
+
+
+@pytest.fixture
+def renders(display, monkeypatch):
+    """Count the text renders widgets ask for."""
+    calls = []
+    render_text = widgets.render_text
+
+    def counted(string, *args):
+        calls.append(string)
+        return render_text(string, *args)
+
+    monkeypatch.setattr(widgets, "render_text", counted)
+    return calls
+
+
+@pytest.fixture
+def counter():
+    tracing = tracemalloc.is_tracing()
+    counter = AllocationCounter(window=FRAMES)
+    counter.start()
+    yield counter
+    counter.stop()
+    if not tracing:
+        tracemalloc.stop()
+
+
+def test_widgets_render_text_once(renders):
+    screen = pygame.Surface((200, 200))
+    button = Button((10, 10, 120, 40), "Fight")
+    title = Label("Googley", center=(100, 100))
+    subtitle = Label("Eyes", below=(title, 4))
+    for mouse_pos in [(0, 0), (20, 20)] * 3:
+        button.draw(screen, mouse_pos)
+        subtitle.draw(screen)
+        title.draw(screen)
+    # One per button state (normal and hovered) and one per label
+    assert sorted(renders) == ["Eyes", "Fight", "Fight", "Googley"]
+    assert subtitle.rect.top == title.rect.bottom + 4
+
+
+def test_cached_widget_redraw_keeps_nothing(renders, counter):
+    screen = pygame.Surface((200, 200))
+    button = Button((10, 10, 120, 40), "Fight")
+    label = Label("Googley", center=(100, 100))
+
+    counter.frame_start()
+    button.draw(screen, (0, 0))
+    label.draw(screen)
+    counter.frame_done()
+    assert counter.samples[-1][0] > 0  # the first frame fills the caches
+
+    # Python 3.11+ specialises a loop's bytecode after a few passes; let that settle
+    for _ in range(2 * FRAMES):
+        counter.frame_start()
+        button.draw(screen, (0, 0))
+        label.draw(screen)
+        counter.frame_done()
+    assert len(renders) == 2
+    assert [kept for kept, peak in counter.samples] == [0] * FRAMES
+    assert counter.zero_frames() == 1.0